@@ -1,6 +1,7 @@
 import streamlit as st
 from core.auth import is_authenticated, get_current_user
 from core.auth import login
+from core.db import begin_run
 
 # ----CSS FOR WHOLE APP ---- 
 st.markdown(
@@ -100,6 +101,9 @@ st.markdown(
 # --- Force full-width layout for all pages ---
 st.set_page_config(page_title="Student Report App", layout="wide")
 
+# --- Tag this rerun's database requests (admin Performance panel) ---
+begin_run("login")
+
 # --- Show login if not authenticated ---
 if not is_authenticated():
     st.title("🔐 Login")
@@ -0,0 +1,105 @@
+# benchmarks/provision_teachers.py
+"""
+Benchmark bulk teacher provisioning against an in-process mock of the
+Supabase auth and REST endpoints (no network, no real accounts).
+
+    python -m benchmarks.provision_teachers
+    python -m benchmarks.provision_teachers --teachers 200 --latency 0.05 --workers 1 8 16
+
+The mock is an httpx transport installed on the app's shared client with
+use_http_transport(), like benchmarks/run.py does, so every request is
+answered in-process whatever SUPABASE_URL or secrets.toml say. Every
+request sleeps for --latency seconds to stand in for the round trip to
+Supabase. Each worker count is timed over the same upload.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+
+import httpx
+
+
+class MockSupabase(httpx.MockTransport):
+    """Just enough of /auth/v1/admin/users and /rest/v1/profiles; counts every request."""
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__(self._handle)
+        self.latency = latency
+        self.requests = Counter()
+        self._lock = threading.Lock()
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        time.sleep(self.latency)
+        path = request.url.path
+        with self._lock:
+            self.requests[(path, request.method)] += 1
+        body = json.loads(request.content or b"null")
+
+        if request.method == "POST" and path.startswith("/auth/v1/admin/users"):
+            return httpx.Response(200, json={
+                "id": str(uuid.uuid4()),
+                "aud": "authenticated",
+                "email": body["email"],
+                "app_metadata": {},
+                "user_metadata": {},
+                "created_at": "2024-01-01T00:00:00Z",
+            })
+        if request.method == "POST" and path.startswith("/rest/v1/profiles"):
+            return httpx.Response(201, json=body if isinstance(body, list) else [body])
+        if request.method == "DELETE":
+            return httpx.Response(200, json={})
+        return httpx.Response(404, json={"message": "not found"})
+
+    def install(self):
+        """Route the app's shared Supabase client through this mock."""
+        # create_client() needs some URL and key when neither secrets.toml nor
+        # the environment has one; the transport answers every request anyway
+        os.environ.setdefault("SUPABASE_URL", "http://supabase.mock")
+        os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "benchmark-service-role-key")
+        from core.db import use_http_transport
+
+        use_http_transport(self)
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teachers", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per mock request")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    from core.db_teachers import provision_teachers
+
+    mock = MockSupabase(args.latency).install()
+
+    rows = [
+        {
+            "full_name": f"Teacher {i}",
+            "email": f"teacher{i}@example.com",
+            "password": "benchmark-password",
+            "classes": ["JHS 1"],
+        }
+        for i in range(args.teachers)
+    ]
+
+    print(f"{args.teachers} teachers, {args.latency * 1000:.0f} ms per request")
+    baseline = None
+    for workers in args.workers:
+        report = provision_teachers(rows, workers=workers)
+        seconds = report["seconds"]
+        baseline = baseline or seconds
+        print(
+            f"  workers={workers:<3} {seconds:6.2f}s  "
+            f"{args.teachers / seconds:7.1f} teachers/s  "
+            f"x{baseline / seconds:.1f}  (created={report['created']}, failed={report['failed']})"
+        )
+    print(f"\n{sum(mock.requests.values()):,} requests, all answered by the mock.")
+
+
+if __name__ == "__main__":
+    main()
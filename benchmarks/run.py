@@ -0,0 +1,273 @@
+# benchmarks/run.py
+"""
+Offline benchmark suite: the app's hot paths against a seeded, in-memory
+copy of the local SQLite backend (core/db/sqlite_backend.py), with
+artificial latency per request to model the round trip to Supabase. The
+app's real supabase/postgrest client builds every request, so the same
+PostgREST emulator serves the benchmarks, the tests and DB_BACKEND=sqlite.
+
+    python -m benchmarks.run                        # full school, 30 ms per request
+    python -m benchmarks.run --scale small --latency 0.01 --repeat 5
+    python -m benchmarks.run --only save_scores_class results_viewer_load
+    python -m benchmarks.run --latency 0            # storage time only
+    python -m benchmarks.run --save-baseline        # record the current numbers
+
+Each benchmark runs --repeat times with cold read caches; the median time
+and the number of requests are compared with benchmarks/baseline.json
+(same scale and latency). More requests than the baseline, or a median
+more than --tolerance slower, is a regression and the exit status is 1.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections import Counter
+
+import pandas as pd
+
+# Streamlit warns about every st.* call made outside `streamlit run`
+os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+
+from benchmarks.seed import ACADEMIC_YEAR, SCALES, seed_school
+from core.db.sqlite_backend import SQLiteTransport
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def _class(school: dict, level: str) -> tuple[dict, list[dict]]:
+    cls = next(c for c in school["classes"] if c["academic_level"] == level)
+    return cls, [s for s in school["students"] if s["assigned_class"] == cls["class_name"]]
+
+
+def _score_rows(rng, setting, students, subjects) -> list[dict]:
+    return [
+        {
+            "student_id": student["id"],
+            "subject_id": subject["id"],
+            "class_score": rng.randint(0, setting["max_class_score"]) if setting["has_components"] else None,
+            "exam_score": rng.randint(0, setting["max_exam_score"]),
+        }
+        for student in students
+        for subject in subjects
+    ]
+
+
+# -------------------------------------------------
+# Benchmarks (school, repetition number)
+# -------------------------------------------------
+@benchmark
+def save_scores_class(school, rep):
+    """Score grid save: every student x subject of one class in one call."""
+    from core.db_student_scores import save_class_scores_bulk
+
+    cls, students = _class(school, "Upper Primary")
+    rows = _score_rows(random.Random(rep), school["settings"][cls["academic_level"]], students, school["subjects"])
+    save_class_scores_bulk(
+        class_id=cls["id"], academic_level=cls["academic_level"], score_rows=rows,
+        term=1, academic_year=ACADEMIC_YEAR,
+    )
+
+
+@benchmark
+def save_scores_student(school, rep):
+    """Per-student form save: all subjects of one student."""
+    from core.db_student_scores import save_student_scores_bulk
+
+    cls, students = _class(school, "Upper Primary")
+    rows = _score_rows(random.Random(rep), school["settings"][cls["academic_level"]], students[:1], school["subjects"])
+    save_student_scores_bulk(
+        student_id=students[0]["id"], class_id=cls["id"], academic_level=cls["academic_level"],
+        subject_scores=rows, term=1, academic_year=ACADEMIC_YEAR,
+    )
+
+
+@benchmark
+def generate_class_results(school, rep):
+    """Whole-class final results, positions and subject positions (JHS)."""
+    from core.db_student_final_results import save_final_results_bulk
+    from core.db_student_scores import save_subject_positions
+    from core.services.final_result_engine import generate_class_rankings
+
+    cls, _ = _class(school, "JHS")
+    results, ranked_scores = generate_class_rankings(
+        class_id=cls["id"], term=1, level=cls["academic_level"], academic_year=ACADEMIC_YEAR
+    )
+    save_final_results_bulk(results)
+    save_subject_positions(ranked_scores)
+
+
+@benchmark
+def close_term_school(school, rep):
+    """close_term.py for every class (4 workers)."""
+    from close_term import close_term
+
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        close_term(1, academic_year=ACADEMIC_YEAR, workers=4, checkpoint=os.path.join(tmp, "checkpoint.json"))
+
+
+@benchmark
+def results_viewer_load(school, rep):
+    """The reads behind student_results_viewer for one class."""
+    from core.db_classes import get_classes
+    from core.db_student_final_results import get_final_results
+    from core.db_student_scores import get_class_scores
+    from core.db_students import get_students_by_class
+
+    cls, _ = _class(school, "JHS")
+    get_classes()
+    get_students_by_class(cls["class_name"])
+    get_final_results(class_id=cls["id"], term=1, academic_year=ACADEMIC_YEAR)
+    get_class_scores(class_id=cls["id"], term=1, academic_year=ACADEMIC_YEAR)
+
+
+@benchmark
+def import_students(school, rep):
+    """Roster upload: 500 new students across every class."""
+    from core.db_students import bulk_import_students
+
+    classes = [c["class_name"] for c in school["classes"]]
+    roster = pd.DataFrame({
+        "full_name": [f"New Student {rep}-{i}" for i in range(500)],
+        "assigned_class": [classes[i % len(classes)] for i in range(500)],
+    })
+    bulk_import_students(roster, valid_classes=classes)
+
+
+@benchmark
+def import_class_scores(school, rep):
+    """Score sheet upload for one class (student x subject rows)."""
+    from core.db_student_scores import import_class_scores as import_scores
+
+    cls, students = _class(school, "Upper Primary")
+    rng = random.Random(rep)
+    sheet = pd.DataFrame([
+        {"student": student["full_name"], "subject": subject["subject_name"],
+         "class_score": rng.randint(0, 100), "exam_score": rng.randint(0, 100)}
+        for student in students
+        for subject in school["subjects"]
+    ])
+    import_scores(
+        sheet, class_id=cls["id"], academic_level=cls["academic_level"], students=students,
+        subjects=school["subjects"], term=1, academic_year=ACADEMIC_YEAR,
+    )
+
+
+# -------------------------------------------------
+# Backend
+# -------------------------------------------------
+class BenchmarkSQLite(SQLiteTransport):
+    """In-memory SQLite backend that sleeps `latency` seconds and counts every request."""
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__(":memory:")
+        self.latency = latency
+        self.requests = Counter()
+
+    def handle_request(self, request):
+        if self.latency:
+            time.sleep(self.latency)
+        self.requests[(request.url.path.rsplit("/", 1)[-1], request.method)] += 1
+        return super().handle_request(request)
+
+    def install(self):
+        """Route the app's shared Supabase client through this backend."""
+        os.environ.setdefault("SUPABASE_URL", "http://postgrest.local")
+        os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "benchmark-service-role-key")
+        from core.db import use_http_transport
+
+        use_http_transport(self)
+        return self
+
+
+# -------------------------------------------------
+# Runner
+# -------------------------------------------------
+def run_suite(names: list[str], *, scale: str, latency: float, repeat: int) -> dict:
+    from core.db import invalidate
+
+    backend = BenchmarkSQLite()
+    started = time.perf_counter()
+    school = seed_school(backend, scale)
+    print(f"Seeded {scale} school in {time.perf_counter() - started:.1f}s "
+          f"({len(backend.rows('student_scores')):,} score rows); latency {latency * 1000:.0f} ms/request\n")
+    backend.install()
+    backend.latency = latency
+
+    results = {}
+    for name in names:
+        timings, requests = [], []
+        for rep in range(repeat):
+            invalidate()  # cold read caches
+            before = sum(backend.requests.values())
+            started = time.perf_counter()
+            BENCHMARKS[name](school, rep)
+            timings.append(time.perf_counter() - started)
+            requests.append(sum(backend.requests.values()) - before)
+        results[name] = {"seconds": round(statistics.median(timings), 4), "requests": max(requests)}
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Print a results table; return the names that regressed."""
+    regressions = []
+    print(f"{'benchmark':<24} {'median s':>9} {'requests':>9} {'baseline s':>11} {'change':>8}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        line = f"{name:<24} {result['seconds']:>9.3f} {result['requests']:>9}"
+        if base:
+            change = result["seconds"] / base["seconds"] - 1 if base["seconds"] else 0.0
+            line += f" {base['seconds']:>11.3f} {change:>+8.0%}"
+            if result["requests"] > base["requests"] or change > tolerance:
+                regressions.append(name)
+                line += f"  REGRESSION (baseline {base['requests']} requests)"
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=list(SCALES), default="full")
+    parser.add_argument("--latency", type=float, default=0.03, help="seconds per request")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="benchmarks to run")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before a regression")
+    args = parser.parse_args()
+
+    results = run_suite(
+        args.only or list(BENCHMARKS), scale=args.scale, latency=args.latency, repeat=args.repeat
+    )
+
+    key = f"{args.scale}@{args.latency:g}"
+    stored = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+
+    regressions = compare(results, stored.get(key, {}), args.tolerance)
+
+    if args.save_baseline:
+        stored[key] = {**stored.get(key, {}), **results}
+        with open(args.baseline, "w") as f:
+            json.dump(stored, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nBaseline saved to {args.baseline} ({key}).")
+    elif regressions:
+        print(f"\n{len(regressions)} regression(s) against {key}: {', '.join(regressions)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# benchmarks/seed.py
+"""
+Deterministic seed data for a whole school, loaded into a SQLiteTransport
+(or any backend with a load(table, rows) method).
+
+SCALES gives the school sizes; "full" is a large school (50 classes,
+2,000 students, 12 subjects, scores for 3 terms).
+"""
+import random
+import uuid
+
+SCALES = {
+    "small": {"classes": 10, "students": 400, "subjects": 12, "terms": 3},
+    "full": {"classes": 50, "students": 2000, "subjects": 12, "terms": 3},
+}
+ACADEMIC_YEAR = "2025/2026"
+
+FIRST_NAMES = ["Ama", "Kofi", "Akosua", "Kwame", "Yaa", "Kojo", "Abena", "Yaw", "Efua", "Kwesi", "Adwoa", "Kwabena"]
+LAST_NAMES = ["Mensah", "Owusu", "Boateng", "Asante", "Osei", "Addo", "Appiah", "Agyeman", "Darko", "Ofori"]
+SUBJECT_NAMES = [
+    ("English Language", "core"), ("Mathematics", "core"), ("Integrated Science", "core"),
+    ("Social Studies", "core"), ("Religious and Moral Education", "elective"), ("Computing", "elective"),
+    ("French", "elective"), ("Ghanaian Language", "elective"), ("Creative Arts", "elective"),
+    ("Career Technology", "elective"), ("Physical Education", "elective"), ("History", "elective"),
+]
+LEVELS = ["Lower Primary", "Upper Primary", "JHS"]
+
+SCORE_SETTINGS = [
+    {"academic_level": "Lower Primary", "has_components": True, "class_weight": 30, "exam_weight": 70,
+     "max_class_score": 100, "max_exam_score": 100},
+    {"academic_level": "Upper Primary", "has_components": True, "class_weight": 30, "exam_weight": 70,
+     "max_class_score": 100, "max_exam_score": 100},
+    {"academic_level": "JHS", "has_components": False, "class_weight": 0, "exam_weight": 100,
+     "max_class_score": 0, "max_exam_score": 100},
+]
+# (min, max, grade, remark)
+GRADING_SCALES = [
+    (80, 100, 1, "Excellent"), (70, 79, 2, "Very Good"), (65, 69, 3, "Good"), (60, 64, 4, "Credit"),
+    (55, 59, 5, "Credit"), (50, 54, 6, "Pass"), (45, 49, 7, "Pass"), (40, 44, 8, "Weak"), (0, 39, 9, "Fail"),
+]
+FINAL_GRADING_SCALES = [
+    {"level": "jhs", "min_value": 6, "max_value": 15, "final_grade": "Distinction", "descriptor": "Highest", "remark": "Excellent work"},
+    {"level": "jhs", "min_value": 16, "max_value": 30, "final_grade": "Credit", "descriptor": "Higher", "remark": "Good work"},
+    {"level": "jhs", "min_value": 31, "max_value": 54, "final_grade": "Pass", "descriptor": "Average", "remark": "Work harder"},
+    {"level": "primary", "min_value": 900, "max_value": 1200, "final_grade": "A", "descriptor": "Highest", "remark": "Excellent work"},
+    {"level": "primary", "min_value": 600, "max_value": 899, "final_grade": "B", "descriptor": "Higher", "remark": "Good work"},
+    {"level": "primary", "min_value": 0, "max_value": 599, "final_grade": "C", "descriptor": "Average", "remark": "Work harder"},
+]
+
+
+def _id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def grade_for(total: int) -> tuple[int, str]:
+    for low, high, grade, remark in GRADING_SCALES:
+        if low <= total <= high:
+            return grade, remark
+    return 9, "Fail"
+
+
+def score_row(rng: random.Random, setting: dict) -> dict:
+    """Random raw scores plus the computed fields, like compute_scores()."""
+    exam = rng.randint(30, 100)
+    if not setting["has_components"]:
+        total = exam
+        row = {"class_score": None, "exam_score": exam, "weighted_class_score": None, "weighted_exam_score": None}
+    else:
+        class_score = rng.randint(30, 100)
+        wc = round(class_score / setting["max_class_score"] * setting["class_weight"])
+        we = round(exam / setting["max_exam_score"] * setting["exam_weight"])
+        total = round(class_score / setting["max_class_score"] * setting["class_weight"]
+                      + exam / setting["max_exam_score"] * setting["exam_weight"])
+        row = {"class_score": class_score, "exam_score": exam, "weighted_class_score": wc, "weighted_exam_score": we}
+    grade, remark = grade_for(total)
+    return {**row, "total_score": total, "grade": grade, "remark": remark}
+
+
+def seed_school(backend, scale: str = "full", seed: int = 7) -> dict:
+    """Load a school into `backend`; returns the seeded classes, students and subjects."""
+    size = SCALES[scale]
+    rng = random.Random(seed)
+    settings = {s["academic_level"]: s for s in SCORE_SETTINGS}
+
+    subjects = [
+        {"id": _id(rng), "subject_name": name, "subject_type": kind}
+        for name, kind in SUBJECT_NAMES[:size["subjects"]]
+    ]
+    classes = [
+        {"id": _id(rng), "class_name": f"{LEVELS[i % len(LEVELS)]} {i // len(LEVELS) + 1}",
+         "academic_level": LEVELS[i % len(LEVELS)]}
+        for i in range(size["classes"])
+    ]
+    students = [
+        {"id": _id(rng), "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}",
+         "assigned_class": classes[i % len(classes)]["class_name"]}
+        for i in range(size["students"])
+    ]
+    class_by_name = {c["class_name"]: c for c in classes}
+
+    backend.load("subjects", subjects)
+    backend.load("classes", classes)
+    backend.load("students", students)
+    backend.load("score_settings", [{"id": _id(rng), **s} for s in SCORE_SETTINGS])
+    backend.load("grading_scales", [
+        {"id": _id(rng), "min_score": lo, "max_score": hi, "grade": g, "remark": r} for lo, hi, g, r in GRADING_SCALES
+    ])
+    backend.load("final_grading_scales", [{"id": _id(rng), **s} for s in FINAL_GRADING_SCALES])
+    backend.load("conduct_settings", [{"id": i, "conduct_name": n} for i, n in enumerate(["Good", "Very Good", "Fair"], 1)])
+    backend.load("interest_settings", [{"id": i, "interest_name": n} for i, n in enumerate(["Reading", "Football", "Music"], 1)])
+    backend.load("class_subjects", [
+        {"id": _id(rng), "class_id": c["id"], "subject_id": s["id"]} for c in classes for s in subjects
+    ])
+    backend.load("class_subject_order", [
+        {"id": _id(rng), "class_id": c["id"], "subject_id": s["id"], "sort_order": n}
+        for c in classes for n, s in enumerate(subjects)
+    ])
+
+    scores = []
+    for term in range(1, size["terms"] + 1):
+        for student in students:
+            cls = class_by_name[student["assigned_class"]]
+            setting = settings[cls["academic_level"]]
+            for subject in subjects:
+                scores.append({
+                    "student_id": student["id"], "class_id": cls["id"], "subject_id": subject["id"],
+                    "academic_level": cls["academic_level"], "term": term, "academic_year": ACADEMIC_YEAR,
+                    "position": None, **score_row(rng, setting),
+                })
+    backend.load("student_scores", scores)
+    backend.load("student_conduct_interest", [
+        {"student_id": s["id"], "class_id": class_by_name[s["assigned_class"]]["id"], "term": 1,
+         "academic_year": ACADEMIC_YEAR,
+         "conduct_id": rng.randint(1, 3), "interest_id": rng.randint(1, 3), "attendance": rng.randint(40, 60)}
+        for s in students
+    ])
+
+    return {"classes": classes, "students": students, "subjects": subjects, "settings": settings}
@@ -0,0 +1,162 @@
+# close_term.py
+"""
+End-of-term pipeline: generate and save final results for every class.
+
+    python close_term.py --term 1
+    python close_term.py --term 1 --academic-year 2024/2025
+    python close_term.py --term 1 --workers 8 --chunk-size 200
+    python close_term.py --term 1 --checkpoint term1.json   # resume after a crash
+
+--academic-year defaults to the current school year (see core/terms.py).
+
+Classes are processed concurrently on a thread pool (the work is network
+bound). Each finished class is recorded in the checkpoint file, so a rerun
+skips classes that already completed.
+The exit status is non-zero when the classes cannot be read or any class
+fails.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from core.db_classes import get_classes
+from core.db_student_final_results import save_final_results_bulk
+from core.db_student_scores import save_subject_positions
+from core.services.final_result_engine import LEVEL_MAP, generate_class_rankings
+from core.terms import TERMS, current_academic_year
+
+_checkpoint_lock = threading.Lock()
+
+
+# -------------------------------------------------
+# Checkpoint file
+# -------------------------------------------------
+def load_checkpoint(path: str, term: int, academic_year: str) -> set[str]:
+    """Return the class ids already completed for this term."""
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("term") != term or data.get("academic_year") != academic_year:
+        return set()
+    return set(data.get("completed", []))
+
+
+def save_checkpoint(path: str, term: int, academic_year: str, completed: set[str]):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(
+            {"term": term, "academic_year": academic_year, "completed": sorted(completed)},
+            f,
+            indent=2,
+        )
+    os.replace(tmp_path, path)
+
+
+# -------------------------------------------------
+# Per-class work
+# -------------------------------------------------
+def close_class(cls: dict, term: int, academic_year: str, chunk_size: int) -> dict:
+    """Generate and save final results and positions for one class. Returns a report dict."""
+    started = time.perf_counter()
+    report = {"class_id": cls["id"], "class_name": cls["class_name"], "results": 0, "error": None}
+
+    try:
+        results, ranked_scores = generate_class_rankings(
+            class_id=cls["id"],
+            term=term,
+            academic_year=academic_year,
+            level=cls["academic_level"],
+        )
+        saved = save_final_results_bulk(results, chunk_size=chunk_size)
+        if len(saved) != len(results):
+            raise RuntimeError(f"saved {len(saved)} of {len(results)} results")
+        save_subject_positions(ranked_scores, chunk_size=chunk_size)
+        report["results"] = len(results)
+    except Exception as e:
+        report["error"] = str(e)
+
+    report["seconds"] = time.perf_counter() - started
+    return report
+
+
+def close_term(
+    term: int,
+    *,
+    academic_year: str | None = None,
+    workers: int = 4,
+    chunk_size: int = 500,
+    checkpoint: str | None = None
+) -> list[dict]:
+    academic_year = academic_year or current_academic_year()
+    checkpoint = checkpoint or f"close_term_{academic_year.replace('/', '-')}_{term}.checkpoint.json"
+    completed = load_checkpoint(checkpoint, term, academic_year)
+
+    # A failed read must not look like "no classes" (raises RuntimeError)
+    classes = [
+        c for c in get_classes(raise_errors=True)
+        if LEVEL_MAP.get(c["academic_level"].lower()) and c["id"] not in completed
+    ]
+    if completed:
+        print(f"Resuming: {len(completed)} class(es) already completed for term {term}, {academic_year}.")
+    if not classes:
+        print("Nothing to do.")
+        return []
+
+    reports = []
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(close_class, cls, term, academic_year, chunk_size)
+            for cls in classes
+        ]
+        for future in as_completed(futures):
+            report = future.result()
+            reports.append(report)
+
+            if report["error"]:
+                print(f"❌ {report['class_name']}: {report['error']} ({report['seconds']:.2f}s)")
+                continue
+
+            print(f"✅ {report['class_name']}: {report['results']} results ({report['seconds']:.2f}s)")
+            with _checkpoint_lock:
+                completed.add(report["class_id"])
+                save_checkpoint(checkpoint, term, academic_year, completed)
+
+    failed = [r for r in reports if r["error"]]
+    total_results = sum(r["results"] for r in reports)
+    print(
+        f"\nDone in {time.perf_counter() - started:.2f}s: "
+        f"{len(reports) - len(failed)} class(es) closed, {total_results} results saved, "
+        f"{len(failed)} failed."
+    )
+    if failed:
+        print(f"Rerun the same command to retry the failed classes (checkpoint: {checkpoint}).")
+    return reports
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate final results for every class in a term.")
+    parser.add_argument("--term", type=int, required=True, choices=TERMS)
+    parser.add_argument("--academic-year", help="e.g. 2024/2025 (default: current school year)")
+    parser.add_argument("--workers", type=int, default=4, help="classes processed concurrently")
+    parser.add_argument("--chunk-size", type=int, default=500, help="max rows per upsert request")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: close_term_<year>_<term>.checkpoint.json)")
+    args = parser.parse_args()
+
+    try:
+        reports = close_term(
+            args.term,
+            academic_year=args.academic_year,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            checkpoint=args.checkpoint,
+        )
+    except RuntimeError as e:
+        raise SystemExit(f"❌ Could not load classes: {e}")
+    if any(r["error"] for r in reports):
+        raise SystemExit(1)
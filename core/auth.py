@@ -1,12 +1,11 @@
 # core/auth.py
-from supabase import create_client
 import streamlit as st
-import os
+from core.db import create_pooled_client
 
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_SERVICE_ROLE_KEY"]
-
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Signing in swaps the client's Authorization header to the user's token,
+# so auth gets its own client (on the shared connection pool) instead of
+# the service-role client used by the data modules.
+supabase = create_pooled_client()
 
 
 def login(email, password):
@@ -0,0 +1,15 @@
+# core/db/__init__.py
+
+from .client import (
+    supabase,
+    get_client,
+    get_http_client,
+    create_pooled_client,
+    use_http_transport,
+    get_setting,
+)
+from .execute import safe_execute, execute_with_retry
+from .cache import cached_read, invalidate, invalidates
+from .pagination import keyset_page, split_page, escape_like
+from .metrics import begin_run, set_page, query_budget, QueryBudgetExceeded
+from .sqlite_backend import SQLiteTransport
@@ -0,0 +1,83 @@
+# core/db/cache.py
+import copy
+import functools
+import threading
+import time
+
+from .client import get_setting
+
+DB_CACHE_TTL = float(get_setting("DB_CACHE_TTL", 60))
+
+_lock = threading.Lock()
+# table -> {call key: (expires_at, value)}
+_store: dict[str, dict[tuple, tuple[float, object]]] = {}
+# table -> number of invalidations, so a read that raced a write is not stored
+_generations: dict[str, int] = {}
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+def cached_read(table: str, *, ttl: float | None = None, copy_result: bool = True):
+    """
+    Cache a read function's result per table and call arguments.
+
+    Entries expire after `ttl` seconds (DB_CACHE_TTL by default) and are
+    dropped immediately by invalidate(table) on writes. Empty results are
+    not cached, because _safe_execute also returns [] when a request fails.
+    Callers get a deep copy unless copy_result=False, so mutating a result
+    never corrupts the cache.
+    """
+    lifetime = DB_CACHE_TTL if ttl is None else ttl
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__module__, func.__qualname__, _freeze(args), _freeze(kwargs))
+            now = time.monotonic()
+
+            with _lock:
+                entry = _store.get(table, {}).get(key)
+                generation = _generations.get(table, 0)
+            if entry and entry[0] > now:
+                value = entry[1]
+            else:
+                value = func(*args, **kwargs)
+                with _lock:
+                    if value and _generations.get(table, 0) == generation:
+                        _store.setdefault(table, {})[key] = (now + lifetime, value)
+
+            return copy.deepcopy(value) if copy_result else value
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate(*tables: str):
+    """Drop cached reads for the given tables (all tables if none given)."""
+    with _lock:
+        for table in tables or list(_store):
+            _store.pop(table, None)
+            _generations[table] = _generations.get(table, 0) + 1
+
+
+def invalidates(*tables: str):
+    """Invalidate the given tables after the decorated write runs."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                invalidate(*tables)
+
+        return wrapper
+
+    return decorator
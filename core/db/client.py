@@ -0,0 +1,140 @@
+# core/db/client.py
+import os
+import threading
+
+import httpx
+import streamlit as st
+from dotenv import load_dotenv
+from supabase import Client, create_client
+from supabase.lib.client_options import SyncClientOptions
+
+# Load environment variables
+load_dotenv()
+
+
+# -------------------------------------------------------------------
+# Settings (Streamlit secrets first, then environment variables)
+# -------------------------------------------------------------------
+def get_setting(name: str, default=None):
+    try:
+        if name in st.secrets:
+            return st.secrets[name]
+    except FileNotFoundError:
+        # No secrets.toml (e.g. CLI scripts) — fall back to the environment
+        pass
+    return os.environ.get(name, default)
+
+
+DB_TIMEOUT = float(get_setting("DB_TIMEOUT", 15))
+DB_CONNECT_TIMEOUT = float(get_setting("DB_CONNECT_TIMEOUT", 5))
+DB_MAX_CONNECTIONS = int(get_setting("DB_MAX_CONNECTIONS", 20))
+DB_KEEPALIVE_EXPIRY = float(get_setting("DB_KEEPALIVE_EXPIRY", 60))
+
+# "supabase" (default) or "sqlite": a local database file served by
+# core/db/sqlite_backend.py, for running the app without a network
+DB_BACKEND = str(get_setting("DB_BACKEND", "supabase")).lower()
+SQLITE_PATH = str(get_setting("SQLITE_PATH", os.path.join(".data", "school.db")))
+LOCAL_URL = "http://sqlite.local"
+
+
+# -------------------------------------------------------------------
+# Shared HTTP connection pool
+# -------------------------------------------------------------------
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _default_transport() -> httpx.BaseTransport | None:
+    if DB_BACKEND == "supabase":
+        return None
+    if DB_BACKEND == "sqlite":
+        from .sqlite_backend import local_transport
+
+        return local_transport(SQLITE_PATH)
+    raise ValueError(f"Unknown DB_BACKEND {DB_BACKEND!r} (expected 'supabase' or 'sqlite')")
+
+
+def _create_http_client(transport: httpx.BaseTransport | None = None) -> httpx.Client:
+    from .metrics import check_request, record_response, start_timer
+
+    if transport is None:
+        transport = _default_transport()
+
+    return httpx.Client(
+        transport=transport,
+        http2=_http2_available(),
+        timeout=httpx.Timeout(DB_TIMEOUT, connect=DB_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=DB_MAX_CONNECTIONS,
+            max_keepalive_connections=DB_MAX_CONNECTIONS,
+            keepalive_expiry=DB_KEEPALIVE_EXPIRY,
+        ),
+        follow_redirects=True,
+        event_hooks={"request": [check_request, start_timer], "response": [record_response]},
+    )
+
+
+_lock = threading.RLock()
+_http_client: httpx.Client | None = None
+_client: Client | None = None
+
+
+def get_http_client() -> httpx.Client:
+    """Return the process-wide keep-alive HTTP client."""
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = _create_http_client()
+        return _http_client
+
+
+def use_http_transport(transport: httpx.BaseTransport | None):
+    """
+    Send every request through `transport` (e.g. an in-memory
+    SQLiteTransport in tests and benchmarks); None restores the DB_BACKEND
+    default. Clients are rebuilt on next use.
+    """
+    global _http_client, _client
+    with _lock:
+        _http_client = _create_http_client(transport)
+        _client = None
+
+
+def create_pooled_client() -> Client:
+    """
+    Create a Supabase client that sends every request (PostgREST, auth,
+    storage) through the shared connection pool.
+    """
+    url = get_setting("SUPABASE_URL")
+    key = get_setting("SUPABASE_SERVICE_ROLE_KEY")
+    if DB_BACKEND == "sqlite":
+        # Requests never leave the process; the URL only has to look valid
+        url, key = url or LOCAL_URL, key or "local"
+    return create_client(url, key, options=SyncClientOptions(httpx_client=get_http_client()))
+
+
+def get_client() -> Client:
+    """Return the shared service-role client, creating it on first use."""
+    global _client
+    with _lock:
+        if _client is None:
+            _client = create_pooled_client()
+        return _client
+
+
+class _ClientProxy:
+    """
+    Module-level stand-in for the shared client so `from core.db import
+    supabase` is cheap at import time and the client is only built when
+    the first query runs.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_client(), name)
+
+
+supabase = _ClientProxy()
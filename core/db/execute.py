@@ -0,0 +1,71 @@
+# core/db/execute.py
+import time
+
+import httpx
+import streamlit as st
+
+from .client import get_setting
+from .metrics import QueryBudgetExceeded
+
+DB_MAX_RETRIES = int(get_setting("DB_MAX_RETRIES", 2))
+DB_RETRY_BACKOFF = float(get_setting("DB_RETRY_BACKOFF", 0.25))
+
+# Requests that can be replayed safely after a timeout or dropped connection
+IDEMPOTENT_METHODS = {"GET", "HEAD"}
+
+
+def _http_method(request) -> str:
+    config = getattr(request, "request", None)
+    return getattr(config, "http_method", "GET")
+
+
+def execute_with_retry(request):
+    """
+    Execute a PostgREST request, retrying transient network failures with
+    exponential backoff.
+
+    Connection failures are always retried (nothing reached the server).
+    Timeouts and dropped connections are only retried for reads, since a
+    write may already have been applied.
+    """
+    idempotent = _http_method(request) in IDEMPOTENT_METHODS
+
+    for attempt in range(DB_MAX_RETRIES + 1):
+        try:
+            return request.execute()
+        except (httpx.ConnectError, httpx.ConnectTimeout):
+            if attempt == DB_MAX_RETRIES:
+                raise
+        except (httpx.TimeoutException, httpx.RemoteProtocolError):
+            if not idempotent or attempt == DB_MAX_RETRIES:
+                raise
+
+        time.sleep(DB_RETRY_BACKOFF * (2 ** attempt))
+
+
+# -------------------------------------------------------------------
+# Safe execution helper
+# -------------------------------------------------------------------
+def safe_execute(request, *, raise_errors: bool = False):
+    """
+    Run a request and return its rows.
+
+    By default failures are reported in the UI and an empty list is
+    returned. With raise_errors=True they are raised as RuntimeError
+    instead, for callers that must not continue on a failed read/write.
+    """
+    try:
+        resp = execute_with_retry(request)
+        return resp.data or []
+    except QueryBudgetExceeded:
+        raise
+    except (httpx.ConnectError, httpx.TimeoutException):
+        if raise_errors:
+            raise RuntimeError("Database unreachable")
+        st.warning("⚠️ Unable to reach database — check your internet connection.")
+        return []
+    except Exception as e:
+        if raise_errors:
+            raise RuntimeError(str(e))
+        st.error(f"⚠️ Database error: {str(e)}")
+        return []
@@ -0,0 +1,295 @@
+# core/db/metrics.py
+"""
+Per-request database metrics.
+
+Every request on the shared HTTP client (PostgREST, auth, storage) is
+recorded by an httpx response hook: table, operation, filter shape (filter
+columns and operators, never values), status, rows returned, bytes sent and
+received, and latency. Records go into an in-memory ring buffer tagged with
+the Streamlit page and rerun that issued them (see begin_run / set_page).
+
+Requests made from worker threads (bulk imports, close_term.py) have no
+run and are tagged "background". Set DB_METRICS=0 to turn recording off.
+
+A request hook also enforces a per-run query budget: more than
+DB_QUERY_BUDGET requests in one script run, or DB_N_PLUS_ONE identical
+(table, operation, filter shape) requests in one run -- the signature of a
+query inside a per-student loop -- is a violation. Batched requests (later
+pages of a paginated read -- offset > 0 or a keyset cursor -- and writes
+of more than one row) are not counted, so bulk imports and paging do not
+trip it; .limit(1) and .range(0, 0) lookups and single-row writes are. DB_QUERY_BUDGET_MODE
+decides what happens: "warn" (default) logs it and lists it on the admin
+Performance page, "strict" raises QueryBudgetExceeded before the request
+is sent (for development and tests), "off" does nothing.
+"""
+import itertools
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+from .client import get_setting
+from .sqlite_backend import MODIFIER_PARAMS
+
+DB_METRICS = str(get_setting("DB_METRICS", "1")).lower() not in ("0", "false", "no")
+DB_METRICS_BUFFER = int(get_setting("DB_METRICS_BUFFER", 5000))
+DB_QUERY_BUDGET = int(get_setting("DB_QUERY_BUDGET", 40))
+DB_N_PLUS_ONE = int(get_setting("DB_N_PLUS_ONE", 5))
+DB_QUERY_BUDGET_MODE = str(get_setting("DB_QUERY_BUDGET_MODE", "warn")).lower()
+
+logger = logging.getLogger(__name__)
+
+_ID_SEGMENT = re.compile(r"^[0-9a-fA-F-]{16,}$|^\d+$")
+# The or=(...) cursor keyset_page() adds for every page after the first
+_KEYSET_CURSOR = re.compile(r"^\((\w+)\.gt\..*,and\(\1\.eq\..*,id\.gt\..*\)\)$")
+
+_lock = threading.Lock()
+_records: deque = deque(maxlen=DB_METRICS_BUFFER)
+_violations: deque = deque(maxlen=500)
+_run_ids = itertools.count(1)
+_local = threading.local()
+
+
+# -------------------------------------------------------------------
+# Run / page context
+# -------------------------------------------------------------------
+class QueryBudgetExceeded(RuntimeError):
+    """A script run broke its query budget (DB_QUERY_BUDGET_MODE=strict)."""
+
+
+def begin_run(page: str = "app", *, strict: bool | None = None) -> int:
+    """
+    Start a new script run on this thread; call at the top of every rerun.
+    `strict` overrides DB_QUERY_BUDGET_MODE=strict for this run.
+    """
+    _local.run_id = next(_run_ids)
+    _local.page = page
+    _local.budget = DB_QUERY_BUDGET
+    _local.strict = DB_QUERY_BUDGET_MODE == "strict" if strict is None else strict
+    _local.queries = 0
+    _local.shapes = Counter()
+    return _local.run_id
+
+
+def set_page(page: str, budget: int | None = None):
+    """
+    Name the page the rest of this run belongs to (after routing).
+    `budget` overrides DB_QUERY_BUDGET for this run.
+    """
+    _local.page = page
+    if budget is not None:
+        _local.budget = budget
+
+
+def current_run() -> tuple[int | None, str]:
+    """(run_id, page) of this thread, or (None, "background")."""
+    return getattr(_local, "run_id", None), getattr(_local, "page", "background")
+
+
+# -------------------------------------------------------------------
+# Request classification
+# -------------------------------------------------------------------
+def _operation(request) -> str:
+    method = request.method.upper()
+    if "/rest/v1/" not in request.url.path:
+        return method.lower()
+    if method == "POST" and "merge-duplicates" in request.headers.get("prefer", ""):
+        return "upsert"
+    return {
+        "GET": "select",
+        "HEAD": "count",
+        "POST": "insert",
+        "PATCH": "update",
+        "DELETE": "delete",
+    }.get(method, method.lower())
+
+
+def _table(path: str) -> str:
+    """"/rest/v1/students" -> "students"; auth/storage paths keep a prefix."""
+    parts = [p for p in path.split("/") if p]
+    if parts[:2] == ["rest", "v1"]:
+        rest = parts[2:]
+        return f"rpc:{rest[1]}" if rest[:1] == ["rpc"] and len(rest) > 1 else "/".join(rest)
+    if len(parts) >= 2 and parts[1] == "v1":
+        parts = [parts[0]] + parts[2:]
+    return ":".join(["{id}" if _ID_SEGMENT.match(p) else p for p in parts]) or "/"
+
+
+def filter_shape(params) -> str:
+    """Filter columns and operators without values, e.g. "class_id=eq&term=eq"."""
+    shape = []
+    for key, value in params.multi_items():
+        if key in MODIFIER_PARAMS:
+            shape.append(key)
+        else:
+            shape.append(f"{key}={value.split('.', 1)[0]}")
+    return "&".join(shape)
+
+
+def _rows(response) -> int | None:
+    # PostgREST reports the returned range, e.g. "0-24/*" or "*/0"
+    content_range = response.headers.get("content-range", "")
+    span = content_range.split("/", 1)[0]
+    if "-" in span:
+        first, last = span.split("-", 1)
+        if first.isdigit() and last.isdigit():
+            return int(last) - int(first) + 1
+    if span == "*" and content_range.endswith("/0"):
+        return 0
+    if "json" in response.headers.get("content-type", ""):
+        try:
+            data = json.loads(response.content)
+        except ValueError:
+            return None
+        return len(data) if isinstance(data, list) else 1
+    return None
+
+
+# -------------------------------------------------------------------
+# Query budget
+# -------------------------------------------------------------------
+def _violation(kind: str, page: str, message: str):
+    _violations.append({"ts": time.time(), "run_id": _local.run_id, "page": page, "kind": kind, "message": message})
+    if _local.strict:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def _is_batch(request) -> bool:
+    # A later page of a paginated read (offset > 0 or a keyset cursor), or
+    # a multi-row write. First pages, .limit(1)/.range(0, 0) lookups and
+    # single-row writes are counted: in a loop they are the N+1 pattern.
+    params = request.url.params
+    offset = params.get("offset", "")
+    if offset.isdigit() and int(offset) > 0:
+        return True
+    start = request.headers.get("range", "").partition("-")[0]
+    if start.isdigit() and int(start) > 0:
+        return True
+    if any(_KEYSET_CURSOR.match(v) for v in params.get_list("or")):
+        return True
+    if request.method in ("POST", "PATCH") and request.content[:1] == b"[":
+        try:
+            return len(json.loads(request.content)) > 1
+        except ValueError:
+            return False
+    return False
+
+
+def check_request(request):
+    """httpx request hook: count this run's requests and enforce the budget."""
+    run_id, page = current_run()
+    if DB_QUERY_BUDGET_MODE == "off" or run_id is None:
+        return
+
+    table, operation = _table(request.url.path), _operation(request)
+    shape = (table, operation, filter_shape(request.url.params))
+    if _is_batch(request):
+        return
+
+    _local.queries += 1
+    _local.shapes[shape] += 1
+
+    # Warn once per run and shape; strict mode stops every further request
+    strict = _local.strict
+    budget = _local.budget
+    if _local.queries == budget + 1 or (strict and _local.queries > budget):
+        _violation("budget", page, f"{page}: more than {budget} database requests in one run")
+
+    repeats = _local.shapes[shape]
+    if repeats == DB_N_PLUS_ONE or (strict and repeats > DB_N_PLUS_ONE):
+        _violation(
+            "n+1", page,
+            f"{page}: {repeats} identical {operation} requests on {table} "
+            f"({shape[2] or 'no filters'}) in one run -- query inside a loop?",
+        )
+
+
+@contextmanager
+def query_budget(budget: int = DB_QUERY_BUDGET, *, page: str = "budget", strict: bool = True):
+    """
+    Run a block as one budgeted run, e.g. in a test or benchmark:
+
+        with query_budget(10, page="results viewer"):
+            load_results(...)
+
+    Raises QueryBudgetExceeded (strict) when the block breaks the budget
+    or repeats a query DB_N_PLUS_ONE times. The thread's previous run is
+    restored afterwards.
+    """
+    saved = dict(_local.__dict__)
+    begin_run(page, strict=strict)
+    _local.budget = budget
+    try:
+        yield
+    finally:
+        _local.__dict__.clear()
+        _local.__dict__.update(saved)
+
+
+def violations(page: str | None = None) -> list[dict]:
+    """Recent budget violations, oldest first."""
+    return [v for v in list(_violations) if page is None or v["page"] == page]
+
+
+def run_query_count() -> int:
+    """Requests made so far in this thread's current run."""
+    return getattr(_local, "queries", 0)
+
+
+# -------------------------------------------------------------------
+# Recording
+# -------------------------------------------------------------------
+def start_timer(request):
+    """httpx request hook: note when the request was sent."""
+    request.extensions["metrics_started"] = time.perf_counter()
+
+
+def record_response(response):
+    """httpx response hook: read the body and record one request."""
+    if not DB_METRICS:
+        return
+    response.read()
+    request = response.request
+    started = request.extensions.get("metrics_started", time.perf_counter())
+    run_id, page = current_run()
+    record = {
+        "ts": time.time(),
+        "run_id": run_id,
+        "page": page,
+        "table": _table(request.url.path),
+        "operation": _operation(request),
+        "shape": filter_shape(request.url.params),
+        "status": response.status_code,
+        "rows": _rows(response),
+        "request_bytes": len(request.content or b""),
+        "response_bytes": len(response.content),
+        "ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+    with _lock:
+        _records.append(record)
+
+
+def recent(run_id: int | None = None, page: str | None = None) -> list[dict]:
+    """Buffered records, oldest first (optionally one run or page only)."""
+    with _lock:
+        records = list(_records)
+    return [
+        r for r in records
+        if (run_id is None or r["run_id"] == run_id) and (page is None or r["page"] == page)
+    ]
+
+
+def clear():
+    with _lock:
+        _records.clear()
+        _violations.clear()
+
+
+def export_jsonl(records: list[dict] | None = None) -> str:
+    """Records as JSON lines (one request per line)."""
+    records = recent() if records is None else records
+    return "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
@@ -0,0 +1,41 @@
+# core/db/pagination.py
+
+
+def escape_like(text: str) -> str:
+    """Escape LIKE/ILIKE wildcards in user input."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _quote(value) -> str:
+    """Quote a value for use inside a PostgREST or=(...) filter."""
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def keyset_page(query, *, sort_column: str, page_size: int, after: tuple | None = None):
+    """
+    Apply keyset pagination to a select query ordered by (sort_column, id).
+
+    `after` is the (sort_value, id) cursor of the last row on the previous
+    page; None starts from the beginning. Unlike offset pagination, the
+    database seeks straight to the cursor, so deep pages cost the same as
+    the first one.
+
+    Returns the query; pass its rows to split_page().
+    """
+    if after is not None:
+        value, row_id = after
+        query = query.or_(
+            f"{sort_column}.gt.{_quote(value)},"
+            f"and({sort_column}.eq.{_quote(value)},id.gt.{_quote(row_id)})"
+        )
+    # One extra row tells us whether there is a next page
+    return query.order(sort_column).order("id").limit(page_size + 1)
+
+
+def split_page(rows: list[dict], *, sort_column: str, page_size: int):
+    """Return (page_rows, next_cursor); next_cursor is None on the last page."""
+    if len(rows) <= page_size:
+        return rows, None
+    page = rows[:page_size]
+    return page, (page[-1][sort_column], page[-1]["id"])
@@ -0,0 +1,783 @@
+# core/db/sqlite_backend.py
+"""
+Local storage backend: the app's tables in a SQLite file, served behind the
+same PostgREST and GoTrue (auth) API as Supabase.
+
+The data modules talk to storage only through supabase-py query builders,
+so the PostgREST request is the storage interface. SQLiteTransport is an
+httpx transport that answers those requests from SQLite instead of the
+network; select DB_BACKEND=sqlite (see core/db/client.py) and the whole
+app -- data modules, auth, close_term.py -- runs locally, with the same
+retry, caching, metrics and query-budget code paths as production. The
+tests and benchmarks/run.py use it in memory; it is the only PostgREST
+emulator in the repo, so filter parsing lives here and nowhere else.
+
+Supported: select with many-to-one embeds, eq/neq/gt/gte/lt/lte/in/is/
+like/ilike, not., or=(...) with and(...), order, limit/offset, single
+object responses, count=exact, insert, upsert (on_conflict), update and
+delete, each request in one transaction. Auth supports password sign-in,
+token refresh, sign-out and the admin user endpoints the app uses.
+"""
+import hashlib
+import hmac
+import json
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import lru_cache
+
+import httpx
+
+# Same shape as a Postgres gen_random_uuid() value
+_UUID_SQL = (
+    "lower(hex(randomblob(4)) || '-' || hex(randomblob(2)) || '-4' || substr(hex(randomblob(2)), 2) || '-' || "
+    "substr('89ab', 1 + (abs(random()) % 4), 1) || substr(hex(randomblob(2)), 2) || '-' || hex(randomblob(6)))"
+)
+# Column type -> SQLite declaration ("any" keeps whatever Python type was stored)
+_SQL_TYPES = {
+    "uuid": f"TEXT PRIMARY KEY NOT NULL DEFAULT ({_UUID_SQL})",
+    "serial": "INTEGER PRIMARY KEY AUTOINCREMENT",
+    "text": "TEXT",
+    "int": "INTEGER",
+    "numeric": "NUMERIC",
+    "bool": "INTEGER",
+    "json": "TEXT",
+    "any": "",
+}
+
+# -------------------------------------------------------------------
+# Schema
+# -------------------------------------------------------------------
+TABLES = {
+    "classes": {"id": "uuid", "class_name": "text", "academic_level": "text"},
+    "students": {"id": "uuid", "full_name": "text", "assigned_class": "text"},
+    "subjects": {"id": "uuid", "subject_name": "text", "subject_type": "text"},
+    "class_subjects": {"id": "uuid", "class_id": "text", "subject_id": "text"},
+    "class_subject_order": {"id": "uuid", "class_id": "text", "subject_id": "text", "sort_order": "int"},
+    "score_settings": {
+        "id": "uuid", "academic_level": "text", "has_components": "bool", "class_weight": "numeric",
+        "exam_weight": "numeric", "max_class_score": "numeric", "max_exam_score": "numeric",
+    },
+    "grading_scales": {"id": "uuid", "min_score": "numeric", "max_score": "numeric", "grade": "any", "remark": "text"},
+    "final_grading_scales": {
+        "id": "uuid", "level": "text", "min_value": "numeric", "max_value": "numeric",
+        "final_grade": "text", "remark": "text", "descriptor": "text",
+    },
+    "conduct_settings": {"id": "serial", "conduct_name": "text"},
+    "interest_settings": {"id": "serial", "interest_name": "text"},
+    "student_conduct_interest": {
+        "id": "uuid", "student_id": "text", "class_id": "text", "term": "int", "academic_year": "text",
+        "conduct_id": "int", "interest_id": "int", "attendance": "int",
+    },
+    "student_scores": {
+        "id": "uuid", "student_id": "text", "class_id": "text", "subject_id": "text", "academic_level": "text",
+        "term": "int", "academic_year": "text", "class_score": "numeric", "exam_score": "numeric",
+        "weighted_class_score": "numeric", "weighted_exam_score": "numeric", "total_score": "numeric",
+        "grade": "any", "remark": "text", "position": "int",
+    },
+    "student_final_results": {
+        "id": "uuid", "student_id": "text", "class_id": "text", "term": "int", "academic_year": "text",
+        "level": "text", "grand_total": "numeric", "aggregate": "numeric", "final_grade": "text",
+        "descriptor": "text", "remark": "text", "position": "int",
+    },
+    "profiles": {
+        "id": "uuid", "auth_user_id": "text", "full_name": "text", "email": "text",
+        "role": "text", "assigned_classes": "json",
+    },
+}
+# Foreign key column -> referenced table; resolves embeds such as
+# "subjects(subject_name)" (by table) or "subject_id(subject_name)" (by column)
+FOREIGN_KEYS = {
+    "class_subjects": {"class_id": "classes", "subject_id": "subjects"},
+    "class_subject_order": {"class_id": "classes", "subject_id": "subjects"},
+    "student_conduct_interest": {
+        "student_id": "students", "class_id": "classes",
+        "conduct_id": "conduct_settings", "interest_id": "interest_settings",
+    },
+    "student_scores": {"student_id": "students", "class_id": "classes", "subject_id": "subjects"},
+    "student_final_results": {"student_id": "students", "class_id": "classes"},
+    "profiles": {},
+}
+# Unique keys (the on_conflict targets of the app's upserts) and indexes
+# for the filters and sort orders the data modules use
+UNIQUE_KEYS = {
+    "classes": [("class_name",)],
+    "subjects": [("subject_name",)],
+    "class_subjects": [("class_id", "subject_id")],
+    "class_subject_order": [("class_id", "subject_id")],
+    "score_settings": [("academic_level",)],
+    "student_conduct_interest": [("student_id", "class_id", "academic_year", "term")],
+    "student_scores": [("student_id", "subject_id", "academic_year", "term")],
+    "student_final_results": [("student_id", "class_id", "academic_year", "term")],
+    "profiles": [("auth_user_id",)],
+}
+INDEXES = {
+    "classes": [("academic_level", "class_name")],
+    "students": [("assigned_class", "full_name"), ("full_name", "id")],
+    "class_subject_order": [("class_id", "sort_order")],
+    "conduct_settings": [("conduct_name",)],
+    "interest_settings": [("interest_name",)],
+    "student_conduct_interest": [("class_id", "academic_year", "term")],
+    "student_scores": [("class_id", "academic_year", "term"), ("subject_id",)],
+    "student_final_results": [("class_id", "academic_year", "term")],
+    "profiles": [("role", "full_name"), ("email",)],
+}
+_AUTH_SCHEMA = """
+CREATE TABLE IF NOT EXISTS auth_users (
+    id TEXT PRIMARY KEY NOT NULL,
+    email TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    password_hash TEXT NOT NULL,
+    user_metadata TEXT NOT NULL DEFAULT '{}',
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    email_confirmed_at TEXT,
+    last_sign_in_at TEXT
+);
+CREATE TABLE IF NOT EXISTS auth_sessions (
+    access_token TEXT PRIMARY KEY NOT NULL,
+    refresh_token TEXT NOT NULL UNIQUE,
+    user_id TEXT NOT NULL,
+    expires_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_auth_sessions_user_id ON auth_sessions (user_id);
+"""
+
+
+def schema_sql() -> str:
+    """CREATE TABLE / INDEX statements for every table (idempotent)."""
+    statements = []
+    for table, columns in TABLES.items():
+        body = ",\n    ".join(f'"{name}" {_SQL_TYPES[kind]}'.rstrip() for name, kind in columns.items())
+        statements.append(f'CREATE TABLE IF NOT EXISTS "{table}" (\n    {body}\n);')
+    for unique, spec in ((True, UNIQUE_KEYS), (False, INDEXES)):
+        for table, keys in spec.items():
+            for key in keys:
+                name = f"{'uq' if unique else 'idx'}_{table}_{'_'.join(key)}"
+                columns = ", ".join(f'"{c}"' for c in key)
+                statements.append(
+                    f'CREATE {"UNIQUE " if unique else ""}INDEX IF NOT EXISTS "{name}" ON "{table}" ({columns});'
+                )
+    return "\n".join(statements) + _AUTH_SCHEMA
+
+
+# -------------------------------------------------------------------
+# PostgREST filter parsing
+# -------------------------------------------------------------------
+# Query parameters that shape a request but are not filters (also used by
+# core.db.metrics for filter shapes, so the two never disagree)
+MODIFIER_PARAMS = frozenset({"select", "order", "limit", "offset", "on_conflict", "columns"})
+_OPERATORS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+# Host parameter limit of SQLite >= 3.32 (999 before)
+_MAX_VARIABLES = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+
+
+class ApiError(Exception):
+    """A request the backend rejects, answered like PostgREST would."""
+
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+def _split_top_level(text: str, sep: str = ",") -> list[str]:
+    """Split on `sep` outside parentheses and double quotes."""
+    parts, depth, quoted, escaped, current = [], 0, False, False, []
+    for ch in text:
+        if escaped:
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        if ch == sep and depth == 0 and not quoted:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+    if current:
+        parts.append("".join(current))
+    return parts
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return re.sub(r"\\(.)", r"\1", value[1:-1])
+    return value
+
+
+@lru_cache(maxsize=256)
+def _like_regex(pattern: str, ignore_case: bool) -> re.Pattern:
+    """LIKE pattern (% or * wildcards, backslash escapes) as a regex."""
+    regex, chars = [], iter(pattern)
+    for ch in chars:
+        if ch == "\\":
+            regex.append(re.escape(next(chars, "")))
+        elif ch in "*%":
+            regex.append(".*")
+        elif ch == "_":
+            regex.append(".")
+        else:
+            regex.append(re.escape(ch))
+    return re.compile("".join(regex), (re.IGNORECASE if ignore_case else 0) | re.DOTALL)
+
+
+def _regexp(pattern: str, value) -> bool:
+    # SQLite calls regexp(pattern, value) for `value REGEXP pattern`;
+    # a leading "i:" marks a case-insensitive (ilike) pattern
+    if value is None:
+        return False
+    ignore_case, _, pattern = pattern.partition(":")
+    return _like_regex(pattern, ignore_case == "i").fullmatch(str(value)) is not None
+
+
+def _column(table: str, name: str) -> str:
+    if name not in TABLES[table]:
+        raise ApiError(400, "42703", f"column {table}.{name} does not exist")
+    return f'"{name}"'
+
+
+def _coerce(table: str, column: str, raw: str):
+    """Convert a filter value to the column's type."""
+    value = _unquote(raw)
+    kind = TABLES[table][column]
+    if kind == "bool":
+        return 1 if value.lower() in ("true", "t", "1") else 0
+    if kind in ("int", "serial", "numeric", "any"):
+        for convert in (int, float):
+            try:
+                return convert(value)
+            except ValueError:
+                pass
+    return value
+
+
+def _predicate(table: str, column: str, expression: str) -> tuple[str, list]:
+    """SQL for one `column=op.value` filter (op may be negated with not.)."""
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    op, _, raw = expression.partition(".")
+    col = _column(table, column)
+
+    if op == "is":
+        checks = {"null": "IS NULL", "true": "= 1", "false": "= 0"}
+        if raw.lower() not in checks:
+            raise ApiError(400, "PGRST100", f"unsupported is. value: {raw}")
+        sql, args = f"{col} {checks[raw.lower()]}", []
+    elif op == "in":
+        items = [_coerce(table, column, v) for v in _split_top_level(raw[1:-1])] if raw[1:-1] else []
+        sql, args = (f"{col} IN ({', '.join('?' * len(items))})", items) if items else ("0", [])
+    elif op in ("like", "ilike"):
+        sql, args = f"{col} REGEXP ?", [f"{'i' if op == 'ilike' else 'c'}:{raw}"]
+    elif op in _OPERATORS:
+        sql, args = f"{col} {_OPERATORS[op]} ?", [_coerce(table, column, raw)]
+    else:
+        raise ApiError(400, "PGRST100", f"unsupported operator: {op}")
+    return (f"NOT ({sql})", args) if negate else (sql, args)
+
+
+def _logic(table: str, expression: str, joiner: str) -> tuple[str, list]:
+    """SQL for or=(...) / and(...) groups."""
+    clauses, args = [], []
+    for part in _split_top_level(expression[1:-1]):
+        if part.startswith(("and(", "or(")):
+            name, _, inner = part.partition("(")
+            sql, part_args = _logic(table, "(" + inner, name.upper())
+        else:
+            column, _, rest = part.partition(".")
+            sql, part_args = _predicate(table, column, rest)
+        clauses.append(f"({sql})")
+        args += part_args
+    return f" {joiner} ".join(clauses) or "1", args
+
+
+def _where(table: str, params) -> tuple[str, list]:
+    clauses, args = [], []
+    for key, expression in params.multi_items():
+        if key in MODIFIER_PARAMS:
+            continue
+        if key in ("or", "and"):
+            sql, part_args = _logic(table, expression, key.upper())
+        else:
+            sql, part_args = _predicate(table, key, expression)
+        clauses.append(f"({sql})")
+        args += part_args
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), args
+
+
+def _order_by(table: str, params) -> str:
+    terms = []
+    for term in (t for value in params.get_list("order") for t in value.split(",") if t):
+        column, *modifiers = term.split(".")
+        desc = "desc" in modifiers
+        # Postgres defaults: NULLS LAST ascending, NULLS FIRST descending
+        nulls_first = "nullsfirst" in modifiers or (desc and "nullslast" not in modifiers)
+        order = f"{_column(table, column)} {'DESC' if desc else 'ASC'}"
+        # Primary keys are never null; leaving NULLS out lets an index supply the order
+        if TABLES[table][column] not in ("uuid", "serial"):
+            order += f" NULLS {'FIRST' if nulls_first else 'LAST'}"
+        terms.append(order)
+    return " ORDER BY " + ", ".join(terms) if terms else ""
+
+
+def _parse_select(select: str | None) -> list[tuple[str, str, str | None]]:
+    """(output name, column or embed name, embedded select or None) per field."""
+    fields = []
+    for field in _split_top_level(re.sub(r"\s+", "", select or "*")):
+        name, _, inner = field.partition("(")
+        alias, _, source = name.rpartition(":")
+        fields.append((alias or source, source, inner[:-1] if inner else None))
+    return fields
+
+
+def _relation(table: str, name: str) -> tuple[str, str]:
+    """(foreign key column, target table) of an embed."""
+    keys = FOREIGN_KEYS.get(table, {})
+    if name in keys:
+        return name, keys[name]
+    for column, target in keys.items():
+        if target == name:
+            return column, target
+    raise ApiError(400, "PGRST200", f"Could not find a relationship between '{table}' and '{name}'")
+
+
+# -------------------------------------------------------------------
+# Auth helpers
+# -------------------------------------------------------------------
+SESSION_SECONDS = 12 * 3600
+_PBKDF2_ITERATIONS = 120_000
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def hash_password(password: str) -> str:
+    salt = secrets.token_bytes(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, _PBKDF2_ITERATIONS)
+    return f"pbkdf2_sha256${_PBKDF2_ITERATIONS}${salt.hex()}${digest.hex()}"
+
+
+def check_password(password: str, stored: str) -> bool:
+    try:
+        _, iterations, salt, digest = stored.split("$")
+    except ValueError:
+        return False
+    candidate = hashlib.pbkdf2_hmac("sha256", password.encode(), bytes.fromhex(salt), int(iterations))
+    return hmac.compare_digest(candidate.hex(), digest)
+
+
+def _auth_error(status: int, error_code: str, message: str) -> httpx.Response:
+    return httpx.Response(status, json={"code": status, "error_code": error_code, "msg": message})
+
+
+# -------------------------------------------------------------------
+# Transport
+# -------------------------------------------------------------------
+class SQLiteTransport(httpx.BaseTransport):
+    """
+    Serve the app's PostgREST and auth requests from a SQLite database.
+
+        transport = SQLiteTransport("school.db")
+        use_http_transport(transport)   # or DB_BACKEND=sqlite
+
+    Requests from every thread share one connection, one at a time; file
+    databases use WAL so a second process (e.g. close_term.py next to the
+    running app) can read while one writes.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.create_function("regexp", 2, _regexp, deterministic=True)
+        self._conn.execute("PRAGMA busy_timeout = 5000")
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(schema_sql())
+        self._conn.execute("PRAGMA optimize")
+
+    # -------------------------------------------------
+    # Data
+    # -------------------------------------------------
+    def load(self, table: str, rows: list[dict]):
+        """Insert rows directly (seeding, migrations from an export)."""
+        with self._lock, self._transaction():
+            self._insert(table, rows)
+
+    def rows(self, table: str) -> list[dict]:
+        with self._lock:
+            return self._decode(table, self._conn.execute(f'SELECT * FROM "{table}"').fetchall())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        """One request, one transaction (like PostgREST)."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _decode(table: str, rows) -> list[dict]:
+        columns = TABLES.get(table, {})
+        decoded = []
+        for row in rows:
+            row = dict(row)
+            for name, value in row.items():
+                if value is None:
+                    continue
+                if columns.get(name) == "bool":
+                    row[name] = bool(value)
+                elif columns.get(name) == "json":
+                    row[name] = json.loads(value)
+            decoded.append(row)
+        return decoded
+
+    @staticmethod
+    def _encode(table: str, row: dict) -> dict:
+        encoded = {}
+        for name, value in row.items():
+            if name not in TABLES[table]:
+                raise ApiError(400, "PGRST204", f"Could not find the '{name}' column of '{table}' in the schema cache")
+            if TABLES[table][name] == "json" and value is not None:
+                value = json.dumps(value)
+            encoded[name] = value
+        return encoded
+
+    # -------------------------------------------------
+    # Reads
+    # -------------------------------------------------
+    def _select(self, table: str, params, prefer: str) -> tuple[list[dict], str]:
+        fields = _parse_select(params.get("select"))
+        where, args = _where(table, params)
+
+        columns = set()
+        for _, source, inner in fields:
+            columns.add(source if inner is None else _relation(table, source)[0])
+        if "*" in columns:
+            projection = "*"
+        else:
+            projection = ", ".join(_column(table, c) for c in sorted(columns))
+
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", -1))
+        rows = self._decode(table, self._conn.execute(
+            f'SELECT {projection} FROM "{table}"{where}{_order_by(table, params)} LIMIT ? OFFSET ?',
+            args + [limit, offset],
+        ).fetchall())
+        body = self._project(table, rows, fields)
+
+        if "count=exact" in prefer:
+            total = str(self._conn.execute(f'SELECT COUNT(*) FROM "{table}"{where}', args).fetchone()[0])
+        else:
+            total = "*" if body else "0"
+        span = f"{offset}-{offset + len(body) - 1}" if body else "*"
+        return body, f"{span}/{total}"
+
+    def _project(self, table: str, rows: list[dict], fields) -> list[dict]:
+        for _, source, inner in fields:
+            if inner is None and source != "*":
+                _column(table, source)
+
+        # One query per embed, not per row
+        embedded = {}
+        for name, source, inner in fields:
+            if inner is None:
+                continue
+            fk, target = _relation(table, source)
+            ids = list({row[fk] for row in rows if row.get(fk) is not None})
+            related = {}
+            for start in range(0, len(ids), _MAX_VARIABLES):
+                chunk = ids[start:start + _MAX_VARIABLES]
+                found = self._decode(target, self._conn.execute(
+                    f'SELECT * FROM "{target}" WHERE "id" IN ({", ".join("?" * len(chunk))})', chunk
+                ).fetchall())
+                for row, projected in zip(found, self._project(target, found, _parse_select(inner))):
+                    related[row["id"]] = projected
+            embedded[name] = (fk, related)
+
+        result = []
+        for row in rows:
+            out = {}
+            for name, source, inner in fields:
+                if inner is not None:
+                    fk, related = embedded[name]
+                    out[name] = related.get(row.get(fk))
+                elif source == "*":
+                    out.update(row)
+                else:
+                    out[name] = row.get(source)
+            result.append(out)
+        return result
+
+    # -------------------------------------------------
+    # Writes
+    # -------------------------------------------------
+    def _insert(self, table: str, rows: list[dict], conflict: list[str] | None = None,
+                ignore_duplicates: bool = False) -> list[dict]:
+        # Rows with the same columns go in multi-row INSERTs; columns a row
+        # leaves out get their defaults, as with PostgREST
+        groups: dict[tuple, list[dict]] = {}
+        for row in rows:
+            row = self._encode(table, row)
+            groups.setdefault(tuple(row), []).append(row)
+
+        saved = []
+        for columns, group in groups.items():
+            if not columns:
+                for _ in group:
+                    saved += self._conn.execute(f'INSERT INTO "{table}" DEFAULT VALUES RETURNING *').fetchall()
+                continue
+
+            names = ", ".join(_column(table, c) for c in columns)
+            placeholders = "(" + ", ".join("?" * len(columns)) + ")"
+            on_conflict = ""
+            if conflict:
+                target = ", ".join(_column(table, c) for c in conflict)
+                updates = [c for c in columns if c not in conflict]
+                if ignore_duplicates or not updates:
+                    on_conflict = f" ON CONFLICT ({target}) DO NOTHING"
+                else:
+                    assignments = ", ".join(f'"{c}" = excluded."{c}"' for c in updates)
+                    on_conflict = f" ON CONFLICT ({target}) DO UPDATE SET {assignments}"
+
+            per_statement = max(1, _MAX_VARIABLES // len(columns))
+            for start in range(0, len(group), per_statement):
+                chunk = group[start:start + per_statement]
+                args = [row[c] for row in chunk for c in columns]
+                saved += self._conn.execute(
+                    f'INSERT INTO "{table}" ({names}) VALUES {", ".join([placeholders] * len(chunk))}'
+                    f"{on_conflict} RETURNING *",
+                    args,
+                ).fetchall()
+        return self._decode(table, saved)
+
+    def _update(self, table: str, changes: dict, params) -> list[dict]:
+        changes = self._encode(table, changes)
+        if not changes:
+            raise ApiError(400, "PGRST102", "Empty update body")
+        where, args = _where(table, params)
+        assignments = ", ".join(f"{_column(table, c)} = ?" for c in changes)
+        return self._decode(table, self._conn.execute(
+            f'UPDATE "{table}" SET {assignments}{where} RETURNING *', list(changes.values()) + args
+        ).fetchall())
+
+    def _delete(self, table: str, params) -> list[dict]:
+        where, args = _where(table, params)
+        return self._decode(table, self._conn.execute(f'DELETE FROM "{table}"{where} RETURNING *', args).fetchall())
+
+    # -------------------------------------------------
+    # PostgREST
+    # -------------------------------------------------
+    def _rest(self, request: httpx.Request, table: str) -> httpx.Response:
+        if table not in TABLES:
+            raise ApiError(404, "42P01", f'relation "public.{table}" does not exist')
+        params = request.url.params
+        prefer = request.headers.get("prefer", "")
+
+        if request.method in ("GET", "HEAD"):
+            body, content_range = self._select(table, params, prefer)
+            headers = {"content-range": content_range}
+            if "vnd.pgrst.object" in request.headers.get("accept", ""):
+                if len(body) != 1:
+                    raise ApiError(406, "PGRST116", "JSON object requested, multiple (or no) rows returned")
+                return httpx.Response(200, json=body[0], headers=headers)
+            return httpx.Response(200, json=body, headers=headers)
+
+        with self._transaction():
+            if request.method == "POST":
+                payload = json.loads(request.content or b"[]")
+                rows = payload if isinstance(payload, list) else [payload]
+                upsert = "resolution=" in prefer
+                conflict = params.get("on_conflict", "id").split(",") if upsert else None
+                saved = self._insert(table, rows, conflict, "ignore-duplicates" in prefer)
+                status = 201
+            elif request.method == "PATCH":
+                saved, status = self._update(table, json.loads(request.content or b"{}"), params), 200
+            elif request.method == "DELETE":
+                saved, status = self._delete(table, params), 200
+            else:
+                raise ApiError(405, "PGRST117", f"Unsupported HTTP method: {request.method}")
+
+        if "return=representation" not in prefer:
+            return httpx.Response(status if status == 201 else 204)
+        return httpx.Response(status, json=saved)
+
+    # -------------------------------------------------
+    # Auth (GoTrue)
+    # -------------------------------------------------
+    def _user_json(self, user) -> dict:
+        return {
+            "id": user["id"],
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": user["email"],
+            "app_metadata": {"provider": "email", "providers": ["email"]},
+            "user_metadata": json.loads(user["user_metadata"]),
+            "created_at": user["created_at"],
+            "updated_at": user["updated_at"],
+            "email_confirmed_at": user["email_confirmed_at"],
+            "confirmed_at": user["email_confirmed_at"],
+            "last_sign_in_at": user["last_sign_in_at"],
+            "identities": [],
+            "is_anonymous": False,
+        }
+
+    def _find_user(self, column: str, value: str):
+        return self._conn.execute(f"SELECT * FROM auth_users WHERE {column} = ?", [value]).fetchone()
+
+    def _session(self, user) -> dict:
+        access_token, refresh_token = secrets.token_urlsafe(32), secrets.token_urlsafe(32)
+        expires_at = int(time.time()) + SESSION_SECONDS
+        self._conn.execute(
+            "INSERT INTO auth_sessions (access_token, refresh_token, user_id, expires_at) VALUES (?, ?, ?, ?)",
+            [access_token, refresh_token, user["id"], expires_at],
+        )
+        return {
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+            "token_type": "bearer",
+            "expires_in": SESSION_SECONDS,
+            "expires_at": expires_at,
+            "user": self._user_json(user),
+        }
+
+    def _bearer_user(self, request: httpx.Request):
+        token = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+        return self._conn.execute(
+            "SELECT u.* FROM auth_sessions s JOIN auth_users u ON u.id = s.user_id "
+            "WHERE s.access_token = ? AND s.expires_at > ?",
+            [token, int(time.time())],
+        ).fetchone()
+
+    def _save_user(self, user_id: str | None, body: dict):
+        now = _now()
+        if user_id is None:
+            user_id = self._conn.execute(f"SELECT {_UUID_SQL}").fetchone()[0]
+            self._conn.execute(
+                "INSERT INTO auth_users (id, email, password_hash, user_metadata, created_at, updated_at, "
+                "email_confirmed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [user_id, body["email"].strip(), hash_password(body["password"]),
+                 json.dumps(body.get("user_metadata") or {}), now, now,
+                 now if body.get("email_confirm") else None],
+            )
+        else:
+            changes = {"updated_at": now}
+            if body.get("email"):
+                changes["email"] = body["email"].strip()
+            if body.get("password"):
+                changes["password_hash"] = hash_password(body["password"])
+            if "user_metadata" in body:
+                changes["user_metadata"] = json.dumps(body["user_metadata"] or {})
+            assignments = ", ".join(f"{c} = ?" for c in changes)
+            self._conn.execute(f"UPDATE auth_users SET {assignments} WHERE id = ?", list(changes.values()) + [user_id])
+        return self._find_user("id", user_id)
+
+    def _auth(self, request: httpx.Request, path: list[str]) -> httpx.Response:
+        body = json.loads(request.content or b"{}") if request.method in ("POST", "PUT") else {}
+        route = (request.method, path[0] if path else "")
+
+        with self._transaction():
+            if route == ("POST", "token"):
+                grant = request.url.params.get("grant_type")
+                if grant == "password":
+                    user = self._find_user("email", (body.get("email") or "").strip())
+                    if user is None or not check_password(body.get("password") or "", user["password_hash"]):
+                        return _auth_error(400, "invalid_credentials", "Invalid login credentials")
+                    self._conn.execute("UPDATE auth_users SET last_sign_in_at = ? WHERE id = ?", [_now(), user["id"]])
+                    return httpx.Response(200, json=self._session(self._find_user("id", user["id"])))
+                if grant == "refresh_token":
+                    session = self._conn.execute(
+                        "DELETE FROM auth_sessions WHERE refresh_token = ? RETURNING user_id", [body.get("refresh_token")]
+                    ).fetchone()
+                    user = session and self._find_user("id", session["user_id"])
+                    if not user:
+                        return _auth_error(400, "refresh_token_not_found", "Invalid Refresh Token: Refresh Token Not Found")
+                    return httpx.Response(200, json=self._session(user))
+                return _auth_error(400, "validation_failed", f"Unsupported grant type: {grant}")
+
+            if route == ("POST", "logout"):
+                user = self._bearer_user(request)
+                if user is not None:
+                    self._conn.execute("DELETE FROM auth_sessions WHERE user_id = ?", [user["id"]])
+                return httpx.Response(204)
+
+            if route == ("GET", "user"):
+                user = self._bearer_user(request)
+                if user is None:
+                    return _auth_error(401, "bad_jwt", "invalid JWT: unable to parse or verify signature")
+                return httpx.Response(200, json=self._user_json(user))
+
+            if path[:1] == ["admin"] and path[1:2] == ["users"]:
+                user_id = path[2] if len(path) > 2 else None
+                if request.method == "GET" and user_id is None:
+                    users = self._conn.execute("SELECT * FROM auth_users ORDER BY created_at").fetchall()
+                    return httpx.Response(200, json={"users": [self._user_json(u) for u in users], "aud": "authenticated"})
+                if request.method == "POST" and user_id is None:
+                    if not body.get("email") or not body.get("password"):
+                        return _auth_error(422, "validation_failed", "Email and password are required")
+                    if self._find_user("email", body["email"].strip()) is not None:
+                        return _auth_error(
+                            422, "email_exists", "A user with this email address has already been registered"
+                        )
+                    return httpx.Response(200, json=self._user_json(self._save_user(None, body)))
+                if user_id is None or self._find_user("id", user_id) is None:
+                    return _auth_error(404, "user_not_found", "User not found")
+                if request.method == "GET":
+                    return httpx.Response(200, json=self._user_json(self._find_user("id", user_id)))
+                if request.method == "PUT":
+                    return httpx.Response(200, json=self._user_json(self._save_user(user_id, body)))
+                if request.method == "DELETE":
+                    self._conn.execute("DELETE FROM auth_sessions WHERE user_id = ?", [user_id])
+                    self._conn.execute("DELETE FROM auth_users WHERE id = ?", [user_id])
+                    return httpx.Response(200, json={})
+
+        return _auth_error(404, "not_found", f"not supported: {request.method} /auth/v1/{'/'.join(path)}")
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        parts = [p for p in request.url.path.split("/") if p]
+        with self._lock:
+            try:
+                if parts[:2] == ["rest", "v1"] and len(parts) == 3:
+                    return self._rest(request, parts[2])
+                if parts[:2] == ["auth", "v1"]:
+                    return self._auth(request, parts[2:])
+                raise ApiError(404, "PGRST125", f"not supported: {request.url.path}")
+            except ApiError as e:
+                return httpx.Response(e.status, json={"code": e.code, "message": e.message, "details": None, "hint": None})
+            except sqlite3.IntegrityError as e:
+                # Postgres error codes, so callers can tell duplicates apart
+                code = "23505" if "UNIQUE" in str(e) else "23502" if "NOT NULL" in str(e) else "23000"
+                return httpx.Response(409 if code == "23505" else 400, json={
+                    "code": code, "message": str(e), "details": None, "hint": None,
+                })
+            except sqlite3.Error as e:
+                return httpx.Response(500, json={"code": "XX000", "message": str(e), "details": None, "hint": None})
+
+
+@lru_cache(maxsize=None)
+def local_transport(path: str) -> SQLiteTransport:
+    """The process-wide transport for a database file."""
+    return SQLiteTransport(path)
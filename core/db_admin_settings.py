@@ -1,39 +1,18 @@
 # core/db_admin_settings.py
-from supabase import Client, create_client
-import os
-from dotenv import load_dotenv
 import streamlit as st
-import httpx
+from core.db import supabase, safe_execute as _safe_execute, cached_read, invalidates
 
-# Load environment variables
-load_dotenv()
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_SERVICE_ROLE_KEY"]
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-# -----------------------------
-# Internal helper for safe requests
-# -----------------------------
-def _safe_execute(request):
-    try:
-        resp = request.execute()
-        return resp.data or []
-    except httpx.ConnectError:
-        st.warning("⚠️ Unable to reach database — check your internet connection.")
-        return []
-    except Exception as e:
-        st.error(f"⚠️ Database error: {str(e)}")
-        return []
 
 # -----------------------------
 # Conduct CRUD
 # -----------------------------
+@cached_read("conduct_settings")
 def get_all_conduct():
     return _safe_execute(
         supabase.table("conduct_settings").select("*").order("conduct_name")
     )
 
+@invalidates("conduct_settings")
 def add_conduct(conduct_name: str):
     name = conduct_name.strip()
     if not name:
@@ -51,11 +30,13 @@ def add_conduct(conduct_name: str):
     )
 
 
+@invalidates("conduct_settings")
 def update_conduct(conduct_id: int, conduct_name: str):
     return _safe_execute(
         supabase.table("conduct_settings").update({"conduct_name": conduct_name.strip()}).eq("id", conduct_id)
     )
 
+@invalidates("conduct_settings")
 def delete_conduct(conduct_id: int):
     return _safe_execute(
         supabase.table("conduct_settings").delete().eq("id", conduct_id)
@@ -64,11 +45,13 @@ def delete_conduct(conduct_id: int):
 # -----------------------------
 # Interest CRUD
 # -----------------------------
+@cached_read("interest_settings")
 def get_all_interest():
     return _safe_execute(
         supabase.table("interest_settings").select("*").order("interest_name")
     )
 
+@invalidates("interest_settings")
 def add_interest(interest_name: str):
     name = interest_name.strip()
     if not name:
@@ -85,11 +68,13 @@ def add_interest(interest_name: str):
         supabase.table("interest_settings").insert({"interest_name": name})
     )
 
+@invalidates("interest_settings")
 def update_interest(interest_id: int, interest_name: str):
     return _safe_execute(
         supabase.table("interest_settings").update({"interest_name": interest_name.strip()}).eq("id", interest_id)
     )
 
+@invalidates("interest_settings")
 def delete_interest(interest_id: int):
     return _safe_execute(
         supabase.table("interest_settings").delete().eq("id", interest_id)
@@ -1,48 +1,27 @@
 # core/db_classes.py
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
 import streamlit as st
-import httpx
+from core.db import supabase, safe_execute as _safe_execute, cached_read, invalidates
 
-# Load environment variables
-load_dotenv()
-
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_SERVICE_ROLE_KEY"]
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 ACADEMIC_LEVELS = ["Nursery", "KG", "Lower Primary", "Upper Primary", "JHS"]
 
 
-# -------------------------------------------------------------------
-# Internal helper for safe requests
-# -------------------------------------------------------------------
-def _safe_execute(request):
-    try:
-        resp = request.execute()
-        return resp.data or []
-    except httpx.ConnectError:
-        st.warning("⚠️ Unable to reach database — please check your internet connection.")
-        return []
-    except Exception as e:
-        st.error(f"⚠️ Database error: {str(e)}")
-        return []
-
-
 # -------------------------------------------------------------------
 # Classes CRUD
 # -------------------------------------------------------------------
-def get_classes():
+@cached_read("classes")
+def get_classes(raise_errors: bool = False):
+    """All classes; with raise_errors, a failed query raises instead of returning []."""
     return _safe_execute(
         supabase.table("classes")
         .select("*")
         .order("academic_level", desc=False)
-        .order("class_name", desc=False)
+        .order("class_name", desc=False),
+        raise_errors=raise_errors
     )
 
 
+@invalidates("classes")
 def create_class(class_name: str, academic_level: str):
     if academic_level not in ACADEMIC_LEVELS:
         st.error("Invalid academic level selected.")
@@ -57,6 +36,7 @@ def create_class(class_name: str, academic_level: str):
     )
 
 
+@invalidates("classes")
 def update_class(class_id: str, class_name: str, academic_level: str):
     if academic_level not in ACADEMIC_LEVELS:
         st.error("Invalid academic level selected.")
@@ -72,6 +52,7 @@ def update_class(class_id: str, class_name: str, academic_level: str):
     )
 
 
+@invalidates("classes")
 def delete_class(class_id: str):
     return _safe_execute(
         supabase.table("classes")
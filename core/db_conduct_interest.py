@@ -1,38 +1,17 @@
 # core/db_conduct_interest.py
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
 import streamlit as st
-import httpx
+from core.db import supabase, safe_execute as _safe_execute
 
-# Load environment variables
-load_dotenv()
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_SERVICE_ROLE_KEY"]
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-# -------------------------------------------------------------------
-# Internal helper for safe requests
-# -------------------------------------------------------------------
-def _safe_execute(request):
-    try:
-        resp = request.execute()
-        return resp.data or []
-    except httpx.ConnectError:
-        st.warning("⚠️ Unable to reach database — check your internet connection.")
-        return []
-    except Exception as e:
-        st.error(f"⚠️ Database error: {str(e)}")
-        return []
+# Entries are stored per term and academic year, like scores
+CONDUCT_CONFLICT_KEY = "student_id,class_id,academic_year,term"
 
 # -------------------------------------------------------------------
 # Student Conduct/Interest/Attendance CRUD
 # -------------------------------------------------------------------
-def get_student_conduct_interest(student_id=None, class_id=None, term=None):
+def get_student_conduct_interest(student_id=None, class_id=None, term=None, academic_year=None):
     """
     Fetch student conduct/interest/attendance entries.
-    Optional filters: student_id, class_id, term
+    Optional filters: student_id, class_id, term, academic_year
     """
     query = supabase.table("student_conduct_interest").select("*")
     if student_id:
@@ -41,39 +20,54 @@ def get_student_conduct_interest(student_id=None, class_id=None, term=None):
         query = query.eq("class_id", class_id)
     if term:
         query = query.eq("term", term)
+    if academic_year:
+        query = query.eq("academic_year", academic_year)
     return _safe_execute(query)
 
-def save_student_conduct_interest(student_id, class_id, term, conduct_id, interest_id, attendance):
+def save_student_conduct_interest(student_id, class_id, term, academic_year, conduct_id, interest_id, attendance):
+    """
+    Insert or update a student_conduct_interest entry (one upsert).
+    """
+    return save_conduct_interest_bulk(
+        class_id,
+        term,
+        academic_year,
+        [{
+            "student_id": student_id,
+            "conduct_id": conduct_id,
+            "interest_id": interest_id,
+            "attendance": attendance
+        }]
+    )
+
+def save_conduct_interest_bulk(class_id, term, academic_year, entries):
     """
-    Insert or update a student_conduct_interest entry.
+    Insert or update many students' entries for a class, term and academic
+    year in a single upsert on (student_id, class_id, academic_year, term).
+    entries: [{"student_id", "conduct_id", "interest_id", "attendance"}]
     """
-    # Check if entry exists
-    existing = get_student_conduct_interest(student_id, class_id, term)
-    
-    data = {
-        "student_id": student_id,
-        "class_id": class_id,
-        "term": term,
-        "conduct_id": conduct_id,
-        "interest_id": interest_id,
-        "attendance": attendance
-    }
-    
-    if existing:
-        return _safe_execute(
-            supabase.table("student_conduct_interest")
-            .update(data)
-            .eq("student_id", student_id)
-            .eq("class_id", class_id)
-            .eq("term", term)
-        )
-    else:
-        return _safe_execute(
-            supabase.table("student_conduct_interest")
-            .insert(data)
-        )
+    if not entries:
+        return []
+
+    payload = [
+        {
+            "student_id": entry["student_id"],
+            "class_id": class_id,
+            "term": term,
+            "academic_year": academic_year,
+            "conduct_id": entry["conduct_id"],
+            "interest_id": entry["interest_id"],
+            "attendance": entry["attendance"]
+        }
+        for entry in entries
+    ]
+
+    return _safe_execute(
+        supabase.table("student_conduct_interest")
+        .upsert(payload, on_conflict=CONDUCT_CONFLICT_KEY)
+    )
 
-def delete_student_conduct_interest(student_id, class_id, term):
+def delete_student_conduct_interest(student_id, class_id, term, academic_year):
     """
     Delete a student_conduct_interest entry.
     """
@@ -83,4 +77,5 @@ def delete_student_conduct_interest(student_id, class_id, term):
         .eq("student_id", student_id)
         .eq("class_id", class_id)
         .eq("term", term)
+        .eq("academic_year", academic_year)
     )
@@ -1,34 +1,12 @@
 # core/db_final_grading_scales.py
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
 import streamlit as st
-import httpx
+from core.db import supabase, safe_execute as _safe_execute, cached_read, invalidates
 
-load_dotenv()
-
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_SERVICE_ROLE_KEY"]
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-# ---------------------------------------------------
-# Safe execute
-# ---------------------------------------------------
-def _safe_execute(request):
-    try:
-        resp = request.execute()
-        return resp.data or []
-    except httpx.ConnectError:
-        st.warning("⚠️ Unable to reach database.")
-        return []
-    except Exception as e:
-        st.error(f"⚠️ Database error: {e}")
-        return []
 
 # ---------------------------------------------------
 # Final grading scales CRUD
 # ---------------------------------------------------
+@cached_read("final_grading_scales")
 def get_final_grading_scales(level: str):
     return _safe_execute(
         supabase.table("final_grading_scales")
@@ -37,6 +15,7 @@ def get_final_grading_scales(level: str):
         .order("min_value", desc=False)
     )
 
+@invalidates("final_grading_scales")
 def create_final_grading_scale(
     level: str,
     min_value: int,
@@ -62,6 +41,7 @@ def create_final_grading_scale(
         supabase.table("final_grading_scales").insert(data)
     )
 
+@invalidates("final_grading_scales")
 def update_final_grading_scale(
     scale_id: str,
     min_value: int,
@@ -88,6 +68,7 @@ def update_final_grading_scale(
         .eq("id", scale_id)
     )
 
+@invalidates("final_grading_scales")
 def delete_final_grading_scale(scale_id: str):
     return _safe_execute(
         supabase.table("final_grading_scales")
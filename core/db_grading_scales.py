@@ -1,33 +1,13 @@
 # core/db_grading_scales.py
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
 import streamlit as st
-import httpx
+from core.db import supabase, safe_execute as _safe_execute, cached_read, invalidates
+from core.services.grading_index import GradingIndex
 
-load_dotenv()
-
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_SERVICE_ROLE_KEY"]
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-# -----------------------------
-# Safe execution helper
-# -----------------------------
-def _safe_execute(request):
-    try:
-        resp = request.execute()
-        return resp.data or []
-    except httpx.ConnectError:
-        st.warning("⚠️ Database unreachable.")
-        return []
-    except Exception as e:
-        st.error(f"⚠️ Database error: {e}")
-        return []
 
 # -----------------------------
 # Grading Scales CRUD
 # -----------------------------
+@cached_read("grading_scales")
 def get_grading_scales():
     return _safe_execute(
         supabase.table("grading_scales")
@@ -35,6 +15,7 @@ def get_grading_scales():
         .order("min_score", desc=False)
     )
 
+@invalidates("grading_scales")
 def create_grading_scale(min_score, max_score, grade, remark):
     if min_score > max_score:
         st.error("Min score cannot exceed max score.")
@@ -49,6 +30,7 @@ def create_grading_scale(min_score, max_score, grade, remark):
         })
     )
 
+@invalidates("grading_scales")
 def update_grading_scale(scale_id: str, data: dict):
     return _safe_execute(
         supabase.table("grading_scales")
@@ -56,9 +38,27 @@ def update_grading_scale(scale_id: str, data: dict):
         .eq("id", scale_id)
     )
 
+@invalidates("grading_scales")
 def delete_grading_scale(scale_id: str):
     return _safe_execute(
         supabase.table("grading_scales")
         .delete()
         .eq("id", scale_id)
     )
+
+
+# -----------------------------
+# Grade lookup index
+# -----------------------------
+@cached_read("grading_scales", copy_result=False)
+def get_grading_index() -> GradingIndex:
+    """
+    Build the in-memory grade lookup from grading_scales.
+    Cached until the TTL expires or a grading scale is written.
+    """
+    rows = _safe_execute(
+        supabase.table("grading_scales")
+        .select("min_score, max_score, grade, remark"),
+        raise_errors=True,
+    )
+    return GradingIndex(rows)
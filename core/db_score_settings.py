@@ -1,43 +1,22 @@
 # core/db_score_settings.py
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
 import streamlit as st
-import httpx
+from core.db import supabase, safe_execute as _safe_execute, cached_read, invalidates
 
-load_dotenv()
-
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_SERVICE_ROLE_KEY"]
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 ACADEMIC_LEVELS = ["Nursery", "KG", "Lower Primary", "Upper Primary", "JHS"]
 
 
-# -----------------------------
-# Safe execution helper
-# -----------------------------
-def _safe_execute(request):
-    try:
-        resp = request.execute()
-        return resp.data or []
-    except httpx.ConnectError:
-        st.warning("⚠️ Database unreachable.")
-        return []
-    except Exception as e:
-        st.error(f"⚠️ Database error: {e}")
-        return []
-
-
 # -----------------------------
 # Score Settings CRUD
 # -----------------------------
+@cached_read("score_settings")
 def get_score_settings():
     return _safe_execute(
         supabase.table("score_settings").select("*").order("academic_level")
     )
 
 
+@invalidates("score_settings")
 def create_score_setting(
     academic_level: str,
     has_components: bool,
@@ -64,16 +43,19 @@ def create_score_setting(
     )
 
 
+@invalidates("score_settings")
 def update_score_setting(setting_id: str, data: dict):
     return _safe_execute(
         supabase.table("score_settings").update(data).eq("id", setting_id)
     )
 
 
+@invalidates("score_settings")
 def delete_score_setting(setting_id: str):
     return _safe_execute(supabase.table("score_settings").delete().eq("id", setting_id))
 
 
+@cached_read("score_settings")
 def get_score_setting_for_level(academic_level: str):
     rows = _safe_execute(
         supabase.table("score_settings")
@@ -1,29 +1,10 @@
 # core/db_student_final_results.py
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
-import httpx
 import streamlit as st
+from core.db import supabase, safe_execute as _safe_execute
 
-# Load environment variables
-load_dotenv()
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_SERVICE_ROLE_KEY"]
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# One final result per student, class, academic year and term
+FINAL_RESULT_CONFLICT_KEY = "student_id,class_id,academic_year,term"
 
-# -------------------------------------------------
-# Safe execution helper
-# -------------------------------------------------
-def _safe_execute(request):
-    try:
-        resp = request.execute()
-        return resp.data or []
-    except httpx.ConnectError:
-        st.warning("⚠️ Unable to reach database — check your internet connection.")
-        return []
-    except Exception as e:
-        st.error(f"⚠️ Database error: {str(e)}")
-        return []
 
 # -------------------------------------------------
 # UPSERT FINAL RESULT FOR ONE STUDENT
@@ -32,13 +13,15 @@ def save_final_result(final_result: dict):
     """
     Upsert a final result for a student in a class and term.
     final_result should contain:
-        student_id, class_id, term, level,
+        student_id, class_id, term, academic_year, level,
         grand_total, aggregate, final_grade, descriptor, remark
+    and optionally position.
     """
     payload = {
         "student_id": final_result["student_id"],
         "class_id": final_result["class_id"],
         "term": final_result["term"],
+        "academic_year": final_result["academic_year"],
         "level": final_result["level"],
         "grand_total": final_result.get("grand_total"),
         "aggregate": final_result.get("aggregate"),
@@ -46,47 +29,72 @@ def save_final_result(final_result: dict):
         "descriptor": final_result.get("descriptor"),
         "remark": final_result.get("remark")
     }
+    # Only class-wide generation knows the position; don't wipe it otherwise
+    if "position" in final_result:
+        payload["position"] = final_result["position"]
 
     return _safe_execute(
         supabase.table("student_final_results")
         .upsert(
             payload,
-            on_conflict="student_id,class_id,term"
+            on_conflict=FINAL_RESULT_CONFLICT_KEY
         )
     )
 
 # -------------------------------------------------
 # BULK UPSERT FINAL RESULTS
 # -------------------------------------------------
-def save_final_results_bulk(final_results: list[dict]):
+def save_final_results_bulk(final_results: list[dict], chunk_size: int | None = None):
     """
     Bulk upsert multiple final results.
+    With chunk_size, the payload is sent in requests of at most that many rows.
+    Returns the upserted rows.
     """
     payload = []
     for fr in final_results:
-        payload.append({
+        row = {
             "student_id": fr["student_id"],
             "class_id": fr["class_id"],
             "term": fr["term"],
+            "academic_year": fr["academic_year"],
             "level": fr["level"],
             "grand_total": fr.get("grand_total"),
             "aggregate": fr.get("aggregate"),
             "final_grade": fr.get("final_grade"),
             "descriptor": fr.get("descriptor"),
             "remark": fr.get("remark")
-        })
+        }
+        if "position" in fr:
+            row["position"] = fr["position"]
+        payload.append(row)
 
-    return _safe_execute(
-        supabase.table("student_final_results")
-        .upsert(payload, on_conflict="student_id,class_id,term")
-    )
+    if not payload:
+        return []
+
+    chunk_size = chunk_size or len(payload)
+    saved = []
+    for start in range(0, len(payload), chunk_size):
+        saved.extend(_safe_execute(
+            supabase.table("student_final_results")
+            .upsert(payload[start:start + chunk_size], on_conflict=FINAL_RESULT_CONFLICT_KEY)
+        ))
+    return saved
 
 # -------------------------------------------------
 # FETCH FINAL RESULTS
 # -------------------------------------------------
-def get_final_results(*, student_id: str | None = None, class_id: str | None = None, term: int | None = None):
+def get_final_results(
+    *,
+    student_id: str | None = None,
+    class_id: str | None = None,
+    term: int | None = None,
+    academic_year: str | None = None,
+    raise_errors: bool = False
+):
     """
-    Fetch final results filtered by optional student, class, and term.
+    Fetch final results filtered by optional student, class, term and
+    academic year.
+    With raise_errors, a failed query raises instead of returning [].
     """
     query = supabase.table("student_final_results").select("*")
     
@@ -96,5 +104,7 @@ def get_final_results(*, student_id: str | None = None, class_id: str | None = N
         query = query.eq("class_id", class_id)
     if term:
         query = query.eq("term", term)
+    if academic_year:
+        query = query.eq("academic_year", academic_year)
     
-    return _safe_execute(query)
+    return _safe_execute(query, raise_errors=raise_errors)
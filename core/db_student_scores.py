@@ -1,57 +1,28 @@
 #core/db_student_scores.py
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
-import httpx
+import time
 import streamlit as st
+import numpy as np
+import pandas as pd
+from core.db import supabase, safe_execute
+from core.db_score_settings import get_score_setting_for_level
+from core.db_grading_scales import get_grading_index
+from core.services.dirty_results import mark_dirty
+from utils.validation import require_columns, clean_text_columns, dedupe_key
 
-load_dotenv()
 
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_SERVICE_ROLE_KEY"]
+def _safe_execute(request):
+    return safe_execute(request, raise_errors=True)
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-# -------------------------------------------------
-# Safe execution helper
-# -------------------------------------------------
-def _safe_execute(request):
-    try:
-        resp = request.execute()
-        return resp.data or []
-    except httpx.ConnectError:
-        raise RuntimeError("Database unreachable")
-    except Exception as e:
-        raise RuntimeError(str(e))
-
-# -------------------------------------------------
-# SCORE SETTINGS
-# -------------------------------------------------
-def get_score_setting_for_level(academic_level: str):
-    result = _safe_execute(
-        supabase.table("score_settings")
-        .select("*")
-        .eq("academic_level", academic_level)
-        .limit(1)
-    )
-    return result[0] if result else None
+# Scores are stored per term and academic year
+SCORE_CONFLICT_KEY = "student_id,subject_id,academic_year,term"
+
 
 # -------------------------------------------------
 # GRADING SCALE
 # -------------------------------------------------
 def resolve_grade_and_remark(total_score: float):
-    rows = _safe_execute(
-        supabase.table("grading_scales")
-        .select("grade, remark")
-        .lte("min_score", total_score)
-        .gte("max_score", total_score)
-        .limit(1)
-    )
-
-    if not rows:
-        raise ValueError(f"No grading scale for score {total_score}")
-
-    return rows[0]["grade"], rows[0]["remark"]
+    return get_grading_index().resolve(total_score)
 
 # -------------------------------------------------
 # SCORE COMPUTATION
@@ -99,6 +70,67 @@ def compute_scores(
         "remark": remark
     }
 
+# -------------------------------------------------
+# BATCH SCORE COMPUTATION (WHOLE CLASS / LEVEL)
+# -------------------------------------------------
+def compute_scores_batch(
+    academic_level: str,
+    class_scores,
+    exam_scores
+) -> pd.DataFrame:
+    """
+    Vectorized compute_scores() for many (class_score, exam_score) pairs.
+
+    class_scores / exam_scores are array-likes of equal length (lists,
+    NumPy arrays or DataFrame columns). Returns a DataFrame with
+    weighted_class_score, weighted_exam_score, total_score, grade and
+    remark per row, matching compute_scores() row for row, including its
+    int rounding (round-half-to-even) and int() truncation.
+    """
+    setting = get_score_setting_for_level(academic_level)
+    if not setting:
+        raise ValueError("Score settings not found for academic level")
+
+    index = exam_scores.index if isinstance(exam_scores, pd.Series) else None
+    exam = pd.to_numeric(pd.Series(exam_scores, index=index), errors="coerce").to_numpy(dtype=float)
+
+    # No components (KG, Nursery, JHS): total = int(exam_score or 0)
+    if not setting["has_components"]:
+        total = np.trunc(np.nan_to_num(exam, nan=0.0)).astype(np.int64)
+        grades, remarks = get_grading_index().resolve_many(total)
+
+        return pd.DataFrame({
+            "weighted_class_score": pd.Series([None] * len(total), index=index, dtype=object),
+            "weighted_exam_score": pd.Series([None] * len(total), index=index, dtype=object),
+            "total_score": pd.Series(total, index=index),
+            "grade": pd.Series([int(g) for g in grades], index=index, dtype=np.int64),
+            "remark": pd.Series(remarks, index=index, dtype=object),
+        })
+
+    cls = pd.to_numeric(pd.Series(class_scores, index=index), errors="coerce").to_numpy(dtype=float)
+    if np.isnan(cls).any() or np.isnan(exam).any():
+        raise ValueError("Class and exam scores are required for this academic level")
+
+    # Weighted computation (same operation order as compute_scores)
+    wc = (cls / setting["max_class_score"]) * setting["class_weight"]
+    we = (exam / setting["max_exam_score"]) * setting["exam_weight"]
+    total = wc + we
+
+    # 🔒 FORCE INTEGERS (np.rint rounds half to even, like round())
+    wc_i = np.rint(wc).astype(np.int64)
+    we_i = np.rint(we).astype(np.int64)
+    total_i = np.rint(total).astype(np.int64)
+
+    grades, remarks = get_grading_index().resolve_many(total_i)
+
+    return pd.DataFrame({
+        "weighted_class_score": pd.Series(wc_i, index=index),
+        "weighted_exam_score": pd.Series(we_i, index=index),
+        "total_score": pd.Series(total_i, index=index),
+        "grade": pd.Series([int(g) for g in grades], index=index, dtype=np.int64),
+        "remark": pd.Series(remarks, index=index, dtype=object),
+    })
+
 # -------------------------------------------------
 # UPSERT STUDENT SUBJECT SCORE
 # -------------------------------------------------
@@ -109,7 +141,9 @@ def save_student_subject_score(
     subject_id: str,
     academic_level: str,
     class_score: float | None,
-    exam_score: float | None
+    exam_score: float | None,
+    term: int,
+    academic_year: str
 ):
     computed = compute_scores(
         academic_level,
@@ -122,6 +156,8 @@ def save_student_subject_score(
         "class_id": class_id,
         "subject_id": subject_id,
         "academic_level": academic_level,
+        "term": term,
+        "academic_year": academic_year,
 
         "class_score": class_score,
         "exam_score": exam_score,
@@ -129,67 +165,375 @@ def save_student_subject_score(
         **computed
     }
 
-    return _safe_execute(
+    saved = _safe_execute(
         supabase.table("student_scores")
         .upsert(
             payload,
-            on_conflict="student_id,subject_id"
+            on_conflict=SCORE_CONFLICT_KEY
         )
     )
+    mark_dirty(class_id, term, academic_year, [student_id], [subject_id])
+    return saved
 
 # -------------------------------------------------
 # BULK SAVE (MULTIPLE SUBJECTS AT ONCE)
 # -------------------------------------------------
-def save_student_scores_bulk(
+def validate_score_row(setting: dict, class_score, exam_score) -> str | None:
+    """
+    Check raw scores against the level's score settings.
+    Returns an error message, or None if the scores are valid.
+    """
+    checks = [("Exam score", exam_score, setting["max_exam_score"])]
+    if setting["has_components"]:
+        checks.insert(0, ("Class score", class_score, setting["max_class_score"]))
+
+    for label, value, max_value in checks:
+        if value is None:
+            if setting["has_components"]:
+                return f"{label} is required."
+            continue
+        if not 0 <= value <= max_value:
+            return f"{label} must be between 0 and {max_value}."
+
+    return None
+
+
+def save_class_scores_bulk(
     *,
-    student_id: str,
     class_id: str,
     academic_level: str,
-    subject_scores: list[dict]
+    score_rows: list[dict],
+    term: int,
+    academic_year: str
 ):
     """
-    subject_scores = [
+    score_rows = [
       {
+        "student_id": "...",
         "subject_id": "...",
         "class_score": 30,
         "exam_score": 70
       }
     ]
+
+    Validates and computes every row locally, then saves all valid rows
+    (any mix of students and subjects in the class) in a single upsert,
+    and marks those students' final results for the term as dirty.
+    Returns (saved_rows, errors) where errors is a list of
+    {"student_id": ..., "subject_id": ..., "error": ...} for rows that
+    were not saved.
     """
+    setting = get_score_setting_for_level(academic_level)
+    if not setting:
+        raise ValueError("Score settings not found for academic level")
 
-    payload = []
+    valid_rows = []
+    errors = []
+    for row in score_rows:
+        error = validate_score_row(setting, row.get("class_score"), row.get("exam_score"))
+        if error:
+            errors.append({"student_id": row["student_id"], "subject_id": row["subject_id"], "error": error})
+        else:
+            valid_rows.append(row)
 
-    for row in subject_scores:
-        computed = compute_scores(
+    try:
+        computed = compute_scores_batch(
             academic_level,
-            row.get("class_score"),
-            row.get("exam_score")
-        )
-
-        payload.append({
-            "student_id": student_id,
+            [row.get("class_score") for row in valid_rows],
+            [row.get("exam_score") for row in valid_rows]
+        ).to_dict("records")
+    except ValueError:
+        # A score fell outside the grading scale — find which rows
+        computed = []
+        for row in list(valid_rows):
+            try:
+                computed.append(compute_scores(academic_level, row.get("class_score"), row.get("exam_score")))
+            except ValueError as e:
+                valid_rows.remove(row)
+                errors.append({"student_id": row["student_id"], "subject_id": row["subject_id"], "error": str(e)})
+
+    payload = [
+        {
+            "student_id": row["student_id"],
             "class_id": class_id,
             "subject_id": row["subject_id"],
             "academic_level": academic_level,
+            "term": term,
+            "academic_year": academic_year,
 
             "class_score": row.get("class_score"),
             "exam_score": row.get("exam_score"),
 
-            **computed
-        })
+            **result
+        }
+        for row, result in zip(valid_rows, computed)
+    ]
+
+    if not payload:
+        return [], errors
 
-    return _safe_execute(
+    saved = _safe_execute(
         supabase.table("student_scores")
         .upsert(
             payload,
-            on_conflict="student_id,subject_id"
+            on_conflict=SCORE_CONFLICT_KEY
         )
     )
+    mark_dirty(
+        class_id, term, academic_year,
+        [row["student_id"] for row in payload], [row["subject_id"] for row in payload]
+    )
+    return saved, errors
+
+
+def save_student_scores_bulk(
+    *,
+    student_id: str,
+    class_id: str,
+    academic_level: str,
+    subject_scores: list[dict],
+    term: int,
+    academic_year: str
+):
+    """
+    subject_scores = [
+      {
+        "subject_id": "...",
+        "class_score": 30,
+        "exam_score": 70
+      }
+    ]
+
+    Saves all subjects of one student in a single upsert.
+    Returns (saved_rows, errors) like save_class_scores_bulk().
+    """
+    return save_class_scores_bulk(
+        class_id=class_id,
+        academic_level=academic_level,
+        score_rows=[{**row, "student_id": student_id} for row in subject_scores],
+        term=term,
+        academic_year=academic_year
+    )
+
+# -------------------------------------------------
+# BULK IMPORT (CSV / EXCEL SHEET)
+# -------------------------------------------------
+SCORE_IMPORT_CHUNK_SIZE = 500
+
+
+def _name_map(rows: list[dict], name_field: str) -> dict:
+    """Normalized name -> id, with None for names shared by several rows."""
+    mapping = {}
+    for row in rows:
+        key = " ".join(str(row[name_field]).casefold().split())
+        mapping[key] = None if key in mapping else row["id"]
+    return mapping
+
+
+def _to_number(value):
+    if pd.isna(value):
+        return None
+    return int(value) if float(value).is_integer() else float(value)
+
+
+def import_class_scores(
+    df: pd.DataFrame,
+    *,
+    class_id: str,
+    academic_level: str,
+    students: list[dict],
+    subjects: list[dict],
+    term: int,
+    academic_year: str,
+    chunk_size: int = SCORE_IMPORT_CHUNK_SIZE
+) -> dict:
+    """
+    Import a score sheet for one class.
+
+    Columns: student, subject, class_score, exam_score (class_score may be
+    omitted for levels without components). Student and subject names are
+    matched (ignoring case/spacing) against `students` ({id, full_name})
+    and `subjects` ({id, subject_name}). Scores are validated against the
+    level's score settings and computed with compute_scores_batch, then
+    upserted `chunk_size` rows per request. When a student/subject pair
+    appears more than once, the last row wins; rows without any score are
+    ignored.
+
+    Returns a report dict: rows, saved, blank, superseded (earlier
+    duplicates), failed, errors (list of {"row", "error"}) and seconds.
+    """
+    started = time.perf_counter()
+    setting = get_score_setting_for_level(academic_level)
+    if not setting:
+        raise ValueError("Score settings not found for academic level")
+
+    required = ["student", "subject", "exam_score"]
+    if setting["has_components"]:
+        required.insert(2, "class_score")
+    require_columns(df, required)
+
+    frame = clean_text_columns(df, ["student", "subject"])
+    # Spreadsheet row numbers: 1-based, after the header row
+    frame.index = range(2, len(frame) + 2)
+    frame["class_score"] = (
+        pd.to_numeric(df["class_score"], errors="coerce").to_numpy()
+        if "class_score" in df.columns else np.nan
+    )
+    frame["exam_score"] = pd.to_numeric(df["exam_score"], errors="coerce").to_numpy()
+
+    # Rows with no scores at all (e.g. untouched template rows) are ignored
+    score_text = clean_text_columns(df, [c for c in ("class_score", "exam_score") if c in df.columns])
+    score_text.index = frame.index
+    blank = (score_text == "").all(axis=1)
+    frame, score_text = frame[~blank], score_text[~blank]
+
+    # -------- Resolve names to ids (in-memory maps) --------
+    student_ids = _name_map(students, "full_name")
+    subject_ids = _name_map(subjects, "subject_name")
+    student_keys = dedupe_key(frame["student"])
+    frame["student_id"] = student_keys.map(student_ids)
+    frame["subject_id"] = dedupe_key(frame["subject"]).map(subject_ids)
+    ambiguous = {key for key, value in student_ids.items() if value is None}
+
+    # -------- Column-wise validation --------
+    problems = pd.Series(None, index=frame.index, dtype=object)
+
+    def flag(mask, message):
+        problems[mask & problems.isna()] = message
+
+    flag(student_keys.isin(ambiguous), "Student name is not unique in this class.")
+    flag(frame["student_id"].isna(), "Student not found in this class.")
+    flag(frame["subject_id"].isna(), "Subject not assigned to this class.")
+
+    checks = [("Exam score", "exam_score", setting["max_exam_score"])]
+    if setting["has_components"]:
+        checks.insert(0, ("Class score", "class_score", setting["max_class_score"]))
+    for label, column, max_value in checks:
+        values = frame[column]
+        flag(values.isna() & (score_text[column] != ""), f"{label} must be a number.")
+        if setting["has_components"]:
+            flag(values.isna(), f"{label} is required.")
+        flag(~values.isna() & ~values.between(0, max_value), f"{label} must be between 0 and {max_value}.")
+
+    errors = [{"row": int(row), "error": message} for row, message in problems.dropna().items()]
+    valid = frame[problems.isna()]
+    superseded = valid.duplicated(["student_id", "subject_id"], keep="last")
+    valid = valid[~superseded]
+
+    # -------- Vectorized computation --------
+    try:
+        computed = compute_scores_batch(academic_level, valid["class_score"], valid["exam_score"])
+    except ValueError:
+        # A score fell outside the grading scale — find which rows
+        results = {}
+        for row, values in valid.iterrows():
+            try:
+                results[row] = compute_scores(
+                    academic_level, _to_number(values["class_score"]), _to_number(values["exam_score"])
+                )
+            except ValueError as e:
+                errors.append({"row": int(row), "error": str(e)})
+        valid = valid.loc[list(results)]
+        computed = pd.DataFrame.from_dict(results, orient="index")
+
+    payload = [
+        {
+            "student_id": values["student_id"],
+            "class_id": class_id,
+            "subject_id": values["subject_id"],
+            "academic_level": academic_level,
+            "term": term,
+            "academic_year": academic_year,
+
+            "class_score": _to_number(values["class_score"]),
+            "exam_score": _to_number(values["exam_score"]),
+
+            **result
+        }
+        for values, result in zip(
+            valid.to_dict("records"), computed.to_dict("records")
+        )
+    ]
+
+    # -------- Chunked upsert --------
+    saved = 0
+    for start in range(0, len(payload), chunk_size):
+        chunk = payload[start:start + chunk_size]
+        try:
+            saved += len(_safe_execute(
+                supabase.table("student_scores")
+                .upsert(chunk, on_conflict=SCORE_CONFLICT_KEY)
+            ))
+            mark_dirty(
+                class_id, term, academic_year,
+                [row["student_id"] for row in chunk], [row["subject_id"] for row in chunk]
+            )
+        except RuntimeError as e:
+            errors.append({"row": None, "error": f"{len(chunk)} row(s) not saved: {e}"})
+
+    return {
+        "rows": len(frame) + int(blank.sum()),
+        "saved": saved,
+        "blank": int(blank.sum()),
+        "superseded": int(superseded.sum()),
+        "failed": len(frame) - saved - int(superseded.sum()),
+        "errors": sorted(errors, key=lambda e: e["row"] or 0),
+        "seconds": time.perf_counter() - started,
+    }
+
+# -------------------------------------------------
+# SUBJECT POSITIONS
+# -------------------------------------------------
+# Conflict key plus class and level (which a score edit never changes); a
+# position upsert sends nothing else, and an upsert only updates the
+# columns it is given, so it never touches the scores
+POSITION_KEY_COLUMNS = ["student_id", "class_id", "subject_id", "academic_level", "term", "academic_year"]
+
+
+def save_subject_positions(ranked_scores: list[dict], chunk_size: int | None = None):
+    """
+    Persist per-subject positions, given student_scores rows (as returned
+    by get_class_scores) with a `position` key, in one upsert (or requests
+    of at most chunk_size rows).
+    Only the key columns and position are sent, so a score edited since
+    the rows were read is not overwritten with the stale value.
+    """
+    payload = [
+        {**{col: row.get(col) for col in POSITION_KEY_COLUMNS}, "position": row["position"]}
+        for row in ranked_scores
+    ]
+    if not payload:
+        return []
+
+    chunk_size = chunk_size or len(payload)
+    saved = []
+    for start in range(0, len(payload), chunk_size):
+        saved.extend(_safe_execute(
+            supabase.table("student_scores")
+            .upsert(payload[start:start + chunk_size], on_conflict=SCORE_CONFLICT_KEY)
+        ))
+    return saved
 
 # -------------------------------------------------
 # FETCH STUDENT SCORES
 # -------------------------------------------------
-def get_student_scores(*, student_id: str, class_id: str) -> list[dict]:
+CLASS_SCORE_COLUMNS = (
+    "student_id, class_id, subject_id, term, academic_year, class_score, exam_score, "
+    "weighted_class_score, weighted_exam_score, total_score, grade, remark, "
+    "academic_level, position, subjects(subject_name, subject_type)"
+)
+
+
+def _flatten_subjects(rows: list[dict], key: str = "subjects") -> list[dict]:
+    """Move the nested subject info onto each row."""
+    for r in rows:
+        subject_info = r.pop(key, None) or {}
+        r["subject_name"] = subject_info.get("subject_name")
+        r["subject_type"] = subject_info.get("subject_type", "other")
+    return rows
+
+
+def get_student_scores(*, student_id: str, class_id: str, term: int, academic_year: str) -> list[dict]:
     """
     Fetch all scores for a student in a given class and term.
     Returns a list of dicts containing:
@@ -203,15 +547,74 @@ def get_student_scores(*, student_id: str, class_id: str) -> list[dict]:
 
     rows = _safe_execute(
         supabase.table("student_scores")
-        .select("student_id, class_id, subject_id, total_score, grade, remark, academic_level, subject_id (subject_name, subject_type)")
+        .select("student_id, class_id, subject_id, term, academic_year, total_score, grade, remark, academic_level, subject_id (subject_name, subject_type)")
         .eq("student_id", student_id)
         .eq("class_id", class_id)
+        .eq("academic_year", academic_year)
+        .eq("term", term)
     )
 
-    # Flatten the nested subject info
-    for r in rows:
-        subject_info = r.pop("subject_id", {})
-        r["subject_name"] = subject_info.get("subject_name")
-        r["subject_type"] = subject_info.get("subject_type", "other")
+    return _flatten_subjects(rows, "subject_id")
 
-    return rows
+
+def get_class_scores(
+    *,
+    class_id: str,
+    term: int,
+    academic_year: str,
+    student_ids: list[str] | None = None,
+    subject_ids: list[str] | None = None
+) -> list[dict]:
+    """
+    Fetch every student's (or only student_ids') subject scores (or only
+    subject_ids') for a class and term in one query (served by the
+    (class_id, term) index).
+    Same fields as get_student_scores, plus student_id, subject_id, the
+    raw/weighted component scores and the subject position.
+    """
+    query = (
+        supabase.table("student_scores")
+        .select(CLASS_SCORE_COLUMNS)
+        .eq("class_id", class_id)
+        .eq("term", term)
+        .eq("academic_year", academic_year)
+    )
+    if student_ids is not None:
+        query = query.in_("student_id", list(student_ids))
+    if subject_ids is not None:
+        query = query.in_("subject_id", list(subject_ids))
+
+    return _flatten_subjects(_safe_execute(query))
+
+
+def get_class_scores_for_terms(*, class_id: str, academic_year: str, terms: list[int]) -> list[dict]:
+    """
+    Scores for several terms of one class and academic year in one query,
+    e.g. for multi-term report cards. Rows carry their `term`.
+    """
+    return _flatten_subjects(_safe_execute(
+        supabase.table("student_scores")
+        .select(CLASS_SCORE_COLUMNS)
+        .eq("class_id", class_id)
+        .in_("term", list(terms))
+        .eq("academic_year", academic_year)
+        .order("term")
+    ))
+
+
+def get_student_score_history(*, student_id: str, academic_years: list[str] | None = None) -> list[dict]:
+    """
+    A student's scores across terms (and classes), oldest first, for trend
+    analysis. Limit to some academic years to avoid reading full history.
+    """
+    query = (
+        supabase.table("student_scores")
+        .select(CLASS_SCORE_COLUMNS)
+        .eq("student_id", student_id)
+    )
+    if academic_years is not None:
+        query = query.in_("academic_year", list(academic_years))
+
+    return _flatten_subjects(_safe_execute(
+        query.order("academic_year").order("term")
+    ))
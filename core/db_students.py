@@ -1,36 +1,15 @@
 # core/db_students.py
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
+import time
 import streamlit as st
 import pandas as pd
-import httpx
+from core.db import supabase, safe_execute as _safe_execute, cached_read, invalidates, keyset_page, split_page, escape_like
+from utils.validation import require_columns, clean_text_columns, dedupe_key
 
-# Load environment variables
-load_dotenv()
-
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_SERVICE_ROLE_KEY"]
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-# -----------------------------
-# Internal helper for safe requests
-# -----------------------------
-def _safe_execute(request):
-    try:
-        resp = request.execute()
-        return resp.data or []
-    except httpx.ConnectError:
-        st.warning("⚠️ Unable to reach database — check your internet connection.")
-        return []
-    except Exception as e:
-        st.error(f"⚠️ Database error: {str(e)}")
-        return []
 
 # -----------------------------
 # Students CRUD
 # -----------------------------
+@cached_read("students")
 def get_students():
     """Return all student records."""
     return _safe_execute(
@@ -38,6 +17,7 @@ def get_students():
         .select("*")
     )
 
+@invalidates("students")
 def create_student(full_name: str, assigned_class: str):
     """Create a new student record."""
     if not full_name or not assigned_class:
@@ -51,6 +31,7 @@ def create_student(full_name: str, assigned_class: str):
 
     return _safe_execute(supabase.table("students").insert(data))
 
+@invalidates("students")
 def update_student(student_id: str, full_name: str, assigned_class: str):
     """Update an existing student record."""
     data = {
@@ -59,25 +40,264 @@ def update_student(student_id: str, full_name: str, assigned_class: str):
     }
     return _safe_execute(supabase.table("students").update(data).eq("id", student_id))
 
+@invalidates("students")
 def delete_student(student_id: str):
     """Delete a student record."""
     return _safe_execute(supabase.table("students").delete().eq("id", student_id))
 
+# -----------------------------
+# Filtered student queries
+# -----------------------------
+STUDENT_COLUMNS = "id, full_name, assigned_class"
+
+
+def _paginate(query, limit: int | None, offset: int):
+    if limit is None:
+        return query
+    return query.range(offset, offset + limit - 1)
+
+
+@cached_read("students")
+def get_students_by_class(
+    class_name: str,
+    *,
+    columns: str = STUDENT_COLUMNS,
+    limit: int | None = None,
+    offset: int = 0
+):
+    """Return students assigned to a class, ordered by name."""
+    return _safe_execute(
+        _paginate(
+            supabase.table("students")
+            .select(columns)
+            .eq("assigned_class", class_name)
+            .order("full_name")
+            .order("id"),
+            limit,
+            offset
+        )
+    )
+
+
+@cached_read("students")
+def search_students(
+    name: str,
+    *,
+    class_name: str | None = None,
+    contains: bool = False,
+    columns: str = STUDENT_COLUMNS,
+    limit: int | None = 50,
+    offset: int = 0
+):
+    """
+    Case-insensitive name search, done by the database.
+    Matches names starting with `name` (or containing it if contains=True).
+    """
+    pattern = f"{escape_like(name.strip())}%"
+    if contains:
+        pattern = f"%{pattern}"
+
+    query = supabase.table("students").select(columns).ilike("full_name", pattern)
+    if class_name:
+        query = query.eq("assigned_class", class_name)
+
+    return _safe_execute(
+        _paginate(query.order("full_name").order("id"), limit, offset)
+    )
+
+
+@cached_read("students")
+def get_students_by_ids(student_ids: list[str], *, columns: str = STUDENT_COLUMNS):
+    """Return the students with the given ids."""
+    if not student_ids:
+        return []
+    return _safe_execute(
+        supabase.table("students")
+        .select(columns)
+        .in_("id", list(student_ids))
+    )
+
+@cached_read("students")
+def _students_page_rows(after, page_size, class_name, search, columns):
+    # Cache the raw rows, not split_page's (rows, cursor) tuple: a tuple is
+    # always truthy, so a failed read ([]) would be cached too
+    query = supabase.table("students").select(columns)
+    if class_name:
+        query = query.eq("assigned_class", class_name)
+    if search and search.strip():
+        query = query.ilike("full_name", f"%{escape_like(search.strip())}%")
+
+    return _safe_execute(
+        keyset_page(query, sort_column="full_name", page_size=page_size, after=after)
+    )
+
+
+def get_students_page(
+    *,
+    after: tuple | None = None,
+    page_size: int = 50,
+    class_name: str | None = None,
+    search: str | None = None,
+    columns: str = STUDENT_COLUMNS
+):
+    """
+    One page of students ordered by (full_name, id), using keyset pagination.
+    Optional class filter and case-insensitive name search (substring).
+    Returns (rows, next_cursor); pass next_cursor as `after` for the next page.
+    """
+    rows = _students_page_rows(after, page_size, class_name, search, columns)
+    return split_page(rows, sort_column="full_name", page_size=page_size)
+
 # -----------------------------
 # Bulk upload students
 # -----------------------------
+DEFAULT_IMPORT_CHUNK_SIZE = 500
+# PostgREST caps rows per response (1000 on Supabase by default)
+_FETCH_PAGE_SIZE = 1000
+# Keep the report small for huge, badly formatted files
+MAX_REPORTED_ERRORS = 1000
+
+
+def _existing_student_keys(class_names: list[str]) -> set[str]:
+    """
+    dedupe keys (name, class) of students already in the given classes.
+    Raises RuntimeError if the read fails: an empty set would let the
+    import insert every row as new.
+    """
+    rows = []
+    for start in range(0, len(class_names), 100):
+        batch = class_names[start:start + 100]
+        offset = 0
+        while True:
+            page = _safe_execute(
+                supabase.table("students")
+                .select("id, full_name, assigned_class")
+                .in_("assigned_class", batch)
+                .order("id")
+                .range(offset, offset + _FETCH_PAGE_SIZE - 1),
+                raise_errors=True
+            )
+            rows.extend(page)
+            if len(page) < _FETCH_PAGE_SIZE:
+                break
+            offset += _FETCH_PAGE_SIZE
+
+    if not rows:
+        return set()
+    existing = clean_text_columns(pd.DataFrame(rows), ["full_name", "assigned_class"])
+    return set(dedupe_key(existing["full_name"], existing["assigned_class"]))
+
+
+@invalidates("students")
+def import_student_chunks(
+    chunks,
+    *,
+    chunk_size: int = DEFAULT_IMPORT_CHUNK_SIZE,
+    valid_classes: list[str] | None = None,
+    on_progress=None
+) -> dict:
+    """
+    Import students from an iterable of DataFrames (columns: full_name,
+    assigned_class), e.g. utils.roster_reader.iter_roster_chunks().
+
+    Each chunk is validated column-wise, rows that duplicate another row of
+    the upload or an existing student (same name and class, ignoring
+    case/spacing) are skipped, and the rest are inserted `chunk_size` rows
+    per request. Only one chunk is held in memory at a time, plus the
+    dedupe keys of the classes seen so far.
+
+    on_progress(rows_read) is called after each chunk. If the existing
+students cannot be read, the import stops with RuntimeError rather than
+insert rows it cannot de-duplicate.
+
+    Returns a report dict: rows, inserted, skipped, failed, errors (list of
+    {"row", "error"}, at most MAX_REPORTED_ERRORS), class_counts ({class: rows read}), seconds and
+    rows_per_second.
+    """
+    started = time.perf_counter()
+    known_keys = set()
+    loaded_classes = set()
+    class_counts = {}
+    errors = []
+    rows_read = inserted = skipped = failed = 0
+
+    def report_error(row, message):
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"row": int(row), "error": message})
+
+    for df in chunks:
+        require_columns(df, ["full_name", "assigned_class"])
+        frame = clean_text_columns(df, ["full_name", "assigned_class"])
+        # Spreadsheet row numbers: 1-based, after the header row
+        frame.index = range(rows_read + 2, rows_read + 2 + len(frame))
+        rows_read += len(frame)
+        for name, count in frame["assigned_class"].value_counts().items():
+            class_counts[name] = class_counts.get(name, 0) + int(count)
+
+        # -------- Column-wise validation --------
+        invalid = (frame["full_name"] == "") | (frame["assigned_class"] == "")
+        for row in frame.index[invalid]:
+            report_error(row, "Full name and class are required.")
+
+        if valid_classes is not None:
+            unknown = ~invalid & ~frame["assigned_class"].isin(valid_classes)
+            for row in frame.index[unknown]:
+                report_error(row, f"Unknown class '{frame.at[row, 'assigned_class']}'.")
+            invalid |= unknown
+
+        failed += int(invalid.sum())
+        frame = frame[~invalid]
+
+        # -------- De-duplicate (within the upload and against the database) --------
+        new_classes = sorted(set(frame["assigned_class"]) - loaded_classes)
+        try:
+            known_keys |= _existing_student_keys(new_classes)
+        except RuntimeError as e:
+            raise RuntimeError(
+                f"could not check for existing students ({e}); import stopped with "
+                f"{inserted:,} student(s) added. Uploading the file again skips them."
+            ) from e
+        loaded_classes.update(new_classes)
+
+        keys = dedupe_key(frame["full_name"], frame["assigned_class"])
+        duplicate = keys.duplicated() | keys.isin(known_keys)
+        skipped += int(duplicate.sum())
+        frame = frame[~duplicate]
+        known_keys.update(keys[~duplicate])
+
+        # -------- Chunked insert --------
+        records = frame.to_dict("records")
+        for start in range(0, len(records), chunk_size):
+            batch = records[start:start + chunk_size]
+            saved = _safe_execute(supabase.table("students").insert(batch))
+            inserted += len(saved)
+            failed += len(batch) - len(saved)
+
+        if on_progress:
+            on_progress(rows_read)
+
+    seconds = time.perf_counter() - started
+    return {
+        "rows": rows_read,
+        "inserted": inserted,
+        "skipped": skipped,
+        "failed": failed,
+        "errors": errors,
+        "class_counts": class_counts,
+        "seconds": seconds,
+        "rows_per_second": rows_read / seconds if seconds else 0.0,
+    }
+
+
+def bulk_import_students(df: pd.DataFrame, **kwargs) -> dict:
+    """Import students from a single DataFrame; see import_student_chunks."""
+    return import_student_chunks([df], **kwargs)
+
+
 def bulk_create_students(df: pd.DataFrame):
     """
     Bulk create students from a DataFrame.
     Expected columns: full_name, assigned_class
     Returns number of successfully added students.
     """
-    added_count = 0
-    for _, row in df.iterrows():
-        full_name = str(row.get("full_name", "")).strip()
-        assigned_class = str(row.get("assigned_class", "")).strip()
-
-        if full_name and assigned_class:
-            create_student(full_name, assigned_class)
-            added_count += 1
-    return added_count
+    return bulk_import_students(df)["inserted"]
@@ -1,36 +1,12 @@
 # core/db_subject_assignments.py
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
 import streamlit as st
-import httpx
-
-load_dotenv()
-
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_SERVICE_ROLE_KEY"]
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-
-# -----------------------------
-# Safe execution helper
-# -----------------------------
-def _safe_execute(request):
-    try:
-        resp = request.execute()
-        return resp.data or []
-    except httpx.ConnectError:
-        st.warning("⚠️ Database unreachable.")
-        return []
-    except Exception as e:
-        st.error(f"⚠️ Database error: {e}")
-        return []
+from core.db import supabase, safe_execute as _safe_execute, cached_read, invalidates
 
 
 # -----------------------------
 # Subject assignments
 # -----------------------------
+@cached_read("class_subjects")
 def get_subjects_for_class(class_id: str):
     return _safe_execute(
         supabase.table("class_subjects")
@@ -39,6 +15,7 @@ def get_subjects_for_class(class_id: str):
     )
 
 
+@invalidates("class_subjects")
 def assign_subject_to_class(class_id: str, subject_id: str):
     return _safe_execute(
         supabase.table("class_subjects").insert(
@@ -47,12 +24,14 @@ def assign_subject_to_class(class_id: str, subject_id: str):
     )
 
 
+@invalidates("class_subjects")
 def remove_subject_from_class(assignment_id: str):
     return _safe_execute(
         supabase.table("class_subjects").delete().eq("id", assignment_id)
     )
 
 
+@invalidates("class_subjects")
 def assign_subjects_to_class_bulk(class_id: str, subject_ids: list[str]):
     """
     Assign multiple subjects to a class at once.
@@ -1,26 +1,9 @@
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
-import httpx
 import streamlit as st
+from core.db import supabase, safe_execute
 
-load_dotenv()
 
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_SERVICE_ROLE_KEY"]
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-
-# Safe execution helper
 def _safe_execute(request):
-    try:
-        resp = request.execute()
-        return resp.data or []
-    except httpx.ConnectError:
-        raise RuntimeError("Database unreachable")
-    except Exception as e:
-        raise RuntimeError(str(e))
+    return safe_execute(request, raise_errors=True)
 
 
 # Fetch ordered subjects for a class
@@ -1,35 +1,12 @@
 # core/db_subjects.py
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
 import streamlit as st
-import httpx
+from core.db import supabase, safe_execute as _safe_execute, cached_read, invalidates
 
-# Load environment variables
-load_dotenv()
-
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_SERVICE_ROLE_KEY"]
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-# -------------------------------------------------------------------
-# Internal helper for safe requests
-# -------------------------------------------------------------------
-def _safe_execute(request):
-    try:
-        resp = request.execute()
-        return resp.data or []
-    except httpx.ConnectError:
-        st.warning("⚠️ Unable to reach database — check your internet connection.")
-        return []
-    except Exception as e:
-        st.error(f"⚠️ Database error: {str(e)}")
-        return []
 
 # -------------------------------------------------------------------
 # Subjects CRUD
 # -------------------------------------------------------------------
+@cached_read("subjects")
 def get_subjects():
     return _safe_execute(
         supabase.table("subjects")
@@ -37,6 +14,7 @@ def get_subjects():
         .order("subject_name", desc=False)
     )
 
+@invalidates("subjects")
 def create_subject(subject_name: str, subject_type: str = "core"):
     if not subject_name.strip():
         st.error("Subject name is required.")
@@ -50,6 +28,7 @@ def create_subject(subject_name: str, subject_type: str = "core"):
         })
     )
 
+@invalidates("subjects")
 def update_subject(subject_id: str, subject_name: str, subject_type: str = "core"):
     if not subject_name.strip():
         st.error("Subject name is required.")
@@ -64,6 +43,7 @@ def update_subject(subject_id: str, subject_name: str, subject_type: str = "core
         .eq("id", subject_id)
     )
 
+@invalidates("subjects")
 def delete_subject(subject_id: str):
     return _safe_execute(
         supabase.table("subjects")
@@ -1,46 +1,53 @@
 # core/db_teachers.py
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import streamlit as st
-import httpx
-import csv
-import io
+import pandas as pd
+from core.db import supabase, safe_execute as _safe_execute, cached_read, invalidates, keyset_page, split_page, escape_like, get_setting
+from utils.validation import require_columns, clean_text_columns
 
-# Load environment variables
-load_dotenv()
-
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_SERVICE_ROLE_KEY"]
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 ROLES = ["admin", "teacher"]
 
 
-# -----------------------------
-# Internal helper for safe requests
-# -----------------------------
-def _safe_execute(request):
-    try:
-        resp = request.execute()
-        return resp.data or []
-    except httpx.ConnectError:
-        st.warning("⚠️ Unable to reach database — check your internet connection.")
-        return []
-    except Exception as e:
-        st.error(f"⚠️ Database error: {str(e)}")
-        return []
-
-
 # -----------------------------
 # Teachers CRUD
 # -----------------------------
+@cached_read("profiles")
 def get_teachers():
     """Return all teacher profiles with assigned classes."""
     return _safe_execute(supabase.table("profiles").select("*").eq("role", "teacher"))
 
 
+@cached_read("profiles")
+def _teachers_page_rows(after, page_size, search):
+    # Cache the raw rows, not split_page's (rows, cursor) tuple: a tuple is
+    # always truthy, so a failed read ([]) would be cached too
+    query = supabase.table("profiles").select("*").eq("role", "teacher")
+    if search and search.strip():
+        query = query.ilike("full_name", f"%{escape_like(search.strip())}%")
+
+    return _safe_execute(
+        keyset_page(query, sort_column="full_name", page_size=page_size, after=after)
+    )
+
+
+def get_teachers_page(
+    *,
+    after: tuple | None = None,
+    page_size: int = 50,
+    search: str | None = None
+):
+    """
+    One page of teacher profiles ordered by (full_name, id), using keyset
+    pagination, with optional case-insensitive name search.
+    Returns (rows, next_cursor); pass next_cursor as `after` for the next page.
+    """
+    rows = _teachers_page_rows(after, page_size, search)
+    return split_page(rows, sort_column="full_name", page_size=page_size)
+
+
+@invalidates("profiles")
 def create_teacher(full_name: str, email: str, password: str, classes: list = None):
     """
     Create a new teacher:
@@ -72,6 +79,7 @@ def create_teacher(full_name: str, email: str, password: str, classes: list = No
         return []
 
 
+@invalidates("profiles")
 def update_teacher(
     auth_user_id: str,
     full_name: str,
@@ -107,6 +115,7 @@ def update_teacher(
         return []
 
 
+@invalidates("profiles")
 def delete_teacher(auth_user_id: str):
     """Delete teacher from profiles and auth.users."""
     try:
@@ -121,8 +130,134 @@ def delete_teacher(auth_user_id: str):
 
 
 # -----------------------------
-# Bulk upload
+# Bulk provisioning
 # -----------------------------
+PROVISION_WORKERS = int(get_setting("DB_PROVISION_WORKERS", 8))
+PROFILE_CHUNK_SIZE = 200
+
+
+def teacher_rows_from_df(df: pd.DataFrame) -> list[dict]:
+    """
+    Normalize an upload (columns: full_name, email, password, classes) into
+    provisioning rows. `classes` is a comma-separated list of class names.
+    """
+    require_columns(df, ["full_name", "email", "password"])
+    frame = clean_text_columns(
+        df.assign(classes=df["classes"] if "classes" in df.columns else ""),
+        ["full_name", "email", "password", "classes"],
+    )
+    return [
+        {
+            "full_name": row["full_name"],
+            "email": row["email"],
+            "password": row["password"],
+            "classes": [c.strip() for c in row["classes"].split(",") if c.strip()],
+        }
+        for row in frame.to_dict("records")
+    ]
+
+
+def _create_auth_user(row: dict) -> str:
+    user_resp = supabase.auth.admin.create_user(
+        {"email": row["email"], "password": row["password"], "email_confirm": True}
+    )
+    return user_resp.user.id
+
+
+def _delete_auth_users(user_ids: list[str], workers: int) -> list[str]:
+    """Delete auth users concurrently. Returns the ids that could not be deleted."""
+    leftover = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(supabase.auth.admin.delete_user, uid): uid for uid in user_ids}
+        for future in as_completed(futures):
+            if future.exception() is not None:
+                leftover.append(futures[future])
+    return leftover
+
+
+@invalidates("profiles")
+def provision_teachers(
+    rows: list[dict],
+    *,
+    workers: int = PROVISION_WORKERS,
+    chunk_size: int = PROFILE_CHUNK_SIZE,
+    on_progress=None
+) -> dict:
+    """
+    Create many teachers at once.
+
+    1. Auth users are created concurrently on a pool of `workers` threads
+       (each call is one round trip to the auth API).
+    2. Profiles are inserted in chunks of `chunk_size` rows per request.
+    3. If a profile chunk fails, the auth users created for it are deleted
+       again so no orphaned logins are left behind.
+
+    on_progress(done, total) is called from the calling thread after each
+    auth user, so it may update Streamlit widgets.
+
+    Returns a report dict: created, failed, errors (list of {"email", "error"}),
+    orphaned (auth user ids that could not be rolled back) and seconds.
+    """
+    started = time.perf_counter()
+    errors = []
+    pending = []
+    seen_emails = set()
+
+    for row in rows:
+        email = row.get("email", "").strip()
+        if not row.get("full_name") or not email or not row.get("password"):
+            errors.append({"email": email, "error": "Full name, email and password are required."})
+        elif email.casefold() in seen_emails:
+            errors.append({"email": email, "error": "Duplicate email in upload."})
+        else:
+            seen_emails.add(email.casefold())
+            pending.append(row)
+
+    # -------- 1. Auth users, bounded concurrency --------
+    created = []
+    total = len(pending)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(_create_auth_user, row): row for row in pending}
+        for done, future in enumerate(as_completed(futures), start=1):
+            row = futures[future]
+            try:
+                created.append((row, future.result()))
+            except Exception as e:
+                errors.append({"email": row["email"], "error": str(e)})
+            if on_progress:
+                on_progress(done, total)
+
+    # -------- 2. Profiles, chunked; 3. roll back on failure --------
+    profiles_created = 0
+    orphaned = []
+    for start in range(0, len(created), chunk_size):
+        chunk = created[start:start + chunk_size]
+        data = [
+            {
+                "full_name": row["full_name"].strip(),
+                "role": "teacher",
+                "assigned_classes": row["classes"] or [],
+                "auth_user_id": user_id,
+            }
+            for row, user_id in chunk
+        ]
+        try:
+            _safe_execute(supabase.table("profiles").insert(data), raise_errors=True)
+            profiles_created += len(chunk)
+        except RuntimeError as e:
+            for row, _ in chunk:
+                errors.append({"email": row["email"], "error": f"Profile insert failed: {e}"})
+            orphaned += _delete_auth_users([user_id for _, user_id in chunk], max(1, workers))
+
+    return {
+        "created": profiles_created,
+        "failed": len(errors),
+        "errors": errors,
+        "orphaned": orphaned,
+        "seconds": time.perf_counter() - started,
+    }
+
+
 def bulk_create_teachers(csv_file):
     """
     CSV columns: full_name,email,password,classes (comma-separated class names)
@@ -132,22 +267,9 @@ def bulk_create_teachers(csv_file):
         return []
 
     try:
-        decoded = io.StringIO(csv_file.getvalue().decode())
-        reader = csv.DictReader(decoded)
-        results = []
-        for row in reader:
-            class_list = [
-                c.strip() for c in row.get("classes", "").split(",") if c.strip()
-            ]
-            res = create_teacher(
-                full_name=row["full_name"],
-                email=row["email"],
-                password=row["password"],
-                classes=class_list,
-            )
-            results.append(res)
-        st.success(f"{len(results)} teachers added successfully!")
-        return results
+        report = provision_teachers(teacher_rows_from_df(pd.read_csv(csv_file)))
+        st.success(f"{report['created']} teachers added successfully!")
+        return report
     except Exception as e:
         st.error(f"⚠️ Bulk upload error: {str(e)}")
         return []
@@ -0,0 +1,60 @@
+# core/services/dirty_results.py
+"""
+In-process queue of final results that are out of date.
+
+Score writes mark (student, class, term, academic year) dirty, along with
+the subjects they touched; final_result_engine's recompute_dirty_results()
+drains the queue and regenerates only those students' final results and
+those subjects' positions. The queue lives in server memory, shared by all sessions of the
+Streamlit process; entries left when the process stops are simply lost
+(a whole-class generate or close_term.py rebuilds everything).
+"""
+import threading
+
+_lock = threading.Lock()
+# (class_id, term, academic_year) -> {student_id, ...}
+_dirty: dict[tuple[str, int, str], set[str]] = {}
+# (class_id, term, academic_year) -> {subject_id, ...}
+_dirty_subjects: dict[tuple[str, int, str], set[str]] = {}
+
+
+def mark_dirty(class_id: str, term: int, academic_year: str, student_ids, subject_ids=()):
+    """
+    Mark these students' final results for a class and term as stale, and
+    the subject positions of subject_ids.
+    """
+    student_ids, subject_ids = set(student_ids), set(subject_ids)
+    key = (class_id, term, academic_year)
+    with _lock:
+        if student_ids:
+            _dirty.setdefault(key, set()).update(student_ids)
+        if subject_ids:
+            _dirty_subjects.setdefault(key, set()).update(subject_ids)
+
+
+def drain_dirty(class_id: str | None = None) -> dict[tuple[str, int, str], set[str]]:
+    """Remove and return dirty entries (only for class_id, if given)."""
+    with _lock:
+        keys = [key for key in _dirty if class_id is None or key[0] == class_id]
+        return {key: _dirty.pop(key) for key in keys}
+
+
+def drain_dirty_subjects(class_id: str | None = None) -> dict[tuple[str, int, str], set[str]]:
+    """Remove and return dirty subject positions (only for class_id, if given)."""
+    with _lock:
+        keys = [key for key in _dirty_subjects if class_id is None or key[0] == class_id]
+        return {key: _dirty_subjects.pop(key) for key in keys}
+
+
+def pending(class_id: str | None = None) -> int:
+    """
+    Number of dirty entries: (student, class, term, academic year) final
+    results plus (subject, class, term, academic year) subject positions.
+    """
+    with _lock:
+        return sum(
+            len(ids)
+            for queue in (_dirty, _dirty_subjects)
+            for (cid, *_), ids in queue.items()
+            if class_id is None or cid == class_id
+        )
@@ -1,7 +1,12 @@
 # core/services/final_result_engine.py
 
-from core.db_student_scores import get_student_scores
+import pandas as pd
+
+from core.db_classes import get_classes
+from core.db_student_scores import get_student_scores, get_class_scores, save_subject_positions
+from core.db_student_final_results import get_final_results, save_final_results_bulk
 from core.db_final_grading_scales import get_final_grading_scales
+from core.services.dirty_results import drain_dirty, drain_dirty_subjects, mark_dirty
 
 # -------------------------------
 # Configuration
@@ -22,7 +27,7 @@ CORE_SUBJECT_TYPE = "core"
 ELECTIVE_SUBJECT_TYPE = "elective"
 
 
-def generate_final_result(*, student_id: str, class_id: str, term: int, level: str) -> dict | None:
+def generate_final_result(*, student_id: str, class_id: str, term: int, academic_year: str, level: str) -> dict | None:
     """
     Generate final result for one student based on numeric grades.
     Returns a dict ready for DB insert OR None if excluded level (KG/Nursery).
@@ -38,7 +43,7 @@ def generate_final_result(*, student_id: str, class_id: str, term: int, level: s
     # --------------------------------------------------
     # Fetch student scores
     # --------------------------------------------------
-    scores = get_student_scores(student_id=student_id, class_id=class_id)
+    scores = get_student_scores(student_id=student_id, class_id=class_id, term=term, academic_year=academic_year)
     if not scores:
         return None
 
@@ -87,6 +92,7 @@ def generate_final_result(*, student_id: str, class_id: str, term: int, level: s
         "student_id": student_id,
         "class_id": class_id,
         "term": term,
+        "academic_year": academic_year,
         "level": normalized_level,
         "grand_total": grand_total,
         "aggregate": aggregate,
@@ -96,14 +102,270 @@ def generate_final_result(*, student_id: str, class_id: str, term: int, level: s
     }
 
 
-def generate_final_results_for_class(class_id: str, term: int, level: str, student_ids: list[str]) -> list[dict]:
+def _resolve_final_grades(compare_values: pd.Series, grading_scales: list[dict]) -> pd.DataFrame:
+    """
+    Vectorized version of the scale loop in generate_final_result:
+    the first scale (in min_value order) containing the value wins.
+    """
+    resolved = pd.DataFrame(
+        {"final_grade": "N/A", "descriptor": None, "remark": None},
+        index=compare_values.index,
+        dtype=object,
+    )
+    unresolved = pd.Series(True, index=compare_values.index)
+
+    for scale in grading_scales:
+        hit = unresolved & compare_values.between(scale["min_value"], scale["max_value"])
+        if hit.any():
+            resolved.loc[hit, "final_grade"] = scale["final_grade"]
+            resolved.loc[hit, "descriptor"] = scale.get("descriptor")
+            resolved.loc[hit, "remark"] = scale.get("remark")
+            unresolved &= ~hit
+
+    return resolved
+
+
+def compute_class_totals(scores: pd.DataFrame, normalized_level: str) -> pd.DataFrame:
+    """
+    Grand total (and JHS aggregate) for every student in a scores frame
+    with columns student_id, total_score, grade, subject_type.
+    Returns a frame indexed by student_id.
+    """
+    totals = pd.DataFrame({
+        "grand_total": scores.groupby("student_id")["total_score"].sum()
+    })
+    totals["aggregate"] = None
+
+    if normalized_level == "jhs":
+        core = scores[scores["subject_type"] == CORE_SUBJECT_TYPE]
+        electives = scores[scores["subject_type"] == ELECTIVE_SUBJECT_TYPE]
+
+        core_sum = core.groupby("student_id")["grade"].sum()
+        # Best two electives = the two lowest numeric grades
+        best_electives = (
+            electives.sort_values("grade", kind="stable")
+            .groupby("student_id")
+            .head(2)
+        )
+        elective_sum = best_electives.groupby("student_id")["grade"].sum()
+
+        totals["aggregate"] = (
+            core_sum.add(elective_sum, fill_value=0)
+            .reindex(totals.index, fill_value=0)
+            .astype(int)
+        )
+
+    return totals
+
+
+# -------------------------------
+# Rankings
+# -------------------------------
+def rank_positions(values: pd.Series, *, ascending: bool = False) -> pd.Series:
+    """
+    Competition ranking ("1, 2, 2, 4"): tied values share the best
+    position and the next position is skipped. Missing values get None.
+    """
+    return values.rank(method="min", ascending=ascending).astype("Int64").astype(object).where(values.notna(), None)
+
+
+def rank_class_totals(totals: pd.DataFrame, normalized_level: str) -> pd.Series:
+    """
+    Overall position of every student in a compute_class_totals() frame:
+    lowest aggregate first for JHS, highest grand total first otherwise.
+    """
+    if normalized_level == "jhs":
+        return rank_positions(totals["aggregate"].astype(float), ascending=True)
+    return rank_positions(totals["grand_total"].astype(float))
+
+
+def rank_subject_scores(scores: pd.DataFrame) -> pd.Series:
+    """Position of each score row within its subject (highest total first)."""
+    return scores.groupby("subject_id")["total_score"].transform(
+        lambda totals: rank_positions(totals.astype(float))
+    )
+
+
+def _class_results(scores: pd.DataFrame, class_id: str, term: int, academic_year: str, normalized_level: str) -> pd.DataFrame:
+    """Final results (with overall position) for every student in a scores frame."""
+    totals = compute_class_totals(scores, normalized_level)
+    totals["position"] = rank_class_totals(totals, normalized_level)
+
+    # Use aggregate for JHS, grand_total for primary
+    compare_values = totals["aggregate"] if normalized_level == "jhs" else totals["grand_total"]
+    grading_scales = get_final_grading_scales(normalized_level)
+    totals = totals.join(_resolve_final_grades(compare_values, grading_scales))
+
+    totals = totals.rename_axis("student_id").reset_index()
+    totals["class_id"] = class_id
+    totals["term"] = term
+    totals["academic_year"] = academic_year
+    totals["level"] = normalized_level
+
+    return totals[[
+        "student_id", "class_id", "term", "academic_year", "level",
+        "grand_total", "aggregate", "final_grade", "descriptor", "remark", "position"
+    ]]
+
+
+def generate_final_results_for_class(
+    class_id: str,
+    term: int,
+    level: str,
+    academic_year: str,
+    student_ids: list[str] | None = None
+) -> list[dict]:
+    """
+    Generate final results for a whole class in memory.
+
+    Fetches the class's student_scores for the term in one query and the level's
+    final grading scale once, then computes every student's grand total /
+    aggregate and class position together. Students without scores are
+    skipped, as in generate_final_result. Pass student_ids to limit (and
+    order) the output; positions are always relative to the whole class.
+    Returns a list of structured result dicts ready for save_final_results_bulk.
+    """
+    normalized_level = LEVEL_MAP.get(level.lower())
+    if not normalized_level:
+        # Excluded level
+        return []
+
+    scores = pd.DataFrame(get_class_scores(class_id=class_id, term=term, academic_year=academic_year))
+    if scores.empty:
+        return []
+
+    results = _class_results(scores, class_id, term, academic_year, normalized_level)
+    if student_ids is not None:
+        results = results.set_index("student_id", drop=False)
+        results = results.loc[[sid for sid in student_ids if sid in results.index]]
+
+    return results.to_dict("records")
+
+
+def generate_class_rankings(class_id: str, term: int, level: str, academic_year: str) -> tuple[list[dict], list[dict]]:
+    """
+    Final results with overall positions, plus the class's student_scores
+    rows with their per-subject `position`, from a single scores query.
+    Returns (final_results, ranked_scores) for save_final_results_bulk and
+    save_subject_positions.
+    """
+    normalized_level = LEVEL_MAP.get(level.lower())
+    if not normalized_level:
+        # Excluded level
+        return [], []
+
+    scores = pd.DataFrame(get_class_scores(class_id=class_id, term=term, academic_year=academic_year))
+    if scores.empty:
+        return [], []
+
+    results = _class_results(scores, class_id, term, academic_year, normalized_level)
+    scores["position"] = rank_subject_scores(scores)
+
+    return results.to_dict("records"), scores.to_dict("records")
+
+
+# -------------------------------
+# Incremental recomputation
+# -------------------------------
+def recompute_final_results(class_id: str, term: int, level: str, academic_year: str, student_ids) -> list[dict]:
+    """
+    Regenerate final results for only `student_ids` of a class.
+
+    Reads just those students' scores, plus the class's stored final
+    results so that overall positions stay correct: the returned rows are
+    the recomputed students and any other student whose position moved.
+    Returns result dicts ready for save_final_results_bulk.
+    """
+    normalized_level = LEVEL_MAP.get(level.lower())
+    if not normalized_level or not student_ids:
+        return []
+
+    scores = pd.DataFrame(get_class_scores(
+        class_id=class_id, term=term, academic_year=academic_year, student_ids=list(student_ids)
+    ))
+    if scores.empty:
+        return []
+    fresh = _class_results(scores, class_id, term, academic_year, normalized_level)
+
+    # Re-rank against everyone else's stored totals
+    stored = pd.DataFrame(get_final_results(
+        class_id=class_id, term=term, academic_year=academic_year, raise_errors=True
+    ))
+    if not stored.empty:
+        stored = stored[~stored["student_id"].isin(fresh["student_id"])]
+        if "position" not in stored:
+            stored["position"] = None
+    others = stored.reindex(columns=fresh.columns) if not stored.empty else fresh.iloc[0:0]
+    merged = pd.concat([fresh, others], ignore_index=True)
+    new_positions = rank_class_totals(merged, normalized_level)
+
+    moved = merged["position"].ne(new_positions) & ~(merged["position"].isna() & new_positions.isna())
+    is_fresh = pd.Series(merged.index < len(fresh), index=merged.index)
+    merged["position"] = new_positions
+
+    return merged[is_fresh | moved].to_dict("records")
+
+
+def recompute_subject_positions(class_id: str, term: int, level: str, academic_year: str, subject_ids) -> list[dict]:
     """
-    Generate final results for multiple students in a class.
-    Returns a list of structured result dicts.
+    Re-rank only `subject_ids` of a class: one scores query for those
+    subjects, returning just the rows whose position changed (ready for
+    save_subject_positions).
     """
-    results = []
-    for sid in student_ids:
-        res = generate_final_result(student_id=sid, class_id=class_id, term=term, level=level)
-        if res:
-            results.append(res)
-    return results
+    if not LEVEL_MAP.get(level.lower()) or not subject_ids:
+        return []
+
+    scores = pd.DataFrame(get_class_scores(
+        class_id=class_id, term=term, academic_year=academic_year, subject_ids=list(subject_ids)
+    ))
+    if scores.empty:
+        return []
+
+    new_positions = rank_subject_scores(scores)
+    stored = scores["position"].astype(object).where(scores["position"].notna(), None)
+    moved = stored.ne(new_positions) & ~(stored.isna() & new_positions.isna())
+    scores["position"] = new_positions
+    return scores[moved].to_dict("records")
+
+
+def recompute_dirty_results(class_id: str | None = None) -> int:
+    """
+    Drain the dirty-results queue (optionally for one class only) and
+    regenerate just the affected students' final results and the
+    affected subjects' positions.
+    Entries that fail are put back in the queue for the next call.
+    Returns the number of final results written.
+    """
+    batches = drain_dirty(class_id)
+    subject_batches = drain_dirty_subjects(class_id)
+    if not batches and not subject_batches:
+        return 0
+
+    classes = {c["id"]: c for c in get_classes()}
+    for (cid, term, academic_year), subject_ids in subject_batches.items():
+        cls = classes.get(cid)
+        if not cls:
+            continue
+        try:
+            save_subject_positions(
+                recompute_subject_positions(cid, term, cls["academic_level"], academic_year, subject_ids)
+            )
+        except RuntimeError:
+            mark_dirty(cid, term, academic_year, (), subject_ids)
+
+    written = 0
+    for (cid, term, academic_year), student_ids in batches.items():
+        cls = classes.get(cid)
+        if not cls:
+            continue
+        try:
+            results = recompute_final_results(cid, term, cls["academic_level"], academic_year, student_ids)
+            saved = save_final_results_bulk(results)
+        except RuntimeError:
+            saved = None
+        if saved is None or len(saved) != len(results):
+            mark_dirty(cid, term, academic_year, student_ids)
+            continue
+        written += len(saved)
+
+    return written
@@ -0,0 +1,50 @@
+# core/services/grading_index.py
+from bisect import bisect_right
+
+import numpy as np
+
+
+class GradingIndex:
+    """
+    In-memory lookup over the grading_scales bands.
+
+    Bands are sorted by min_score once, so resolving a score is a bisect
+    instead of a range query per subject. Bands are assumed not to overlap
+    (same assumption as the old `.lte/.gte ... .limit(1)` query).
+    """
+
+    def __init__(self, scales: list[dict]):
+        bands = sorted(scales, key=lambda s: s["min_score"])
+        self.min_scores = [b["min_score"] for b in bands]
+        self.max_scores = [b["max_score"] for b in bands]
+        self.grades = [b["grade"] for b in bands]
+        self.remarks = [b["remark"] for b in bands]
+
+    def __len__(self):
+        return len(self.min_scores)
+
+    def resolve(self, total_score: float):
+        """Return (grade, remark) for a score, or raise ValueError."""
+        i = bisect_right(self.min_scores, total_score) - 1
+        if i < 0 or total_score > self.max_scores[i]:
+            raise ValueError(f"No grading scale for score {total_score}")
+        return self.grades[i], self.remarks[i]
+
+    def resolve_many(self, total_scores) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized resolve(): return (grades, remarks) arrays for an array
+        of scores. Raises ValueError if any score falls outside every band.
+        """
+        scores = np.asarray(total_scores, dtype=float)
+        min_scores = np.asarray(self.min_scores, dtype=float)
+        max_scores = np.asarray(self.max_scores, dtype=float)
+
+        idx = np.searchsorted(min_scores, scores, side="right") - 1
+        covered = idx >= 0
+        covered[covered] = scores[covered] <= max_scores[idx[covered]]
+        if not covered.all():
+            raise ValueError(f"No grading scale for score {scores[~covered][0]}")
+
+        grades = np.asarray(self.grades, dtype=object)[idx]
+        remarks = np.asarray(self.remarks, dtype=object)[idx]
+        return grades, remarks
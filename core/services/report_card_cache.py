@@ -0,0 +1,87 @@
+# core/services/report_card_cache.py
+"""
+Content-addressed disk cache for rendered report cards.
+
+A file's name is the sha256 of everything that went into it, so a stale
+entry can never be served: changed scores, results or conduct give a new
+key, and the old file simply ages out. The directory is bounded by
+REPORT_CACHE_MAX_MB; least recently used files are evicted first (reads
+refresh a file's mtime). Safe to share between the app and
+print_report_cards.py: writes are atomic renames.
+
+Only rendering is cached. The key is computed from the fetched card data,
+so every request still runs build_report_cards' queries (one class-wide
+query per table); a hit skips the PDF rendering, which is the expensive
+part. The schema has no updated_at columns to check before fetching.
+"""
+import hashlib
+import json
+import os
+import threading
+
+from core.db import get_setting
+
+REPORT_CACHE_DIR = str(get_setting("REPORT_CACHE_DIR", os.path.join(".cache", "report_cards")))
+REPORT_CACHE_MAX_BYTES = int(float(get_setting("REPORT_CACHE_MAX_MB", 500)) * 1024 * 1024)
+SUFFIX = ".pdf"
+
+_evict_lock = threading.Lock()
+
+
+def content_hash(*parts) -> str:
+    """sha256 of JSON-serialisable parts (dict key order does not matter)."""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _path(key: str) -> str:
+    return os.path.join(REPORT_CACHE_DIR, key + SUFFIX)
+
+
+def cache_get(key: str) -> bytes | None:
+    """Cached bytes for key, or None. Marks the entry as recently used."""
+    path = _path(key)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        os.utime(path)
+    except OSError:
+        return None
+    return data
+
+
+def cache_put(key: str, data: bytes):
+    """Store bytes under key (atomic; call evict() after a batch of puts)."""
+    os.makedirs(REPORT_CACHE_DIR, exist_ok=True)
+    path = _path(key)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def evict(max_bytes: int = REPORT_CACHE_MAX_BYTES) -> int:
+    """Delete least recently used entries until the cache fits. Returns files removed."""
+    with _evict_lock:
+        try:
+            stats = [
+                (entry.stat(), entry.path)
+                for entry in os.scandir(REPORT_CACHE_DIR)
+                if entry.name.endswith(SUFFIX)
+            ]
+        except OSError:
+            return 0
+
+        entries = [(stat.st_mtime, stat.st_size, path) for stat, path in stats]
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,142 @@
+# core/services/report_cards.py
+"""
+Gathers everything a class's report cards need with a handful of
+class-wide queries and returns plain dicts for utils/report_card_pdf.
+Rendered PDFs are cached on disk (core/services/report_card_cache), keyed
+on the card contents, so only cards whose inputs changed are re-rendered.
+"""
+from core.db import get_setting
+from core.db_admin_settings import get_all_conduct, get_all_interest
+from core.db_conduct_interest import get_student_conduct_interest
+from core.db_student_final_results import get_final_results
+from core.db_student_scores import get_class_scores
+from core.db_students import get_students_by_class
+from core.db_subject_order import get_subject_order_for_class
+from core.services.report_card_cache import cache_get, cache_put, content_hash, evict
+from utils.report_card_pdf import RENDER_VERSION, render_report_cards
+
+CARD_SUBJECT_FIELDS = ["subject_name", "class_score", "exam_score", "total_score", "grade", "remark", "position"]
+CARD_FINAL_FIELDS = ["grand_total", "aggregate", "final_grade", "descriptor", "remark", "position"]
+
+
+def _subject_sort_key(order: dict[str, int]):
+    # Subjects in class_subject_order first, any others after them by name
+    def key(row):
+        return (row["subject_id"] not in order, order.get(row["subject_id"], 0), row.get("subject_name") or "")
+    return key
+
+
+def build_report_cards(
+    cls: dict,
+    term: int,
+    academic_year: str,
+    student_ids: list[str] | None = None
+) -> list[dict]:
+    """
+    One card per student of the class (or only student_ids) who has scores
+    for the term, in name order. Cards are plain (picklable) dicts:
+    student_id, student_name, class_id, class_name, academic_level, term,
+    academic_year, school_name, class_size, subjects[...], final,
+    conduct, interest, attendance.
+    """
+    class_id = cls["id"]
+    students = get_students_by_class(cls["class_name"])
+    if student_ids is not None:
+        wanted = set(student_ids)
+        students = [s for s in students if s["id"] in wanted]
+    # Every student's scores: positions and class size need the whole class
+    scores = get_class_scores(class_id=class_id, term=term, academic_year=academic_year)
+    if not students or not scores:
+        return []
+
+    # Only the printed fields, so cache keys ignore timestamps and ids
+    finals = {
+        row["student_id"]: {field: row.get(field) for field in CARD_FINAL_FIELDS}
+        for row in get_final_results(class_id=class_id, term=term, academic_year=academic_year)
+    }
+    order = {row["subject_id"]: row["sort_order"] for row in get_subject_order_for_class(class_id)}
+    conduct_names = {row["id"]: row["conduct_name"] for row in get_all_conduct()}
+    interest_names = {row["id"]: row["interest_name"] for row in get_all_interest()}
+    conduct = {
+        row["student_id"]: row
+        for row in get_student_conduct_interest(class_id=class_id, term=term, academic_year=academic_year)
+    }
+
+    scores_by_student: dict[str, list[dict]] = {}
+    for row in sorted(scores, key=_subject_sort_key(order)):
+        scores_by_student.setdefault(row["student_id"], []).append(
+            {field: row.get(field) for field in CARD_SUBJECT_FIELDS}
+        )
+
+    school_name = str(get_setting("SCHOOL_NAME", ""))
+    class_size = len(finals) or len(scores_by_student)
+    cards = []
+    for student in students:
+        subjects = scores_by_student.get(student["id"])
+        if not subjects:
+            continue
+        entry = conduct.get(student["id"], {})
+        cards.append({
+            "student_id": student["id"],
+            "student_name": student["full_name"],
+            "class_id": class_id,
+            "class_name": cls["class_name"],
+            "academic_level": cls.get("academic_level"),
+            "term": term,
+            "academic_year": academic_year,
+            "school_name": school_name,
+            "class_size": class_size,
+            "subjects": subjects,
+            "final": finals.get(student["id"]),
+            "conduct": conduct_names.get(entry.get("conduct_id")),
+            "interest": interest_names.get(entry.get("interest_id")),
+            "attendance": entry.get("attendance"),
+        })
+    return cards
+
+
+# -------------------------------------------------
+# Cached rendering
+# -------------------------------------------------
+def card_cache_key(card: dict) -> str:
+    """Content address of a rendered card: the card data plus layout version."""
+    return content_hash("card", RENDER_VERSION, card)
+
+
+def render_cached_report_cards(
+    cards: list[dict],
+    *,
+    merged: bool = True,
+    **render_kwargs
+) -> tuple[dict[str, bytes], bytes | None]:
+    """
+    Like utils.report_card_pdf.render_report_cards, but cards (and the
+    merged class PDF) whose inputs are unchanged come from the disk cache.
+    Only misses are rendered, then stored. `cards` must already be built
+    (build_report_cards), so the database is queried either way; only
+    rendering is skipped on a hit.
+    """
+    keys = {card["student_id"]: card_cache_key(card) for card in cards}
+    per_student = {}
+    for student_id, key in keys.items():
+        data = cache_get(key)
+        if data is not None:
+            per_student[student_id] = data
+
+    merged_key = content_hash("class", RENDER_VERSION, [keys[c["student_id"]] for c in cards])
+    merged_pdf = cache_get(merged_key) if merged and cards else None
+    need_merged = merged and bool(cards) and merged_pdf is None
+
+    if len(per_student) < len(cards) or need_merged:
+        rendered, fresh_merged = render_report_cards(
+            cards, merged=need_merged, skip=set(per_student), **render_kwargs
+        )
+        for student_id, data in rendered.items():
+            cache_put(keys[student_id], data)
+        per_student.update(rendered)
+        if fresh_merged is not None:
+            cache_put(merged_key, fresh_merged)
+            merged_pdf = fresh_merged
+        evict()
+
+    return per_student, merged_pdf
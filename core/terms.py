@@ -0,0 +1,30 @@
+# core/terms.py
+from datetime import date
+
+from core.db import get_setting
+
+TERMS = [1, 2, 3]
+# Month the school year starts in (September)
+ACADEMIC_YEAR_START_MONTH = 9
+
+
+def academic_year_for(day: date) -> str:
+    """School year containing `day`, e.g. "2024/2025"."""
+    start = day.year if day.month >= ACADEMIC_YEAR_START_MONTH else day.year - 1
+    return f"{start}/{start + 1}"
+
+
+def current_academic_year() -> str:
+    """ACADEMIC_YEAR setting, or the school year containing today."""
+    return str(get_setting("ACADEMIC_YEAR", academic_year_for(date.today())))
+
+
+def current_term() -> int:
+    """CURRENT_TERM setting (1-3), defaulting to term 1."""
+    return int(get_setting("CURRENT_TERM", 1))
+
+
+def academic_year_options(count: int = 5) -> list[str]:
+    """The current school year followed by the previous count-1 years."""
+    start = int(current_academic_year().split("/")[0])
+    return [f"{y}/{y + 1}" for y in range(start, start - count, -1)]
@@ -1,15 +1,5 @@
 # utils/create_admin.py
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-SUPABASE_URL = os.environ.get("SUPABASE_URL")
-SUPABASE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+from core.db import supabase
 
 
 def create_admin(full_name: str, email: str, password: str):
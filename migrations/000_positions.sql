@@ -0,0 +1,16 @@
+-- migrations/000_positions.sql
+-- Stored class and subject positions (run once in the Supabase SQL editor,
+-- before 001_term_academic_year.sql).
+--
+-- Both columns are nullable: positions are filled in the next time final
+-- results are generated for a class (score entry page or close_term.py).
+
+BEGIN;
+
+-- Overall class position per student and term
+ALTER TABLE student_final_results ADD COLUMN IF NOT EXISTS position integer;
+
+-- Position within the subject per student and term
+ALTER TABLE student_scores ADD COLUMN IF NOT EXISTS position integer;
+
+COMMIT;
@@ -0,0 +1,60 @@
+-- migrations/001_term_academic_year.sql
+-- Per-term, per-academic-year storage for scores, final results and
+-- conduct/interest/attendance (run once in the Supabase SQL editor).
+--
+-- Existing rows are backfilled as term 1 of '2025/2026'; replace that year
+-- (every occurrence) with the school year the data belongs to before running.
+-- The DROP CONSTRAINT lines use Postgres' default names for the old unique
+-- keys; if yours were named differently, drop them by name instead, or
+-- later terms will still collide with earlier ones.
+
+BEGIN;
+
+-- -------------------------------------------------
+-- student_scores: upsert key (student_id, subject_id, academic_year, term)
+-- -------------------------------------------------
+ALTER TABLE student_scores ADD COLUMN IF NOT EXISTS term integer;
+ALTER TABLE student_scores ADD COLUMN IF NOT EXISTS academic_year text;
+UPDATE student_scores SET term = coalesce(term, 1), academic_year = coalesce(academic_year, '2025/2026');
+ALTER TABLE student_scores ALTER COLUMN term SET NOT NULL;
+ALTER TABLE student_scores ALTER COLUMN academic_year SET NOT NULL;
+
+ALTER TABLE student_scores DROP CONSTRAINT IF EXISTS student_scores_student_id_subject_id_key;
+ALTER TABLE student_scores DROP CONSTRAINT IF EXISTS student_scores_student_id_subject_id_term_key;
+ALTER TABLE student_scores
+    ADD CONSTRAINT student_scores_student_subject_year_term_key
+    UNIQUE (student_id, subject_id, academic_year, term);
+CREATE INDEX IF NOT EXISTS student_scores_class_year_term_idx
+    ON student_scores (class_id, academic_year, term);
+
+-- -------------------------------------------------
+-- student_final_results: upsert key (student_id, class_id, academic_year, term)
+-- -------------------------------------------------
+ALTER TABLE student_final_results ADD COLUMN IF NOT EXISTS term integer;
+ALTER TABLE student_final_results ADD COLUMN IF NOT EXISTS academic_year text;
+UPDATE student_final_results SET term = coalesce(term, 1), academic_year = coalesce(academic_year, '2025/2026');
+ALTER TABLE student_final_results ALTER COLUMN term SET NOT NULL;
+ALTER TABLE student_final_results ALTER COLUMN academic_year SET NOT NULL;
+
+ALTER TABLE student_final_results DROP CONSTRAINT IF EXISTS student_final_results_student_id_class_id_term_key;
+ALTER TABLE student_final_results
+    ADD CONSTRAINT student_final_results_student_class_year_term_key
+    UNIQUE (student_id, class_id, academic_year, term);
+CREATE INDEX IF NOT EXISTS student_final_results_class_year_term_idx
+    ON student_final_results (class_id, academic_year, term);
+
+-- -------------------------------------------------
+-- student_conduct_interest: upsert key (student_id, class_id, academic_year, term)
+-- -------------------------------------------------
+ALTER TABLE student_conduct_interest ADD COLUMN IF NOT EXISTS academic_year text;
+UPDATE student_conduct_interest SET academic_year = coalesce(academic_year, '2025/2026');
+ALTER TABLE student_conduct_interest ALTER COLUMN academic_year SET NOT NULL;
+
+ALTER TABLE student_conduct_interest DROP CONSTRAINT IF EXISTS student_conduct_interest_student_id_class_id_term_key;
+ALTER TABLE student_conduct_interest
+    ADD CONSTRAINT student_conduct_interest_student_class_year_term_key
+    UNIQUE (student_id, class_id, academic_year, term);
+CREATE INDEX IF NOT EXISTS student_conduct_interest_class_year_term_idx
+    ON student_conduct_interest (class_id, academic_year, term);
+
+COMMIT;
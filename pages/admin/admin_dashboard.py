@@ -1,6 +1,7 @@
 # pages/admin/admin_dashboard.py
 import streamlit as st
 from core.auth import get_current_user, logout_user
+from core.db import set_page
 
 from . import manage_teachers  # admin pages
 from . import manage_classes
@@ -11,10 +12,12 @@ from . import manage_grading_scales
 from . import manage_score_settings
 from . import admin_conduct_interest
 from . import manage_final_grading_scales
+from . import performance
 
 
 def admin_dashboard_page():
     user = get_current_user()
+    set_page("admin")
     if not user or user.get("role") != "admin":
         st.warning("You do not have permission to access this page.")
         return
@@ -33,10 +36,12 @@ def admin_dashboard_page():
         "Manage Score Settings",
         "Conduct & Interest Settings",
         "Final Grading Scales",
+        "Performance",
         "Logout",  # Logout at the bottom
     ]
 
     page = st.sidebar.radio("Go to", sidebar_items, key="admin_sidebar")
+    set_page(f"admin/{page}")
 
     # -------------------------
     # Handle Logout
@@ -72,3 +77,5 @@ def admin_dashboard_page():
         admin_conduct_interest.admin_conduct_interest_page()
     elif page == "Final Grading Scales":
         manage_final_grading_scales.manage_final_grading_scales_page()
+    elif page == "Performance":
+        performance.performance_page()
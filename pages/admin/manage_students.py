@@ -1,14 +1,22 @@
 # admin/manage_students.py
+import hashlib
 import streamlit as st
 import pandas as pd
+from core.db import invalidate
 from core.db_classes import get_classes
 from core.db_students import (
-    get_students,
+    get_students_page,
     create_student,
     update_student,
     delete_student,
-    bulk_create_students,
+    import_student_chunks,
+    bulk_import_students,
 )
+from utils.ui_components import editor_changes, keyset_paginator
+from utils.roster_reader import iter_roster_chunks, preview_roster
+
+STUDENTS_PAGE_SIZE = 50
+PREVIEW_ROWS = 20
 
 
 # --- Reset form and session state ---
@@ -22,16 +30,58 @@ def reset_student_form():
         "bulk_student_file",
         "filter_class",
         "search_name",
+        "students_pager",
+        "students_editor",
     ]
     for key in keys_to_clear:
         if key in st.session_state:
             del st.session_state[key]
 
 
+# --- Save rows added or edited in the student table ---
+def save_student_table(original: pd.DataFrame, edited: pd.DataFrame, class_options: list[str]):
+    # New rows are the ones without an id, even if every cell is still blank,
+    # so an added row is either saved or reported -- never silently dropped
+    new_rows, changed_rows = editor_changes(original, edited)
+    if not new_rows and not changed_rows:
+        st.info("No changes to save.")
+        return
+
+    errors = []
+    updated = added = 0
+    for row in changed_rows:
+        name, class_name = str(row["Full Name"]).strip(), row["Class"]
+        if not name or class_name not in class_options:
+            errors.append(f"{name or row['_id']}: a full name and a valid class are required.")
+            continue
+        update_student(row["_id"], name, class_name)
+        updated += 1
+
+    if new_rows:
+        report = bulk_import_students(
+            pd.DataFrame({
+                "full_name": [str(r["Full Name"]) for r in new_rows],
+                "assigned_class": [str(r["Class"]) for r in new_rows],
+            }),
+            valid_classes=class_options,
+        )
+        added = report["inserted"]
+        # The import numbers rows as in a spreadsheet (header on row 1)
+        errors += [f"New row {e['row'] - 1}: {e['error']}" for e in report["errors"]]
+        if report["skipped"]:
+            errors.append(f"{report['skipped']} new row(s) skipped as duplicates of existing students.")
+
+    st.success(f"{updated} student(s) updated, {added} added.")
+    for error in errors:
+        st.error(error)
+    if not errors:
+        reset_student_form()
+        st.rerun()
+
+
 def manage_students_page():
     st.subheader("Manage Students")
 
-    students = get_students()
     classes = get_classes()
     class_options = [c["class_name"] for c in classes]
 
@@ -60,19 +110,6 @@ def manage_students_page():
             "Search by Name", value=st.session_state["search_name"], key="search_name"
         )
 
-    # Apply filter/search
-    filtered_students = students
-    if filter_class:
-        filtered_students = [
-            s for s in filtered_students if s.get("assigned_class") == filter_class
-        ]
-    if search_name:
-        filtered_students = [
-            s
-            for s in filtered_students
-            if search_name.lower() in s.get("full_name", "").lower()
-        ]
-
     # =====================
     # STUDENT TABLE + REFRESH
     # =====================
@@ -80,9 +117,23 @@ def manage_students_page():
         st.markdown("### Student List")
 
         if st.button("🔄 Refresh Page"):
+            invalidate("students", "classes")
             reset_student_form()
             st.rerun()
 
+        # One keyset page at a time, filtered and searched by the database
+        filtered_students = keyset_paginator(
+            "students_pager",
+            lambda after: get_students_page(
+                after=after,
+                page_size=STUDENTS_PAGE_SIZE,
+                class_name=filter_class or None,
+                search=search_name,
+            ),
+            filters=(filter_class, search_name.strip()),
+        )
+        students_by_id = {str(s["id"]): s for s in filtered_students}
+
         if not filtered_students:
             st.info("No students found.")
             df = pd.DataFrame(columns=["_id", "Full Name", "Class"])
@@ -97,7 +148,10 @@ def manage_students_page():
                     for s in filtered_students
                 ]
             )
-        st.data_editor(df, num_rows="dynamic", width="stretch", key="students_editor")
+        edited = st.data_editor(df, num_rows="dynamic", width="stretch", key="students_editor")
+
+        if st.button("💾 Save Table Changes"):
+            save_student_table(df, edited, class_options)
 
     # =====================
     # ADD / UPDATE FORM
@@ -106,30 +160,30 @@ def manage_students_page():
         st.markdown("### Add / Update Student")
         st.session_state.setdefault("edit_student_selected_id", "")
 
+        # The selection can belong to a page or search that is no longer shown
+        if st.session_state["edit_student_selected_id"] not in ("", *students_by_id):
+            st.session_state["edit_student_selected_id"] = ""
+            st.session_state.pop("edit_student_name", None)
+            st.session_state.pop("edit_student_class", None)
+
         # Dropdown for edit
-        edit_options = [""] + [str(s["id"]) for s in filtered_students]
+        edit_options = [""] + list(students_by_id)
         selected_id = st.selectbox(
             "Select a student to update/delete",
             edit_options,
             index=0,
-            format_func=lambda x: (
-                ""
-                if x == ""
-                else next(
-                    s["full_name"] for s in filtered_students if str(s["id"]) == x
-                )
-            ),
+            format_func=lambda x: students_by_id.get(x, {}).get("full_name", ""),
             key="edit_student_selected_id",
         )
 
         # Prefill edit fields
-        if selected_id:
-            student = next(s for s in filtered_students if str(s["id"]) == selected_id)
+        student = students_by_id.get(selected_id)
+        if student:
             st.session_state.setdefault("edit_student_name", student["full_name"])
             st.session_state.setdefault("edit_student_class", student["assigned_class"])
 
         # Edit mode
-        if selected_id:
+        if student:
             with st.form("edit_student_form"):
                 full_name = st.text_input(
                     "Full Name", st.session_state["edit_student_name"]
@@ -184,19 +238,38 @@ def manage_students_page():
 
     if uploaded_file is not None:
         try:
-            # Read file
-            if uploaded_file.name.endswith(".csv"):
-                df = pd.read_csv(uploaded_file)
-            else:
-                df = pd.read_excel(uploaded_file)
-
-            # Preview table
-            st.write("### File Preview:")
-            st.dataframe(df, width="stretch")
-
-            # Process immediately (same as teachers)
-            added_count = bulk_create_students(df)
-            st.success(f"Bulk upload completed! {added_count} students added.")
+            # Streamlit reruns this script on every interaction; only import
+            # a given file (by content hash) once per session.
+            file_hash = hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+            imported = st.session_state.setdefault("imported_student_files", {})
+
+            # Preview only the first rows; the import streams the file
+            st.write(f"### File Preview (first {PREVIEW_ROWS} rows):")
+            st.dataframe(preview_roster(uploaded_file, PREVIEW_ROWS), width="stretch")
+
+            if file_hash not in imported:
+                progress = st.empty()
+                imported[file_hash] = import_student_chunks(
+                    iter_roster_chunks(uploaded_file),
+                    valid_classes=class_options,
+                    on_progress=lambda rows: progress.caption(f"Imported {rows:,} rows..."),
+                )
+                progress.empty()
+            report = imported[file_hash]
+
+            st.success(
+                f"Bulk upload completed! {report['rows']:,} rows read: "
+                f"{report['inserted']:,} students added, "
+                f"{report['skipped']:,} duplicates skipped, {report['failed']:,} failed "
+                f"({report['rows_per_second']:,.0f} rows/s)."
+            )
+            with st.expander("Rows per class"):
+                st.dataframe(
+                    pd.Series(report["class_counts"], name="Rows").rename_axis("Class"),
+                    width="stretch",
+                )
+            if report["errors"]:
+                st.dataframe(pd.DataFrame(report["errors"]), width="stretch")
 
         except Exception as e:
             st.error(f"Error processing uploaded file: {e}")
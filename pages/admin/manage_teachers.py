@@ -1,18 +1,24 @@
 # admin/manage_teachers.py
+import hashlib
 import streamlit as st
 from core.auth import get_current_user
 import pandas as pd
 from core.db_teachers import (
-    get_teachers,
+    get_teachers_page,
     create_teacher,
     update_teacher,
     delete_teacher,
-    bulk_create_teachers,
+    provision_teachers,
+    teacher_rows_from_df,
     ROLES,
 )
 from core.db_classes import get_classes
-import io
-import csv
+from core.db import invalidate
+from utils.ui_components import editor_changes, keyset_paginator
+from utils.roster_reader import iter_roster_chunks, preview_roster
+
+TEACHERS_PAGE_SIZE = 50
+PREVIEW_ROWS = 20
 
 
 # --- Reset form and session state ---
@@ -31,12 +37,53 @@ def reset_form():
         "update_pressed",
         "delete_pressed",
         "bulk_upload_file",
+        "teachers_pager",
+        "teachers_editor",
     ]
     for key in keys_to_clear:
         if key in st.session_state:
             del st.session_state[key]
 
 
+# --- Save rows added or edited in the teacher table ---
+def save_teacher_table(original: pd.DataFrame, edited: pd.DataFrame, teachers_by_id: dict, class_options: list[str]):
+    # New rows are the ones without an id, even if every cell is still blank,
+    # so an added row is reported rather than silently dropped as unchanged
+    new_rows, changed_rows = editor_changes(original, edited)
+    if not new_rows and not changed_rows:
+        st.info("No changes to save.")
+        return
+
+    errors = [
+        f"New row {i}: add new teachers with the form or a bulk upload (a password is required)."
+        for i, _ in enumerate(new_rows, start=1)
+    ]
+    updated = 0
+    for row in changed_rows:
+        name = str(row["Full Name"]).strip()
+        assigned = [c.strip() for c in str(row["Classes"]).split(",") if c.strip()]
+        unknown = [c for c in assigned if c not in class_options]
+        if not name or row["Role"] not in ROLES or unknown:
+            detail = f"unknown class(es) {', '.join(unknown)}" if unknown else "a full name and a valid role are required"
+            errors.append(f"{name or row['_id']}: {detail}.")
+            continue
+        if update_teacher(
+            auth_user_id=teachers_by_id[str(row["_id"])]["auth_user_id"],
+            full_name=name,
+            email=str(row["Email"]).strip(),
+            role=row["Role"],
+            classes=assigned,
+        ):
+            updated += 1
+
+    st.success(f"{updated} teacher(s) updated.")
+    for error in errors:
+        st.error(error)
+    if not errors:
+        reset_form()
+        st.rerun()
+
+
 def manage_teachers_page():
     user = get_current_user()
     if not user or user.get("role") != "admin":
@@ -45,7 +92,6 @@ def manage_teachers_page():
 
     st.subheader("Manage Teachers")
 
-    teachers = get_teachers()
     classes = get_classes()
     class_options = [c["class_name"] for c in classes]
 
@@ -73,12 +119,26 @@ def manage_teachers_page():
                 "update_pressed",
                 "delete_pressed",
                 "bulk_upload_file",
+                "teachers_pager",
             ]
             for key in keys_to_reset:
                 if key in st.session_state:
                     del st.session_state[key]
+            invalidate("profiles", "classes")
             st.rerun()
 
+        search_name = st.text_input("Search by Name", key="teacher_search_name")
+
+        # One keyset page at a time, searched by the database
+        teachers = keyset_paginator(
+            "teachers_pager",
+            lambda after: get_teachers_page(
+                after=after, page_size=TEACHERS_PAGE_SIZE, search=search_name
+            ),
+            filters=(search_name.strip(),),
+        )
+        teachers_by_id = {str(t["id"]): t for t in teachers}
+
         if not teachers:
             st.info("No teachers found.")
             df = pd.DataFrame(columns=["_id", "Full Name", "Email", "Role", "Classes"])
@@ -96,7 +156,7 @@ def manage_teachers_page():
                 ]
             )
 
-        st.data_editor(
+        edited = st.data_editor(
             df,
             num_rows="dynamic",
             column_config={
@@ -109,6 +169,9 @@ def manage_teachers_page():
             key="teachers_editor",
         )
 
+        if st.button("💾 Save Table Changes"):
+            save_teacher_table(df, edited, teachers_by_id, class_options)
+
     # =====================
     # ADD / UPDATE FORM
     # =====================
@@ -117,7 +180,7 @@ def manage_teachers_page():
         st.session_state.setdefault("edit_teacher_selected_id", "")
 
         # Dropdown for edit
-        edit_options = [""] + [str(t["id"]) for t in teachers]
+        edit_options = [""] + list(teachers_by_id)
         selected_id = st.selectbox(
             "Select a teacher to update/delete",
             edit_options,
@@ -126,17 +189,13 @@ def manage_teachers_page():
                 if st.session_state.get("edit_teacher_selected_id", "") in edit_options
                 else 0
             ),
-            format_func=lambda x: (
-                ""
-                if x == ""
-                else next(t["full_name"] for t in teachers if str(t["id"]) == x)
-            ),
+            format_func=lambda x: "" if x == "" else teachers_by_id[x]["full_name"],
         )
         st.session_state["edit_teacher_selected_id"] = selected_id
 
         # Prefill edit fields
         if selected_id:
-            teacher = next(t for t in teachers if str(t["id"]) == selected_id)
+            teacher = teachers_by_id[selected_id]
             st.session_state.setdefault("edit_full_name", teacher["full_name"])
             st.session_state.setdefault("edit_email", teacher["email"])
             st.session_state.setdefault("edit_role", teacher.get("role", "teacher"))
@@ -168,7 +227,7 @@ def manage_teachers_page():
                 with col1:
                     if st.form_submit_button("Update Teacher"):
                         update_teacher(
-                            user_id=selected_id,
+                            auth_user_id=teacher["auth_user_id"],
                             full_name=(full_name or "").strip(),
                             email=(email or "").strip(),
                             role=role,
@@ -181,7 +240,7 @@ def manage_teachers_page():
 
                 with col2:
                     if st.form_submit_button("Delete Teacher"):
-                        delete_teacher(selected_id)
+                        delete_teacher(teacher["auth_user_id"])
                         st.success("Teacher deleted successfully!")
                         reset_form()
                         st.rerun()
@@ -227,37 +286,45 @@ def manage_teachers_page():
         "Upload CSV or Excel file", type=["csv", "xlsx"], key="bulk_upload_file"
     )
 
-    # Preview and process immediately
+    # Preview and process immediately (once per file content)
     if uploaded_file is not None:
         try:
-            if uploaded_file.name.endswith(".csv"):
-                df = pd.read_csv(uploaded_file)
-            else:
-                df = pd.read_excel(uploaded_file)
-
-            # Preview table
-            st.write("### File Preview:")
-            st.dataframe(df, width="stretch")
-
-            # Process rows
-            added_count = 0
-            for _, row in df.iterrows():
-                full_name = str(row.get("full_name", "")).strip()
-                email = str(row.get("email", "")).strip()
-                password = str(row.get("password", "")).strip()
-                classes_raw = str(row.get("classes", "")).strip()
-                classes = [c.strip() for c in classes_raw.split(",") if c.strip()]
-
-                if full_name and email and password:
-                    create_teacher(
-                        full_name=full_name,
-                        email=email,
-                        password=password,
-                        classes=classes,
-                    )
-                    added_count += 1
-
-            st.success(f"Bulk upload completed! {added_count} teachers added.")
+            file_hash = hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+            provisioned = st.session_state.setdefault("provisioned_teacher_files", {})
+
+            # Preview only the first rows (passwords hidden)
+            st.write(f"### File Preview (first {PREVIEW_ROWS} rows):")
+            st.dataframe(
+                preview_roster(uploaded_file, PREVIEW_ROWS).drop(columns=["password"], errors="ignore"),
+                width="stretch",
+            )
+
+            if file_hash not in provisioned:
+                progress = st.progress(0.0, text="Creating teacher accounts...")
+                provisioned[file_hash] = provision_teachers(
+                    [
+                        row
+                        for chunk in iter_roster_chunks(uploaded_file)
+                        for row in teacher_rows_from_df(chunk)
+                    ],
+                    on_progress=lambda done, total: progress.progress(
+                        done / total, text=f"Creating teacher accounts... {done}/{total}"
+                    ),
+                )
+                progress.empty()
+            report = provisioned[file_hash]
+
+            st.success(
+                f"Bulk upload completed! {report['created']} teachers added, "
+                f"{report['failed']} failed ({report['seconds']:.1f}s)."
+            )
+            if report["errors"]:
+                st.dataframe(pd.DataFrame(report["errors"]), width="stretch")
+            if report["orphaned"]:
+                st.warning(
+                    "Some auth users could not be rolled back after a profile "
+                    f"insert failed: {', '.join(report['orphaned'])}"
+                )
 
         except Exception as e:
             st.error(f"Error processing uploaded file: {e}")
@@ -0,0 +1,127 @@
+# pages/admin/performance.py
+import pandas as pd
+import streamlit as st
+
+from core.auth import get_current_user
+from core.db import metrics
+
+
+def _per_run(df: pd.DataFrame) -> pd.DataFrame:
+    runs = df.dropna(subset=["run_id"])
+    return (
+        runs.groupby(["run_id", "page"])
+        .agg(queries=("ms", "size"), total_ms=("ms", "sum"), rows=("rows", "sum"), bytes=("response_bytes", "sum"))
+        .reset_index()
+    )
+
+
+def performance_page():
+    user = get_current_user()
+    if not user or user.get("role") != "admin":
+        st.warning("Access denied.")
+        return
+
+    st.subheader("⏱️ Database Performance")
+    st.caption(
+        "Requests recorded by this server process since it started (most recent "
+        f"{metrics.DB_METRICS_BUFFER:,}). Filter shapes show columns and operators, never values."
+    )
+    if not metrics.DB_METRICS:
+        st.info("Recording is off (DB_METRICS=0).")
+        return
+
+    records = metrics.recent()
+    if not records:
+        st.info("No requests recorded yet.")
+        return
+
+    df = pd.DataFrame(records)
+    pages = sorted(df["page"].unique())
+    selected_page = st.selectbox("Page", ["All Pages"] + pages)
+    if selected_page != "All Pages":
+        df = df[df["page"] == selected_page]
+
+    runs = _per_run(df)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Requests", f"{len(df):,}")
+    col2.metric("Reruns", f"{len(runs):,}")
+    col3.metric("Median ms / rerun", f"{runs['total_ms'].median():.0f}" if not runs.empty else "-")
+
+    # -----------------------------
+    # PER PAGE
+    # -----------------------------
+    st.markdown("### Per Page")
+    per_page = (
+        runs.groupby("page")
+        .agg(
+            reruns=("run_id", "size"),
+            queries_per_rerun=("queries", "mean"),
+            ms_per_rerun=("total_ms", "mean"),
+            max_ms_per_rerun=("total_ms", "max"),
+        )
+        .sort_values("ms_per_rerun", ascending=False)
+        .round(1)
+    )
+    st.dataframe(per_page, width="stretch")
+
+    # -----------------------------
+    # PER TABLE AND QUERY SHAPE
+    # -----------------------------
+    st.markdown("### Per Table and Query Shape")
+    per_shape = (
+        df.groupby(["table", "operation", "shape"])
+        .agg(
+            count=("ms", "size"),
+            total_ms=("ms", "sum"),
+            avg_ms=("ms", "mean"),
+            max_ms=("ms", "max"),
+            rows=("rows", "sum"),
+            kb=("response_bytes", lambda b: b.sum() / 1024),
+            errors=("status", lambda s: int((s >= 400).sum())),
+        )
+        .sort_values("total_ms", ascending=False)
+        .round(1)
+        .reset_index()
+    )
+    st.dataframe(per_shape, width="stretch", hide_index=True)
+
+    # -----------------------------
+    # QUERY BUDGET / N+1
+    # -----------------------------
+    st.markdown("### Query Budget Violations")
+    st.caption(
+        f"More than {metrics.DB_QUERY_BUDGET} requests in one rerun, or {metrics.DB_N_PLUS_ONE}+ identical "
+        f"requests (same table, operation and filter shape) in one rerun. Mode: {metrics.DB_QUERY_BUDGET_MODE}."
+    )
+    found = metrics.violations(page=None if selected_page == "All Pages" else selected_page)
+    if found:
+        problems = pd.DataFrame(found)
+        problems["ts"] = pd.to_datetime(problems["ts"], unit="s")
+        st.dataframe(problems.iloc[::-1], width="stretch", hide_index=True)
+    else:
+        st.success("No violations recorded.")
+
+    # -----------------------------
+    # RECENT RERUNS / SLOWEST REQUESTS
+    # -----------------------------
+    st.markdown("### Recent Reruns")
+    st.dataframe(runs.sort_values("run_id", ascending=False).head(50).round(1), width="stretch", hide_index=True)
+
+    st.markdown("### Slowest Requests")
+    slowest = df.sort_values("ms", ascending=False).head(20).copy()
+    slowest["ts"] = pd.to_datetime(slowest["ts"], unit="s")
+    st.dataframe(slowest.round(1), width="stretch", hide_index=True)
+
+    # -----------------------------
+    # EXPORT / RESET
+    # -----------------------------
+    col_export, col_clear = st.columns(2)
+    col_export.download_button(
+        "📥 Export JSON Lines",
+        data=metrics.export_jsonl(metrics.recent(page=None if selected_page == "All Pages" else selected_page)),
+        file_name="db_metrics.jsonl",
+        mime="application/x-ndjson",
+    )
+    if col_clear.button("🗑️ Clear Recorded Requests"):
+        metrics.clear()
+        st.rerun()
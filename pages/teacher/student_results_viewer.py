@@ -1,34 +1,97 @@
+import io
+import zipfile
+
 import streamlit as st
 import pandas as pd
 from core.auth import get_current_user
 from core.db_classes import get_classes
-from core.db_students import get_students
+from core.db_students import get_students_by_class
 from core.db_teachers import get_teachers
 from core.db_student_final_results import get_final_results
-from core.db_student_scores import supabase, _safe_execute  # helper for fetching scores
+from core.db_student_scores import get_class_scores
+from core.services.report_cards import build_report_cards, render_cached_report_cards
+from core.terms import TERMS, current_term, academic_year_options
+
+
+SCORE_COLUMNS = {
+    "subject_name": "Subject",
+    "class_score": "Class Score",
+    "exam_score": "Exam Score",
+    "weighted_class_score": "Weighted Class Score",
+    "weighted_exam_score": "Weighted Exam Score",
+    "total_score": "Total Score",
+    "position": "Position"
+}
+
 
-def get_student_scores_with_subjects(student_id: str, class_id: str):
+def _zip_report_cards(cards: list[dict], per_student: dict[str, bytes]) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for card in cards:
+            name = f"{card['student_name'].replace(' ', '_')}_{card['student_id'][:8]}.pdf"
+            archive.writestr(name, per_student[card["student_id"]])
+    return buffer.getvalue()
+
+
+def report_card_downloads(class_row: dict, term: int, academic_year: str, student_ids: list[str] | None):
     """
-    Fetch student scores with subject names included.
+    Render report cards on demand (the whole class, or only student_ids)
+    and offer downloads. Unchanged cards are not re-rendered (the data is still fetched).
     """
-    rows = _safe_execute(
-        supabase.table("student_scores")
-        .select("*, subjects(id, subject_name)")
-        .eq("student_id", student_id)
-        .eq("class_id", class_id)
+    st.markdown("### 🖨️ Report Cards (PDF)")
+    whole_class = student_ids is None
+    key = ("report_cards", class_row["id"], academic_year, term, tuple(student_ids or ()))
+    file_stem = f"{class_row['class_name'].replace(' ', '_')}_{academic_year.replace('/', '-')}_term{term}"
+
+    label = "Generate Class Report Cards" if whole_class else "Generate Report Card"
+    if st.button(label, key=f"report_cards_{class_row['id']}_{academic_year}_{term}"):
+        try:
+            with st.spinner("Rendering report cards..."):
+                cards = build_report_cards(class_row, term, academic_year, student_ids)
+                per_student, class_pdf = render_cached_report_cards(cards, merged=whole_class)
+        except Exception as e:
+            st.error(f"Could not render report cards: {e}")
+            return
+        if not cards:
+            st.info("No scores found for this selection.")
+            return
+        st.session_state[key] = {
+            "cards": [(card["student_name"], card["student_id"]) for card in cards],
+            "class_pdf": class_pdf,
+            "per_student": per_student,
+        }
+
+    rendered = st.session_state.get(key)
+    if not rendered:
+        return
+
+    if not whole_class:
+        for name, student_id in rendered["cards"]:
+            st.download_button(
+                f"📥 {name} Report Card",
+                data=rendered["per_student"][student_id],
+                file_name=f"{name.replace(' ', '_')}_{file_stem}.pdf",
+                mime="application/pdf",
+                key=f"report_card_{student_id}_{academic_year}_{term}",
+            )
+        return
+
+    cards = [{"student_name": name, "student_id": sid} for name, sid in rendered["cards"]]
+    st.caption(f"{len(cards)} report card(s) ready.")
+    col_pdf, col_zip = st.columns(2)
+    col_pdf.download_button(
+        "📥 Class PDF",
+        data=rendered["class_pdf"],
+        file_name=f"{file_stem}.pdf",
+        mime="application/pdf",
     )
-    scores = []
-    for r in rows:
-        scores.append({
-            "subject_id": r["subject_id"],
-            "subject_name": r.get("subjects", {}).get("subject_name") if r.get("subjects") else None,
-            "class_score": r.get("class_score"),
-            "exam_score": r.get("exam_score"),
-            "weighted_class_score": r.get("weighted_class_score"),
-            "weighted_exam_score": r.get("weighted_exam_score"),
-            "total_score": r.get("total_score")
-        })
-    return scores
+    col_zip.download_button(
+        "📥 One PDF per Student (zip)",
+        data=_zip_report_cards(cards, rendered["per_student"]),
+        file_name=f"{file_stem}.zip",
+        mime="application/zip",
+    )
+
 
 def student_results_viewer_page():
     user = get_current_user()
@@ -59,10 +122,12 @@ def student_results_viewer_page():
     academic_level = class_row["academic_level"]
 
     # ------------------------------ Select Term ------------------------------
-    term = st.selectbox("Select Term", [1, 2, 3], index=0)
+    col_year, col_term = st.columns(2)
+    academic_year = col_year.selectbox("Academic Year", academic_year_options())
+    term = col_term.selectbox("Select Term", TERMS, index=TERMS.index(current_term()))
 
     # ------------------------------ Filter Students ------------------------------
-    students_in_class = [s for s in get_students() if s["assigned_class"] == class_name]
+    students_in_class = get_students_by_class(class_name)
     if not students_in_class:
         st.info("No students found in this class.")
         return
@@ -77,59 +142,62 @@ def student_results_viewer_page():
         student_obj = next(s for s in students_in_class if s["full_name"] == selected_student_name)
         student_ids = [student_obj["id"]]
 
+    report_card_downloads(
+        class_row, term, academic_year,
+        None if selected_student_name == "All Students" else student_ids
+    )
+
+    # ------------------------------ Load class results (two queries) ------------------------------
+    final_df = pd.DataFrame(get_final_results(class_id=class_id, term=term, academic_year=academic_year))
+    scores_df = pd.DataFrame(get_class_scores(class_id=class_id, term=term, academic_year=academic_year))
+
     # ------------------------------ Display Final Results ------------------------------
-    final_results_data = []
-    for sid in student_ids:
-        final_results = get_final_results(student_id=sid, class_id=class_id, term=term)
-        if not final_results:
-            continue
-        fr = final_results[0]
-        final_results_data.append({
-            "Student Name": student_map[sid]["full_name"],
+    if not final_df.empty:
+        final_df = final_df.drop_duplicates("student_id").set_index("student_id")
+        final_df = final_df.reindex([sid for sid in student_ids if sid in final_df.index])
+
+    if not final_df.empty:
+        st.markdown("### 🏆 Final Results")
+        df_final = pd.DataFrame({
+            "Student Name": [student_map[sid]["full_name"] for sid in final_df.index],
             "Class": class_name,
+            "Academic Year": academic_year,
             "Term": term,
-            "Grand Total": fr.get("grand_total"),
-            "Aggregate": fr.get("aggregate"),
-            "Final Grade": fr.get("final_grade"),
-            "Descriptor": fr.get("descriptor"),
-            "Remark": fr.get("remark")
+            "Position": final_df["position"].to_list() if "position" in final_df else None,
+            "Grand Total": final_df["grand_total"].to_list(),
+            "Aggregate": final_df["aggregate"].to_list(),
+            "Final Grade": final_df["final_grade"].to_list(),
+            "Descriptor": final_df["descriptor"].to_list(),
+            "Remark": final_df["remark"].to_list()
         })
-
-    if final_results_data:
-        st.markdown("### 🏆 Final Results")
-        df_final = pd.DataFrame(final_results_data)
         st.table(df_final)
     else:
         st.info("No final results found for selected student(s).")
 
     # ------------------------------ Display Subject-Level Scores ------------------------------
+    scores_by_student = (
+        dict(tuple(scores_df.groupby("student_id", sort=False)))
+        if not scores_df.empty else {}
+    )
+
     for sid in student_ids:
         st.markdown(f"### 📊 Subject Scores: {student_map[sid]['full_name']}")
-        scores = get_student_scores_with_subjects(student_id=sid, class_id=class_id)
-        if not scores:
+        student_scores = scores_by_student.get(sid)
+        if student_scores is None:
             st.info("No subject-level scores found.")
             continue
 
-        df_scores = pd.DataFrame(scores)
         # Reorder columns for clarity
-        df_scores = df_scores[
-            ["subject_name", "class_score", "exam_score", "weighted_class_score", "weighted_exam_score", "total_score"]
-        ].rename(columns={
-            "subject_name": "Subject",
-            "class_score": "Class Score",
-            "exam_score": "Exam Score",
-            "weighted_class_score": "Weighted Class Score",
-            "weighted_exam_score": "Weighted Exam Score",
-            "total_score": "Total Score"
-        })
+        df_scores = student_scores.reindex(columns=list(SCORE_COLUMNS)).rename(columns=SCORE_COLUMNS)
 
-        st.dataframe(df_scores, width="stretch")
+        st.dataframe(df_scores, width="stretch", hide_index=True)
 
         # CSV download per student
         csv_data = df_scores.to_csv(index=False).encode("utf-8")
         st.download_button(
             label=f"📥 Download {student_map[sid]['full_name']} Scores CSV",
             data=csv_data,
-            file_name=f"{student_map[sid]['full_name'].replace(' ', '_')}_scores_term{term}.csv",
-            mime="text/csv"
+            file_name=f"{student_map[sid]['full_name'].replace(' ', '_')}_scores_{academic_year.replace('/', '-')}_term{term}.csv",
+            mime="text/csv",
+            key=f"scores_csv_{sid}_{academic_year}_{term}"
         )
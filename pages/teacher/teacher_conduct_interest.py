@@ -1,9 +1,10 @@
 # pages/teacher/teacher_conduct_interest.py
 import streamlit as st
 from core.auth import get_current_user
-from core.db_students import get_students
+from core.db_students import get_students_by_class
 from core.db_admin_settings import get_all_conduct, get_all_interest
-from core.db_conduct_interest import save_student_conduct_interest
+from core.db_conduct_interest import get_student_conduct_interest, save_conduct_interest_bulk
+from core.terms import TERMS, current_term, academic_year_options
 
 
 def teacher_conduct_interest_page():
@@ -28,24 +29,16 @@ def teacher_conduct_interest_page():
     st.subheader(f"Conduct, Interest & Attendance — {class_name}")
 
     # --------------------------------------------------
-    # Term selection
+    # Academic year / term selection
     # --------------------------------------------------
-    term = st.number_input(
-        "Term",
-        min_value=1,
-        max_value=3,
-        step=1,
-        value=1,
-    )
+    col_year, col_term = st.columns(2)
+    academic_year = col_year.selectbox("Academic Year", academic_year_options())
+    term = col_term.selectbox("Term", TERMS, index=TERMS.index(current_term()))
 
     # --------------------------------------------------
-    # Load students (FILTER IN PYTHON — APP CONVENTION)
+    # Load students (filtered by the database)
     # --------------------------------------------------
-    all_students = get_students()
-    students = [
-        s for s in all_students
-        if s.get("assigned_class") == class_name
-    ]
+    students = get_students_by_class(class_name)
 
     if not students:
         st.info("No students found in this class.")
@@ -63,71 +56,92 @@ def teacher_conduct_interest_page():
 
     conduct_options = {c["conduct_name"]: c["id"] for c in conducts}
     interest_options = {i["interest_name"]: i["id"] for i in interests}
+    conduct_names = {v: k for k, v in conduct_options.items()}
+    interest_names = {v: k for k, v in interest_options.items()}
 
     # --------------------------------------------------
-    # Header row
+    # Existing entries (one class-wide fetch)
     # --------------------------------------------------
-    h1, h2, h3 = st.columns([4, 3, 2])
-    h1.markdown("**Student**")
-    h2.markdown("**Conduct / Interest**")
-    h3.markdown("**Attendance**")
+    existing = {
+        e["student_id"]: e
+        for e in get_student_conduct_interest(class_id=class_id, term=term, academic_year=academic_year)
+    }
 
-    # --------------------------------------------------
-    # Session storage
-    # --------------------------------------------------
-    st.session_state.setdefault("conduct_entries", {})
+    def option_index(options, names, selected_id):
+        name = names.get(selected_id)
+        return list(options).index(name) if name in options else 0
 
     # --------------------------------------------------
-    # Entry rows
+    # Entry rows (in a form: no rerun per widget change)
     # --------------------------------------------------
-    for student in students:
-        sid = student["id"]
+    entries = {}
+    with st.form(f"conduct_form_{class_id}_{academic_year}_{term}"):
+        h1, h2, h3 = st.columns([4, 3, 2])
+        h1.markdown("**Student**")
+        h2.markdown("**Conduct / Interest**")
+        h3.markdown("**Attendance**")
 
-        c1, c2, c3 = st.columns([4, 3, 2])
+        for student in students:
+            sid = student["id"]
+            saved = existing.get(sid, {})
 
-        c1.write(student["full_name"])
+            c1, c2, c3 = st.columns([4, 3, 2])
 
-        conduct_choice = c2.selectbox(
-            "Conduct",
-            options=list(conduct_options.keys()),
-            key=f"conduct_{sid}_{class_name}_{term}",
-            label_visibility="collapsed",
-        )
+            c1.write(student["full_name"])
 
-        interest_choice = c2.selectbox(
-            "Interest",
-            options=list(interest_options.keys()),
-            key=f"interest_{sid}_{class_name}_{term}",
-            label_visibility="collapsed",
-        )
+            conduct_choice = c2.selectbox(
+                "Conduct",
+                options=list(conduct_options.keys()),
+                index=option_index(conduct_options, conduct_names, saved.get("conduct_id")),
+                key=f"conduct_{sid}_{class_name}_{academic_year}_{term}",
+                label_visibility="collapsed",
+            )
 
-        attendance = c3.number_input(
-            "Attendance",
-            min_value=0,
-            max_value=100,
-            value=0,
-            key=f"attendance_{sid}_{class_name}_{term}",
-            label_visibility="collapsed",
-        )
+            interest_choice = c2.selectbox(
+                "Interest",
+                options=list(interest_options.keys()),
+                index=option_index(interest_options, interest_names, saved.get("interest_id")),
+                key=f"interest_{sid}_{class_name}_{academic_year}_{term}",
+                label_visibility="collapsed",
+            )
 
-        st.session_state["conduct_entries"][sid] = {
-            "conduct_id": conduct_options[conduct_choice],
-            "interest_id": interest_options[interest_choice],
-            "attendance": attendance,
-        }
+            attendance = c3.number_input(
+                "Attendance",
+                min_value=0,
+                max_value=100,
+                value=int(saved.get("attendance") or 0),
+                key=f"attendance_{sid}_{class_name}_{academic_year}_{term}",
+                label_visibility="collapsed",
+            )
+
+            entries[sid] = {
+                "student_id": sid,
+                "conduct_id": conduct_options[conduct_choice],
+                "interest_id": interest_options[interest_choice],
+                "attendance": attendance,
+            }
+
+        submitted = st.form_submit_button("💾 Save All Entries")
 
     # --------------------------------------------------
-    # Save all
+    # Save only new or changed rows, in one upsert
     # --------------------------------------------------
-    if st.button("💾 Save All Entries"):
-        for student_id, entry in st.session_state["conduct_entries"].items():
-            save_student_conduct_interest(
-                student_id=student_id,
-                class_id=class_id,
-                term=term,
-                conduct_id=entry["conduct_id"],
-                interest_id=entry["interest_id"],
-                attendance=entry["attendance"],
-            )
-
-        st.success("Conduct, interest, and attendance saved successfully!")
+    if submitted:
+        # Students without a stored row count as changed only when the
+        # teacher moved a field off the form defaults, so untouched rows
+        # stay "not entered" instead of being saved as defaults
+        form_defaults = {
+            "conduct_id": next(iter(conduct_options.values())),
+            "interest_id": next(iter(interest_options.values())),
+            "attendance": 0,
+        }
+        changed = [
+            entry
+            for sid, entry in entries.items()
+            if any(entry[f] != existing.get(sid, form_defaults).get(f) for f in form_defaults)
+        ]
+
+        if not changed:
+            st.info("No changes to save.")
+        elif save_conduct_interest_bulk(class_id, term, academic_year, changed):
+            st.success(f"Conduct, interest, and attendance saved for {len(changed)} student(s)!")
@@ -1,6 +1,7 @@
 # pages/teacher/teacher_dashboard.py
 import streamlit as st
 from core.auth import get_current_user, logout_user
+from core.db import set_page
 from . import teacher_score_entry
 from . import teacher_conduct_interest
 from . import student_results_viewer
@@ -15,6 +16,7 @@ def teacher_dashboard_page():
     # Current user
     # -------------------------
     user = get_current_user()
+    set_page("teacher")
     if not user or user.get("role") != "teacher":
         st.warning("You do not have permission to access this page.")
         return
@@ -53,6 +55,7 @@ def teacher_dashboard_page():
 
     # Display sidebar and get selection
     page = st.sidebar.radio("Go to", sidebar_items, key="teacher_sidebar")
+    set_page(f"teacher/{page.split(' - ')[0]}")
 
     # -------------------------
     # Handle Logout
@@ -1,13 +1,26 @@
+import hashlib
 import streamlit as st
+import pandas as pd
 from core.auth import get_current_user
-from core.db_students import get_students
+from core.db_students import get_students_by_class
 from core.db_classes import get_classes
 from core.db_subject_assignments import get_subjects_for_class
 from core.db_score_settings import get_score_setting_for_level
-from core.db_student_scores import save_student_subject_score, _safe_execute, supabase
-from core.services.final_result_engine import generate_final_result
-from core.db_student_final_results import save_final_result
+from core.db_student_scores import (
+    save_student_scores_bulk,
+    save_class_scores_bulk,
+    import_class_scores,
+    get_class_scores,
+    save_subject_positions,
+    _safe_execute,
+    supabase,
+)
+from core.services.final_result_engine import generate_final_result, generate_class_rankings, recompute_dirty_results
+from core.services.dirty_results import pending
+from core.terms import TERMS, current_term, academic_year_options
+from core.db_student_final_results import save_final_result, save_final_results_bulk
 from core.db_teachers import get_teachers
+from utils.roster_reader import iter_roster_chunks
 
 
 def enter_student_scores_page():
@@ -34,16 +47,18 @@ def enter_student_scores_page():
     class_id = class_row["id"]
     academic_level = class_row["academic_level"]
 
-    # ------------------------- Select student -------------------------
-    students = [s for s in get_students() if s["assigned_class"] == class_name]
+    # ------------------------- Term -------------------------
+    col_year, col_term = st.columns(2)
+    academic_year = col_year.selectbox("Academic Year", academic_year_options())
+    term = col_term.selectbox("Term", TERMS, index=TERMS.index(current_term()))
+    period = {"term": term, "academic_year": academic_year}
+
+    # ------------------------- Students -------------------------
+    students = get_students_by_class(class_name)
     if not students:
         st.info("No students in this class.")
         return
 
-    student_map = {s["full_name"]: s for s in students}
-    student_name = st.selectbox("Select Student", list(student_map.keys()))
-    student_id = student_map[student_name]["id"]
-
     # ------------------------- Load subjects -------------------------
     raw_subjects = get_subjects_for_class(class_id)
     if not raw_subjects:
@@ -51,15 +66,20 @@ def enter_student_scores_page():
         return
 
     subjects = []
+    subject_names = []
     for s in raw_subjects:
         if isinstance(s, dict) and "subjects" in s:
             subjects.append({"id": s["subjects"]["id"], "subject_name": s["subjects"]["subject_name"]})
         elif isinstance(s, dict) and "id" in s:
             subjects.append(s)
         elif isinstance(s, str):
-            row = supabase.table("subjects").select("id, subject_name").eq("subject_name", s).single().execute()
-            if row.data:
-                subjects.append(row.data)
+            subject_names.append(s)
+
+    # Resolve bare subject names in one query, not one per subject
+    if subject_names:
+        subjects.extend(_safe_execute(
+            supabase.table("subjects").select("id, subject_name").in_("subject_name", subject_names)
+        ))
 
     if not subjects:
         st.error("Subjects could not be resolved.")
@@ -71,12 +91,248 @@ def enter_student_scores_page():
         st.error("Score settings not configured for this academic level.")
         return
 
+    # ------------------------- Entry mode -------------------------
+    entry_mode = st.radio(
+        "Entry mode", ["📋 Whole class", "👤 One student"], horizontal=True, key="score_entry_mode"
+    )
+    if entry_mode == "📋 Whole class":
+        class_score_grid(class_id, academic_level, students, subjects, settings, period)
+    else:
+        student_score_form(class_id, academic_level, students, subjects, settings, period)
+
+    # ------------------------- Upload scores for the whole class -------------------------
+    with st.expander("📤 Upload Scores for the Whole Class (CSV or Excel)"):
+        score_columns = ["class_score", "exam_score"] if settings.get("has_components") else ["exam_score"]
+        template = pd.DataFrame(
+            [
+                {"student": s["full_name"], "subject": subj["subject_name"], **dict.fromkeys(score_columns, "")}
+                for s in students
+                for subj in subjects
+            ]
+        )
+        st.download_button(
+            "⬇️ Download Template",
+            template.to_csv(index=False),
+            file_name=f"{class_name}_scores.csv",
+            mime="text/csv",
+        )
+
+        uploaded_file = st.file_uploader(
+            f"Columns: student, subject, {', '.join(score_columns)}",
+            type=["csv", "xlsx"],
+            key=f"score_upload_{class_id}_{academic_year}_{term}",
+        )
+        if uploaded_file is not None:
+            try:
+                # Only import a given file (by content hash) once per session
+                file_hash = hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+                imported = st.session_state.setdefault("imported_score_files", {})
+                import_key = (class_id, term, academic_year, file_hash)
+                if import_key not in imported:
+                    imported[import_key] = import_class_scores(
+                        pd.concat(iter_roster_chunks(uploaded_file), ignore_index=True),
+                        class_id=class_id,
+                        academic_level=academic_level,
+                        students=students,
+                        subjects=subjects,
+                        **period,
+                    )
+                    refresh_final_results(class_id)
+                report = imported[import_key]
+
+                st.success(
+                    f"{report['saved']} score(s) saved from {report['rows']} row(s) "
+                    f"in {report['seconds']:.1f}s ({report['blank']} blank row(s) ignored)."
+                )
+                if report["superseded"]:
+                    st.info(f"{report['superseded']} duplicate row(s) replaced by a later row.")
+                if report["errors"]:
+                    st.dataframe(pd.DataFrame(report["errors"]), width="stretch")
+            except Exception as e:
+                st.error(f"Error processing uploaded file: {e}")
+
+    # ------------------------- Generate final results for whole class -------------------------
+    if st.button("📚 Generate Final Results for Whole Class"):
+        try:
+            results, ranked_scores = generate_class_rankings(
+                class_id=class_id,
+                level=academic_level,
+                **period
+            )
+            if results:
+                saved = save_final_results_bulk(results)
+                if len(saved) != len(results):
+                    raise RuntimeError(f"saved {len(saved)} of {len(results)} results")
+                save_subject_positions(ranked_scores)
+        except (RuntimeError, ValueError) as e:
+            st.error(f"⚠️ Final results were not generated: {e}")
+        else:
+            if results:
+                st.success(
+                    f"Final results and positions generated for {len(results)} student(s) "
+                    f"in {class_name} (term {term}, {academic_year})!"
+                )
+            else:
+                st.info(f"No final results generated for {class_name} (excluded level or no scores).")
+
+    # ------------------------- Back button -------------------------
+    if st.button("⬅️ Back to Dashboard"):
+        st.session_state.page = "teacher_dashboard"
+        st.rerun()
+
+
+# -------------------------------------------------
+# Keep final results fresh after score writes
+# -------------------------------------------------
+def refresh_final_results(class_id):
+    """Recompute final results only for the students whose scores changed."""
+    updated = recompute_dirty_results(class_id)
+    if updated:
+        st.caption(f"🔄 Final results updated for {updated} student(s).")
+    left = pending(class_id)
+    if left:
+        st.warning(
+            f"{left} final result(s) or subject ranking(s) could not be refreshed; "
+            "they will be retried on the next save."
+        )
+
+
+# -------------------------------------------------
+# Whole class grid (students × subjects)
+# -------------------------------------------------
+def _grid_columns(subjects, has_components):
+    """Grid column label -> (subject_id, score field)."""
+    columns = {}
+    for subj in subjects:
+        if has_components:
+            columns[f"{subj['subject_name']} · Class"] = (subj["id"], "class_score")
+            columns[f"{subj['subject_name']} · Exam"] = (subj["id"], "exam_score")
+        else:
+            columns[subj["subject_name"]] = (subj["id"], "exam_score")
+    return columns
+
+
+def _score_value(value):
+    if pd.isna(value):
+        return None
+    return int(value) if float(value).is_integer() else float(value)
+
+
+def class_score_grid(class_id, academic_level, students, subjects, settings, period):
+    has_components = bool(settings.get("has_components"))
+    grid_columns = _grid_columns(subjects, has_components)
+
+    # One query for every score in the class
+    existing = {
+        (row["student_id"], row["subject_id"]): row
+        for row in get_class_scores(class_id=class_id, **period)
+    }
+    original = pd.DataFrame(
+        [
+            {
+                "Student": s["full_name"],
+                **{
+                    label: existing.get((s["id"], subject_id), {}).get(field)
+                    for label, (subject_id, field) in grid_columns.items()
+                },
+            }
+            for s in students
+        ],
+        index=pd.Index([s["id"] for s in students], name="student_id"),
+    )
+    original[list(grid_columns)] = original[list(grid_columns)].apply(pd.to_numeric, errors="coerce")
+
+    max_scores = {
+        "class_score": int(settings["max_class_score"]),
+        "exam_score": int(settings["max_exam_score"]),
+    }
+    column_config = {
+        "Student": st.column_config.TextColumn("Student", disabled=True),
+        **{
+            label: st.column_config.NumberColumn(label, min_value=0, max_value=max_scores[field], step=1)
+            for label, (_, field) in grid_columns.items()
+        },
+    }
+
+    # Inside a form, edits do not rerun the script until Save is pressed
+    grid_key = f"{class_id}_{period['academic_year']}_{period['term']}"
+    with st.form(f"score_grid_form_{grid_key}"):
+        edited = st.data_editor(
+            original,
+            column_config=column_config,
+            hide_index=True,
+            num_rows="fixed",
+            width="stretch",
+            key=f"score_grid_{grid_key}",
+        )
+        submitted = st.form_submit_button("💾 Save Changed Scores")
+
+    if not submitted:
+        return
+
+    # Only the (student, subject) pairs with at least one edited cell
+    scores = original[list(grid_columns)]
+    new_scores = edited[list(grid_columns)]
+    dirty = new_scores.ne(scores) & ~(new_scores.isna() & scores.isna())
+
+    changed = dict.fromkeys(
+        (student_id, grid_columns[label][0])
+        for student_id, label in dirty.stack().loc[lambda cells: cells].index
+    )
+
+    if not changed:
+        st.info("No changes to save.")
+        return
+
+    labels_by_subject = {}
+    for label, (subject_id, field) in grid_columns.items():
+        labels_by_subject.setdefault(subject_id, {})[field] = label
+
+    score_rows = []
+    for student_id, subject_id in changed:
+        labels = labels_by_subject[subject_id]
+        score_rows.append({
+            "student_id": student_id,
+            "subject_id": subject_id,
+            "class_score": _score_value(edited.at[student_id, labels["class_score"]]) if "class_score" in labels else None,
+            "exam_score": _score_value(edited.at[student_id, labels["exam_score"]]),
+        })
+
+    try:
+        saved, errors = save_class_scores_bulk(
+            class_id=class_id,
+            academic_level=academic_level,
+            score_rows=score_rows,
+            **period,
+        )
+    except (RuntimeError, ValueError) as e:
+        st.error(f"⚠️ Scores were not saved: {e}")
+        return
+    student_names = {s["id"]: s["full_name"] for s in students}
+    subject_names = {subj["id"]: subj["subject_name"] for subj in subjects}
+    for err in errors:
+        st.error(f"{student_names.get(err['student_id'])} — {subject_names.get(err['subject_id'])}: {err['error']}")
+    if saved:
+        st.success(f"Saved {len(saved)} changed score(s) in one update!")
+        refresh_final_results(class_id)
+
+
+# -------------------------------------------------
+# One student at a time
+# -------------------------------------------------
+def student_score_form(class_id, academic_level, students, subjects, settings, period):
+    student_map = {s["full_name"]: s for s in students}
+    student_name = st.selectbox("Select Student", list(student_map.keys()))
+    student_id = student_map[student_name]["id"]
+
     # ------------------------- Existing scores -------------------------
     existing_scores = _safe_execute(
         supabase.table("student_scores")
         .select("*")
         .eq("student_id", student_id)
         .eq("class_id", class_id)
+        .eq("academic_year", period["academic_year"])
+        .eq("term", period["term"])
     )
     existing_map = {s["subject_id"]: s for s in existing_scores}
 
@@ -110,7 +366,7 @@ def enter_student_scores_page():
                     max_value=int(settings["max_class_score"]),
                     value=int(existing.get("class_score") or 0),
                     step=1,
-                    key=f"class_{idx}_{subj_id}_{student_id}",
+                    key=f"class_{idx}_{subj_id}_{student_id}_{period['academic_year']}_{period['term']}",
                     label_visibility="collapsed"
                 )
                 exam_scores[subj_id] = col_e.number_input(
@@ -119,7 +375,7 @@ def enter_student_scores_page():
                     max_value=int(settings["max_exam_score"]),
                     value=int(existing.get("exam_score") or 0),
                     step=1,
-                    key=f"exam_{idx}_{subj_id}_{student_id}",
+                    key=f"exam_{idx}_{subj_id}_{student_id}_{period['academic_year']}_{period['term']}",
                     label_visibility="collapsed"
                 )
             else:
@@ -132,39 +388,47 @@ def enter_student_scores_page():
                     max_value=int(settings["max_exam_score"]),
                     value=int(existing.get("exam_score") or 0),
                     step=1,
-                    key=f"exam_{idx}_{subj_id}_{student_id}",
+                    key=f"exam_{idx}_{subj_id}_{student_id}_{period['academic_year']}_{period['term']}",
                     label_visibility="collapsed"
                 )
 
         submitted = st.form_submit_button("💾 Save All Scores")
         if submitted:
-            for subj in subjects:
-                subj_id = subj["id"]
-                save_student_subject_score(
+            try:
+                saved, errors = save_student_scores_bulk(
                     student_id=student_id,
                     class_id=class_id,
-                    subject_id=subj_id,
                     academic_level=academic_level,
-                    class_score=class_scores.get(subj_id),
-                    exam_score=exam_scores.get(subj_id)
+                    subject_scores=[
+                        {
+                            "subject_id": subj["id"],
+                            "class_score": class_scores.get(subj["id"]),
+                            "exam_score": exam_scores.get(subj["id"])
+                        }
+                        for subj in subjects
+                    ],
+                    **period
                 )
-            st.success("Scores saved successfully!")
+            except (RuntimeError, ValueError) as e:
+                st.error(f"⚠️ Scores were not saved: {e}")
+                saved, errors = [], []
+            subject_names = {subj["id"]: subj["subject_name"] for subj in subjects}
+            for err in errors:
+                st.error(f"{subject_names.get(err['subject_id'], err['subject_id'])}: {err['error']}")
+            if saved:
+                st.success(f"Scores saved successfully for {len(saved)} subject(s)!")
+                refresh_final_results(class_id)
 
     # ------------------------- Generate final result per student -------------------------
     if st.button("📄 Generate Final Result for this Student"):
         result = generate_final_result(
             student_id=student_id,
             class_id=class_id,
-            term=1,  # Replace with dynamic term if needed
-            level=academic_level
+            level=academic_level,
+            **period
         )
         if result:
             save_final_result(result)
             st.success(f"Final result generated for {student_name}!")
         else:
             st.info(f"Final result not generated for {student_name} (excluded level or no scores).")
-
-    # ------------------------- Back button -------------------------
-    if st.button("⬅️ Back to Dashboard"):
-        st.session_state.page = "teacher_dashboard"
-        st.rerun()
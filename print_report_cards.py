@@ -0,0 +1,112 @@
+# print_report_cards.py
+"""
+Render PDF report cards for every class in a term.
+
+    python print_report_cards.py --term 1
+    python print_report_cards.py --term 1 --academic-year 2024/2025 --out report_cards
+    python print_report_cards.py --term 1 --class-workers 4 --render-workers 8
+
+Writes <out>/<year>/term<term>/<class>/<student>.pdf plus <class>.pdf with
+the whole class. Class data is fetched on a thread pool (network bound);
+pages are rendered on one shared process pool (CPU bound). Every class's
+data is always fetched; cards whose data has not changed since the last
+run are not re-rendered but come from the report-card cache.
+"""
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from core.db_classes import get_classes
+from core.services.report_cards import build_report_cards, render_cached_report_cards
+from core.terms import TERMS, current_academic_year
+from utils.report_card_pdf import render_pool
+
+
+def _file_name(name: str) -> str:
+    return re.sub(r"[^\w\-]+", "_", name).strip("_") or "unnamed"
+
+
+def _write(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def print_class(cls: dict, term: int, academic_year: str, out_dir: str, pool) -> dict:
+    """Fetch, render and write one class's report cards. Returns a report dict."""
+    started = time.perf_counter()
+    report = {"class_name": cls["class_name"], "cards": 0, "error": None}
+
+    try:
+        cards = build_report_cards(cls, term, academic_year)
+        per_student, class_pdf = render_cached_report_cards(cards, pool=pool)
+
+        class_dir = os.path.join(out_dir, _file_name(cls["class_name"]))
+        os.makedirs(class_dir, exist_ok=True)
+        for card in cards:
+            name = f"{_file_name(card['student_name'])}_{card['student_id'][:8]}.pdf"
+            _write(os.path.join(class_dir, name), per_student[card["student_id"]])
+        if class_pdf:
+            _write(os.path.join(out_dir, f"{_file_name(cls['class_name'])}.pdf"), class_pdf)
+        report["cards"] = len(cards)
+    except Exception as e:
+        report["error"] = str(e)
+
+    report["seconds"] = time.perf_counter() - started
+    return report
+
+
+def print_report_cards(
+    term: int,
+    *,
+    academic_year: str | None = None,
+    out: str = "report_cards",
+    class_workers: int = 4,
+    render_workers: int | None = None
+) -> list[dict]:
+    academic_year = academic_year or current_academic_year()
+    out_dir = os.path.join(out, academic_year.replace("/", "-"), f"term{term}")
+    os.makedirs(out_dir, exist_ok=True)
+
+    reports = []
+    started = time.perf_counter()
+
+    with render_pool(render_workers) as pool, \
+            ThreadPoolExecutor(max_workers=class_workers) as threads:
+        futures = [
+            threads.submit(print_class, cls, term, academic_year, out_dir, pool)
+            for cls in get_classes()
+        ]
+        for future in as_completed(futures):
+            report = future.result()
+            reports.append(report)
+            if report["error"]:
+                print(f"❌ {report['class_name']}: {report['error']} ({report['seconds']:.2f}s)")
+            else:
+                print(f"✅ {report['class_name']}: {report['cards']} cards ({report['seconds']:.2f}s)")
+
+    failed = [r for r in reports if r["error"]]
+    print(
+        f"\nDone in {time.perf_counter() - started:.2f}s: "
+        f"{sum(r['cards'] for r in reports)} report cards in {out_dir}, {len(failed)} class(es) failed."
+    )
+    return reports
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render PDF report cards for every class in a term.")
+    parser.add_argument("--term", type=int, required=True, choices=TERMS)
+    parser.add_argument("--academic-year", help="e.g. 2024/2025 (default: current school year)")
+    parser.add_argument("--out", default="report_cards", help="output directory")
+    parser.add_argument("--class-workers", type=int, default=4, help="classes fetched concurrently")
+    parser.add_argument("--render-workers", type=int, help="render processes (default: CPU count)")
+    args = parser.parse_args()
+
+    print_report_cards(
+        args.term,
+        academic_year=args.academic_year,
+        out=args.out,
+        class_workers=args.class_workers,
+        render_workers=args.render_workers,
+    )
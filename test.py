@@ -6,6 +6,7 @@ from core.db_subject_assignments import get_subjects_for_class
 from core.db_score_settings import get_score_setting_for_level
 from core.db_student_scores import save_student_subject_score, _safe_execute, supabase
 from core.db_teachers import get_teachers
+from core.terms import current_term, current_academic_year
 
 
 def enter_student_scores_page():
@@ -185,7 +186,9 @@ def enter_student_scores_page():
                 subject_id=subj_id,
                 academic_level=academic_level,
                 class_score=class_scores.get(subj_id),
-                exam_score=exam_scores.get(subj_id)
+                exam_score=exam_scores.get(subj_id),
+                term=current_term(),
+                academic_year=current_academic_year()
             )
 
         st.success("Scores saved successfully!")
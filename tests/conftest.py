@@ -0,0 +1,32 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+# Tests never touch the network: the shared client runs on an in-memory
+# SQLite database (core/db/sqlite_backend.py)
+os.environ.setdefault("DB_BACKEND", "sqlite")
+os.environ.setdefault("SQLITE_PATH", ":memory:")
+os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def school():
+    """A seeded small school on a fresh in-memory SQLite database."""
+    from benchmarks.seed import seed_school
+    from core.db import SQLiteTransport, invalidate, use_http_transport
+    from core.services.dirty_results import drain_dirty, drain_dirty_subjects
+
+    database = SQLiteTransport(":memory:")
+    seeded = seed_school(database, "small")
+    use_http_transport(database)
+    invalidate()
+    drain_dirty()
+    drain_dirty_subjects()
+    yield {**seeded, "database": database}
+    use_http_transport(None)
+    invalidate()
+    database.close()
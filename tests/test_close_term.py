@@ -0,0 +1,28 @@
+# tests/test_close_term.py
+import httpx
+import pytest
+
+from benchmarks.seed import ACADEMIC_YEAR
+from close_term import close_term
+from core.db import invalidate, use_http_transport
+
+
+def _unavailable(request):
+    return httpx.Response(503, json={"code": "PGRST000", "message": "database unavailable"})
+
+
+def test_failed_class_read_is_not_a_no_op(tmp_path, capsys):
+    use_http_transport(httpx.MockTransport(_unavailable))
+    invalidate()
+    try:
+        with pytest.raises(RuntimeError):
+            close_term(1, academic_year=ACADEMIC_YEAR, checkpoint=str(tmp_path / "checkpoint.json"))
+    finally:
+        use_http_transport(None)
+    assert "Nothing to do" not in capsys.readouterr().out
+
+
+def test_closes_every_class(school, tmp_path):
+    reports = close_term(1, academic_year=ACADEMIC_YEAR, workers=2, checkpoint=str(tmp_path / "checkpoint.json"))
+    assert not [r for r in reports if r["error"]]
+    assert {r["class_id"] for r in reports} == {c["id"] for c in school["classes"]}
@@ -0,0 +1,74 @@
+# tests/test_compute_scores_batch.py
+import random
+
+import pytest
+
+import core.db_student_scores as scores
+from core.services.grading_index import GradingIndex
+
+SETTINGS = {
+    "Upper Primary": {"has_components": True, "class_weight": 30, "exam_weight": 70,
+                      "max_class_score": 100, "max_exam_score": 100},
+    # 50/50 of 100 gives x.5 weighted scores for every odd raw score
+    "Lower Primary": {"has_components": True, "class_weight": 50, "exam_weight": 50,
+                      "max_class_score": 100, "max_exam_score": 100},
+    "JHS": {"has_components": False, "class_weight": 0, "exam_weight": 100,
+            "max_class_score": 0, "max_exam_score": 100},
+}
+GRADING = GradingIndex([
+    {"min_score": lo, "max_score": hi, "grade": grade, "remark": remark}
+    for lo, hi, grade, remark in [
+        (80, 100, 1, "Excellent"), (70, 79, 2, "Very Good"), (60, 69, 3, "Good"),
+        (50, 59, 4, "Credit"), (40, 49, 5, "Pass"), (0, 39, 9, "Fail"),
+    ]
+])
+
+
+@pytest.fixture(autouse=True)
+def no_database(monkeypatch):
+    monkeypatch.setattr(scores, "get_score_setting_for_level", SETTINGS.get)
+    monkeypatch.setattr(scores, "get_grading_index", lambda: GRADING)
+
+
+def _assert_matches(level, class_scores, exam_scores):
+    batch = scores.compute_scores_batch(level, class_scores, exam_scores).to_dict("records")
+    single = [scores.compute_scores(level, c, e) for c, e in zip(class_scores, exam_scores)]
+    assert batch == single
+    for got, expected in zip(batch, single):
+        assert list(got) == list(expected)
+        assert {k: type(v) for k, v in got.items()} == {k: type(v) for k, v in expected.items()}
+
+
+@pytest.mark.parametrize("level", ["Upper Primary", "Lower Primary"])
+def test_weighted_integer_scores(level):
+    pairs = [(c, e) for c in range(0, 101, 7) for e in range(0, 101, 3)]
+    _assert_matches(level, [c for c, _ in pairs], [e for _, e in pairs])
+
+
+def test_weighted_half_ties():
+    # 1 -> 0.5, 3 -> 1.5, 5 -> 2.5 ...: round() goes to the even integer
+    odd = list(range(1, 100, 2))
+    _assert_matches("Lower Primary", odd, odd[::-1])
+
+
+@pytest.mark.parametrize("level", ["Upper Primary", "Lower Primary", "JHS"])
+def test_fractional_scores(level):
+    rng = random.Random(4)
+    class_scores = [round(rng.uniform(0, 100), rng.choice([1, 2])) for _ in range(500)]
+    exam_scores = [round(rng.uniform(0, 100), rng.choice([1, 2])) for _ in range(500)]
+    _assert_matches(level, class_scores + [12.5, 99.5], exam_scores + [0.5, 49.5])
+
+
+def test_exam_only_missing_and_zero_scores():
+    exam_scores = [None, 0, 0.0, 39.9, 40, 79.5, 100, None]
+    _assert_matches("JHS", [None] * len(exam_scores), exam_scores)
+
+
+@pytest.mark.parametrize("level", ["Upper Primary", "JHS"])
+def test_empty_input(level):
+    assert scores.compute_scores_batch(level, [], []).to_dict("records") == []
+
+
+def test_missing_component_score_raises():
+    with pytest.raises(ValueError):
+        scores.compute_scores_batch("Upper Primary", [10, None], [20, 30])
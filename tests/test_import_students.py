@@ -0,0 +1,33 @@
+# tests/test_import_students.py
+import httpx
+import pandas as pd
+import pytest
+
+from core.db import use_http_transport
+from core.db_students import bulk_import_students
+
+
+def _roster(school, count):
+    cls = school["classes"][0]["class_name"]
+    return pd.DataFrame({"full_name": [f"New Student {i}" for i in range(count)], "assigned_class": cls})
+
+
+def test_reimport_skips_existing_students(school):
+    first = bulk_import_students(_roster(school, 5))
+    again = bulk_import_students(_roster(school, 5))
+    assert (first["inserted"], again["inserted"], again["skipped"]) == (5, 0, 5)
+
+
+def test_failed_duplicate_check_inserts_nothing(school):
+    database = school["database"]
+    before = len(database.rows("students"))
+
+    def reads_fail(request):
+        if request.method == "GET":
+            return httpx.Response(503, json={"code": "PGRST000", "message": "database unavailable"})
+        return database.handle_request(request)
+
+    use_http_transport(httpx.MockTransport(reads_fail))
+    with pytest.raises(RuntimeError, match="could not check for existing students"):
+        bulk_import_students(_roster(school, 5))
+    assert len(database.rows("students")) == before
@@ -0,0 +1,74 @@
+# tests/test_incremental_results.py
+from benchmarks.seed import ACADEMIC_YEAR
+from core.db_student_scores import save_class_scores_bulk, save_subject_positions
+from core.services.dirty_results import mark_dirty, pending
+from core.services.final_result_engine import generate_class_rankings, recompute_dirty_results
+
+
+def _positions(database, class_id):
+    return {
+        (r["student_id"], r["subject_id"]): r["position"]
+        for r in database.rows("student_scores")
+        if r["class_id"] == class_id and r["term"] == 1
+    }
+
+
+def test_refresh_reranks_only_dirty_subjects(school):
+    database = school["database"]
+    cls = next(c for c in school["classes"] if c["academic_level"] == "JHS")
+    students = [s for s in school["students"] if s["assigned_class"] == cls["class_name"]]
+    subject = school["subjects"][0]
+
+    save_class_scores_bulk(
+        class_id=cls["id"], academic_level=cls["academic_level"], term=1, academic_year=ACADEMIC_YEAR,
+        score_rows=[
+            {"student_id": s["id"], "subject_id": subject["id"], "class_score": None, "exam_score": 40 + i}
+            for i, s in enumerate(students)
+        ],
+    )
+    assert recompute_dirty_results(cls["id"]) == len(students)
+    assert pending(cls["id"]) == 0
+
+    positions = _positions(database, cls["id"])
+    _, ranked = generate_class_rankings(cls["id"], 1, cls["academic_level"], ACADEMIC_YEAR)
+    for row in ranked:
+        stored = positions[(row["student_id"], row["subject_id"])]
+        # The edited subject is re-ranked; untouched subjects keep their (unset) positions
+        assert stored == (row["position"] if row["subject_id"] == subject["id"] else None)
+    assert positions[(students[-1]["id"], subject["id"])] == 1
+
+
+def test_saving_positions_keeps_newer_scores(school):
+    database = school["database"]
+    cls = next(c for c in school["classes"] if c["academic_level"] == "JHS")
+    _, ranked = generate_class_rankings(cls["id"], 1, cls["academic_level"], ACADEMIC_YEAR)
+    edited = ranked[0]
+
+    # A teacher saves a new score between ranking and saving the positions
+    save_class_scores_bulk(
+        class_id=cls["id"], academic_level=cls["academic_level"], term=1, academic_year=ACADEMIC_YEAR,
+        score_rows=[{"student_id": edited["student_id"], "subject_id": edited["subject_id"],
+                     "class_score": None, "exam_score": 99}],
+    )
+    save_subject_positions(ranked)
+
+    stored = {
+        (r["student_id"], r["subject_id"]): r
+        for r in database.rows("student_scores")
+        if r["class_id"] == cls["id"] and r["term"] == 1
+    }
+    row = stored[(edited["student_id"], edited["subject_id"])]
+    assert (row["exam_score"], row["position"]) == (99, edited["position"])
+    assert all(stored[(r["student_id"], r["subject_id"])]["position"] == r["position"] for r in ranked)
+
+
+def test_pending_counts_dirty_subjects(school):
+    cls = school["classes"][0]
+    subject_ids = [s["id"] for s in school["subjects"][:2]]
+
+    mark_dirty(cls["id"], 1, ACADEMIC_YEAR, (), subject_ids)
+    assert pending(cls["id"]) == 2
+    assert pending(school["classes"][1]["id"]) == 0
+
+    recompute_dirty_results(cls["id"])
+    assert pending(cls["id"]) == 0
@@ -0,0 +1,35 @@
+# tests/test_page_cache.py
+import httpx
+
+from core.db import use_http_transport
+from core.db_students import get_students_page
+from core.db_teachers import get_teachers_page
+
+
+def _unavailable(request):
+    return httpx.Response(503, json={"code": "PGRST000", "message": "database unavailable"})
+
+
+def _while_unavailable(database, read):
+    use_http_transport(httpx.MockTransport(_unavailable))
+    try:
+        return read()
+    finally:
+        use_http_transport(database)
+
+
+def test_failed_student_page_is_not_cached(school):
+    assert _while_unavailable(school["database"], lambda: get_students_page(page_size=10)) == ([], None)
+
+    rows, cursor = get_students_page(page_size=10)
+    assert len(rows) == 10 and cursor is not None
+
+
+def test_failed_teacher_page_is_not_cached(school):
+    school["database"].load("profiles", [
+        {"full_name": f"Teacher {i}", "email": f"t{i}@school.test", "role": "teacher"} for i in range(3)
+    ])
+    assert _while_unavailable(school["database"], lambda: get_teachers_page(page_size=10)) == ([], None)
+
+    rows, cursor = get_teachers_page(page_size=10)
+    assert [r["full_name"] for r in rows] == ["Teacher 0", "Teacher 1", "Teacher 2"] and cursor is None
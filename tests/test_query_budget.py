@@ -0,0 +1,80 @@
+# tests/test_query_budget.py
+import pytest
+
+from benchmarks.seed import ACADEMIC_YEAR
+from core.db import safe_execute, supabase
+from core.db.metrics import QueryBudgetExceeded, query_budget
+from core.db_classes import get_classes
+from core.db_conduct_interest import save_conduct_interest_bulk, save_student_conduct_interest
+from core.db_student_final_results import get_final_results
+from core.db_student_scores import get_class_scores
+from core.db_students import get_students_by_class
+
+
+def _load_results_viewer(cls):
+    """The reads behind student_results_viewer for one class."""
+    get_classes()
+    get_students_by_class(cls["class_name"])
+    get_final_results(class_id=cls["id"], term=1, academic_year=ACADEMIC_YEAR)
+    get_class_scores(class_id=cls["id"], term=1, academic_year=ACADEMIC_YEAR)
+
+
+def test_results_viewer_within_budget(school):
+    cls = school["classes"][0]
+    with query_budget(4, page="results viewer"):
+        _load_results_viewer(cls)
+
+
+def test_results_viewer_over_budget(school):
+    cls = school["classes"][0]
+    with pytest.raises(QueryBudgetExceeded, match="more than 2 database requests"):
+        with query_budget(2, page="results viewer"):
+            _load_results_viewer(cls)
+
+
+def test_limit_lookup_in_loop_is_n_plus_one(school):
+    # A .limit(1) lookup per student is not paging and must not be exempt
+    with pytest.raises(QueryBudgetExceeded, match="identical select requests on students"):
+        with query_budget(100, page="lookup loop"):
+            for student in school["students"][:10]:
+                safe_execute(supabase.table("students").select("*").eq("id", student["id"]).limit(1))
+
+
+def test_keyset_pages_are_not_n_plus_one(school):
+    from core.db.pagination import keyset_page, split_page
+
+    pages, cursor = 0, None
+    with query_budget(2, page="keyset"):
+        while True:
+            query = supabase.table("students").select("id, full_name")
+            rows = safe_execute(keyset_page(query, sort_column="full_name", page_size=5, after=cursor))
+            _, cursor = split_page(rows, sort_column="full_name", page_size=5)
+            pages += 1
+            if cursor is None or pages == 8:
+                break
+    assert pages > 2
+
+
+def test_range_lookup_in_loop_is_n_plus_one(school):
+    # .range(0, 0) sends offset=0: a first "page" per student is still a lookup
+    with pytest.raises(QueryBudgetExceeded, match="identical select requests on students"):
+        with query_budget(100, page="range lookup loop"):
+            for student in school["students"][:10]:
+                safe_execute(supabase.table("students").select("*").eq("id", student["id"]).range(0, 0))
+
+
+def test_single_row_upserts_in_loop_are_n_plus_one(school):
+    cls = school["classes"][0]
+    students = [s for s in school["students"] if s["assigned_class"] == cls["class_name"]]
+    with pytest.raises(QueryBudgetExceeded, match="identical upsert requests on student_conduct_interest"):
+        with query_budget(100, page="conduct loop"):
+            for student in students[:10]:
+                save_student_conduct_interest(student["id"], cls["id"], 1, ACADEMIC_YEAR, 1, 1, 50)
+
+
+def test_one_multi_row_upsert_is_a_batch(school):
+    cls = school["classes"][0]
+    students = [s for s in school["students"] if s["assigned_class"] == cls["class_name"]]
+    entries = [{"student_id": s["id"], "conduct_id": 1, "interest_id": 1, "attendance": 50} for s in students[:10]]
+    with query_budget(0, page="conduct bulk"):
+        assert len(save_conduct_interest_bulk(cls["id"], 1, ACADEMIC_YEAR, entries)) == 10
@@ -0,0 +1,64 @@
+# tests/test_sqlite_backend.py
+import pytest
+
+from core.db import SQLiteTransport, escape_like, safe_execute, supabase, use_http_transport
+from core.db.pagination import keyset_page, split_page
+
+NAMES = [
+    'Ama "Maame" Mensah',
+    "Kofi, Jnr. Owusu",
+    "Yaa (Junior) Asante",
+    "Kwame\\Boateng",
+    "50% Addo",
+    "Efua_Ofori",
+    "efua ofori",
+]
+
+
+@pytest.fixture
+def students():
+    database = SQLiteTransport(":memory:")
+    rows = [
+        {"id": f"00000000-0000-0000-0000-{i:012d}", "full_name": name, "assigned_class": "JHS 1"}
+        for i, name in enumerate(NAMES)
+    ]
+    database.load("students", rows)
+    use_http_transport(database)
+    yield rows
+    use_http_transport(None)
+    database.close()
+
+
+def _names(query) -> list[str]:
+    return sorted(r["full_name"] for r in safe_execute(query, raise_errors=True))
+
+
+def test_eq_with_quotes_commas_and_parentheses(students):
+    for name in NAMES:
+        assert _names(supabase.table("students").select("full_name").eq("full_name", name)) == [name]
+
+
+def test_in_list_with_quoted_values(students):
+    wanted = ['Ama "Maame" Mensah', "Kofi, Jnr. Owusu", "Yaa (Junior) Asante"]
+    assert _names(supabase.table("students").select("full_name").in_("full_name", wanted)) == sorted(wanted)
+
+
+def test_like_escapes(students):
+    def names(op, pattern):
+        return _names(getattr(supabase.table("students").select("full_name"), op)("full_name", pattern))
+
+    assert names("like", f"%{escape_like('50%')}%") == ["50% Addo"]
+    assert names("ilike", f"%{escape_like('_')}%") == ["Efua_Ofori"]
+    assert names("ilike", "efua_ofori") == ["Efua_Ofori", "efua ofori"]
+
+
+def test_keyset_cursor_over_awkward_names(students):
+    seen, cursor = [], None
+    while True:
+        query = supabase.table("students").select("id, full_name")
+        rows = safe_execute(keyset_page(query, sort_column="full_name", page_size=2, after=cursor), raise_errors=True)
+        page, cursor = split_page(rows, sort_column="full_name", page_size=2)
+        seen += [r["full_name"] for r in page]
+        if cursor is None:
+            break
+    assert seen == sorted(NAMES)
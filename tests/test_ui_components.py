@@ -0,0 +1,33 @@
+# tests/test_ui_components.py
+import pandas as pd
+
+from utils.ui_components import editor_changes
+
+ORIGINAL = pd.DataFrame([
+    {"_id": "s1", "Full Name": "Ama Mensah", "Class": "JHS 1"},
+    {"_id": "s2", "Full Name": "Kofi Owusu", "Class": "JHS 1"},
+])
+
+
+def test_unchanged_table():
+    assert editor_changes(ORIGINAL, ORIGINAL.copy()) == ([], [])
+
+
+def test_edited_row_is_changed():
+    edited = ORIGINAL.copy()
+    edited.loc[1, "Class"] = "JHS 2"
+    assert editor_changes(ORIGINAL, edited) == ([], [{"_id": "s2", "Full Name": "Kofi Owusu", "Class": "JHS 2"}])
+
+
+def test_new_row_at_defaults_is_new():
+    # A row added in the editor but never filled in has no id and blank cells
+    edited = pd.concat([ORIGINAL, pd.DataFrame([{"_id": None, "Full Name": None, "Class": None}])], ignore_index=True)
+    assert editor_changes(ORIGINAL, edited) == ([{"_id": "", "Full Name": "", "Class": ""}], [])
+
+
+def test_new_row_copying_an_existing_one_is_new():
+    edited = pd.concat(
+        [ORIGINAL, pd.DataFrame([{"_id": float("nan"), "Full Name": "Ama Mensah", "Class": "JHS 1"}])],
+        ignore_index=True,
+    )
+    assert editor_changes(ORIGINAL, edited)[0] == [{"_id": "", "Full Name": "Ama Mensah", "Class": "JHS 1"}]
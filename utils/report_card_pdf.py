@@ -0,0 +1,243 @@
+# utils/report_card_pdf.py
+"""
+PDF report-card renderer.
+
+Pure rendering: works on plain card dicts (see
+core/services/report_cards.build_report_cards) and never touches the
+database, so it can run in worker processes. reportlab is imported lazily;
+the rest of the app works without it.
+"""
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+SUBJECT_HEADER = ["Subject", "Class", "Exam", "Total", "Grade", "Position", "Remark"]
+DEFAULT_BATCH_SIZE = 25
+# Bump when the layout changes so cached PDFs are re-rendered
+RENDER_VERSION = 1
+
+
+def _load_reportlab():
+    try:
+        import reportlab  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            "PDF report cards require reportlab (pip install reportlab)."
+        ) from None
+
+
+def ordinal(n) -> str:
+    """1 -> "1st", 2 -> "2nd", 11 -> "11th"; None -> "-"."""
+    if n is None:
+        return "-"
+    n = int(n)
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+
+def _text(value) -> str:
+    return "-" if value is None else str(value)
+
+
+# -------------------------------------------------
+# Layout (built once per process)
+# -------------------------------------------------
+@lru_cache(maxsize=1)
+def _layout():
+    """Page geometry, paragraph and table styles shared by every card."""
+    _load_reportlab()
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib.units import mm
+    from reportlab.platypus import TableStyle
+
+    width, height = A4
+    margin = 15 * mm
+    content_width = width - 2 * margin
+    grid = TableStyle([
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("FONTSIZE", (0, 0), (-1, -1), 9),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ])
+
+    return {
+        "page_size": A4,
+        "margin": margin,
+        "width": content_width,
+        "top": height - margin,
+        "title": ParagraphStyle("title", fontName="Helvetica-Bold", fontSize=16, alignment=1, leading=20),
+        "subtitle": ParagraphStyle("subtitle", fontName="Helvetica", fontSize=11, alignment=1, leading=14),
+        "cell": ParagraphStyle("cell", fontName="Helvetica", fontSize=9, leading=11),
+        "info_style": TableStyle([
+            *grid.getCommands(),
+            ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+            ("FONTNAME", (2, 0), (2, -1), "Helvetica-Bold"),
+            ("BACKGROUND", (0, 0), (0, -1), colors.whitesmoke),
+            ("BACKGROUND", (2, 0), (2, -1), colors.whitesmoke),
+        ]),
+        "subject_style": TableStyle([
+            *grid.getCommands(),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+            ("ALIGN", (1, 0), (5, -1), "CENTER"),
+        ]),
+        "subject_widths": [w * content_width for w in (0.27, 0.09, 0.09, 0.09, 0.09, 0.11, 0.26)],
+        "info_widths": [w * content_width for w in (0.18, 0.32, 0.18, 0.32)],
+        "gap": 6 * mm,
+    }
+
+
+# -------------------------------------------------
+# Drawing
+# -------------------------------------------------
+def _draw(flowable, canvas, layout, y: float) -> float:
+    """Draw a flowable at the current y (top) and return the new y."""
+    _, h = flowable.wrapOn(canvas, layout["width"], y)
+    flowable.drawOn(canvas, layout["margin"], y - h)
+    return y - h - layout["gap"]
+
+
+def draw_report_card(canvas, card: dict):
+    """Draw one report card on the current page of a reportlab canvas."""
+    from reportlab.platypus import Paragraph, Table
+
+    layout = _layout()
+    cell = layout["cell"]
+    final = card.get("final") or {}
+    y = layout["top"]
+
+    y = _draw(Paragraph(card.get("school_name", ""), layout["title"]), canvas, layout, y)
+    y = _draw(
+        Paragraph(f"Terminal Report — Term {card['term']}, {card['academic_year']}", layout["subtitle"]),
+        canvas, layout, y,
+    )
+
+    position = final.get("position")
+    info = Table(
+        [
+            ["Name", card["student_name"], "Class", card["class_name"]],
+            [
+                "Position", f"{ordinal(position)} of {card['class_size']}" if position else "-",
+                "Attendance", _text(card.get("attendance")),
+            ],
+        ],
+        colWidths=layout["info_widths"],
+        style=layout["info_style"],
+    )
+    y = _draw(info, canvas, layout, y)
+
+    rows = [SUBJECT_HEADER] + [
+        [
+            Paragraph(_text(s.get("subject_name")), cell),
+            _text(s.get("class_score")),
+            _text(s.get("exam_score")),
+            _text(s.get("total_score")),
+            _text(s.get("grade")),
+            ordinal(s.get("position")),
+            Paragraph(_text(s.get("remark")), cell),
+        ]
+        for s in card["subjects"]
+    ]
+    subjects = Table(rows, colWidths=layout["subject_widths"], style=layout["subject_style"], repeatRows=1)
+    y = _draw(subjects, canvas, layout, y)
+
+    summary = [
+        ["Grand Total", _text(final.get("grand_total")), "Final Grade", _text(final.get("final_grade"))],
+        ["Aggregate", _text(final.get("aggregate")), "Descriptor", _text(final.get("descriptor"))],
+        ["Conduct", _text(card.get("conduct")), "Interest", _text(card.get("interest"))],
+        ["Remark", Paragraph(_text(final.get("remark")), cell), "", ""],
+    ]
+    summary_table = Table(summary, colWidths=layout["info_widths"], style=layout["info_style"])
+    summary_table.setStyle([("SPAN", (1, 3), (3, 3))])
+    y = _draw(summary_table, canvas, layout, y)
+
+    y -= layout["gap"]
+    canvas.setFont("Helvetica", 9)
+    canvas.drawString(layout["margin"], y, "Class Teacher: ______________________")
+    canvas.drawRightString(layout["margin"] + layout["width"], y, "Head Teacher: ______________________")
+
+
+def render_cards_pdf(cards: list[dict]) -> bytes:
+    """Render cards into one PDF document, one page per card."""
+    _load_reportlab()
+    from reportlab.pdfgen.canvas import Canvas
+
+    layout = _layout()
+    buffer = io.BytesIO()
+    canvas = Canvas(buffer, pagesize=layout["page_size"])
+    for card in cards:
+        draw_report_card(canvas, card)
+        canvas.showPage()
+    canvas.save()
+    return buffer.getvalue()
+
+
+def render_card_pdf(card: dict) -> bytes:
+    """Render a single student's report card."""
+    return render_cards_pdf([card])
+
+
+def _render_batch(cards: list[dict]) -> list[tuple[str, bytes]]:
+    return [(card["student_id"], render_card_pdf(card)) for card in cards]
+
+
+# -------------------------------------------------
+# Batch rendering (process pool)
+# -------------------------------------------------
+def render_pool(workers: int | None = None) -> ProcessPoolExecutor:
+    """
+    Process pool for rendering. Workers are spawned, not forked: callers
+    (Streamlit's script thread, the CLI's fetch threads) are multithreaded,
+    and a forked child can inherit a lock another thread was holding.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def render_report_cards(
+    cards: list[dict],
+    *,
+    workers: int | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    merged: bool = True,
+    skip: set[str] | frozenset = frozenset(),
+    pool: ProcessPoolExecutor | None = None
+) -> tuple[dict[str, bytes], bytes | None]:
+    """
+    Render one PDF per student, plus (if merged) a single PDF of all cards.
+
+    Batches of `batch_size` cards are rendered in a pool of `workers`
+    processes (default: CPU count); the merged document is rendered by
+    one more worker in parallel. Pass `pool` to share one pool between
+    several classes (e.g. from threads). With workers=1 and no pool
+    everything runs in this process. Students in `skip` (e.g. already
+    cached) get no individual PDF but still appear in the merged one.
+    Returns ({student_id: pdf_bytes}, merged_pdf_bytes or None).
+    """
+    _load_reportlab()
+    todo = [card for card in cards if card["student_id"] not in skip]
+    if not todo and not (merged and cards):
+        return {}, None
+
+    batches = [todo[i:i + batch_size] for i in range(0, len(todo), batch_size)]
+
+    if pool is not None:
+        return _render_in_pool(pool, cards, batches, merged)
+
+    workers = min(workers or os.cpu_count() or 1, len(batches) + int(merged))
+    if workers <= 1:
+        per_student = dict(pair for batch in batches for pair in _render_batch(batch))
+        return per_student, render_cards_pdf(cards) if merged else None
+
+    with render_pool(workers) as own_pool:
+        return _render_in_pool(own_pool, cards, batches, merged)
+
+
+def _render_in_pool(pool, cards, batches, merged):
+    merged_future = pool.submit(render_cards_pdf, cards) if merged else None
+    per_student = {}
+    for future in [pool.submit(_render_batch, batch) for batch in batches]:
+        per_student.update(future.result())
+    return per_student, merged_future.result() if merged_future else None
@@ -0,0 +1,80 @@
+# utils/roster_reader.py
+"""
+Streaming readers for CSV / Excel roster uploads.
+
+Large rosters are never loaded into one DataFrame: CSV files are read with
+pandas' chunked reader and .xlsx files with openpyxl's read-only row
+iterator, so memory stays bounded by the chunk size.
+"""
+from itertools import islice
+
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def _load_openpyxl():
+    try:
+        import openpyxl
+    except ImportError:
+        raise ImportError(
+            "Reading .xlsx uploads requires openpyxl (pip install openpyxl). "
+            "Alternatively, save the file as CSV."
+        ) from None
+    return openpyxl
+
+
+def _is_excel(uploaded_file) -> bool:
+    return uploaded_file.name.lower().endswith((".xlsx", ".xlsm"))
+
+
+def _iter_excel_rows(uploaded_file):
+    """Yield (header, row_iterator) for the first sheet, read-only."""
+    openpyxl = _load_openpyxl()
+    uploaded_file.seek(0)
+    workbook = openpyxl.load_workbook(uploaded_file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(c).strip() if c is not None else "" for c in next(rows, ())]
+        yield header, rows
+    finally:
+        workbook.close()
+
+
+def _excel_frame(header: list[str], rows) -> pd.DataFrame:
+    # Match read_csv(dtype=str): text cells, blanks as None
+    width = len(header)
+    records = [
+        [None if v is None else str(v) for v in (tuple(row) + (None,) * width)[:width]]
+        for row in rows
+    ]
+    return pd.DataFrame.from_records(records, columns=header)
+
+
+def iter_roster_chunks(uploaded_file, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Yield the upload as DataFrames of at most `chunk_size` rows.
+    All cells are read as text (so "0123" stays "0123"); blanks are NaN.
+    """
+    if _is_excel(uploaded_file):
+        for header, rows in _iter_excel_rows(uploaded_file):
+            while True:
+                batch = list(islice(rows, chunk_size))
+                if not batch:
+                    break
+                yield _excel_frame(header, batch)
+        return
+
+    uploaded_file.seek(0)
+    yield from pd.read_csv(uploaded_file, dtype=str, chunksize=chunk_size)
+
+
+def preview_roster(uploaded_file, n: int = 20) -> pd.DataFrame:
+    """Return only the first `n` rows of an upload."""
+    if _is_excel(uploaded_file):
+        for header, rows in _iter_excel_rows(uploaded_file):
+            return _excel_frame(header, islice(rows, n))
+        return pd.DataFrame()
+
+    uploaded_file.seek(0)
+    return pd.read_csv(uploaded_file, dtype=str, nrows=n)
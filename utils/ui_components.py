@@ -0,0 +1,56 @@
+# utils/ui_components.py
+import pandas as pd
+import streamlit as st
+
+
+def keyset_paginator(key: str, fetch_page, *, filters: tuple = ()) -> list[dict]:
+    """
+    Prev/Next pager for keyset-paginated queries.
+
+    fetch_page(after=cursor) must return (rows, next_cursor), like
+    get_students_page / get_teachers_page. The stack of cursors lives in
+    st.session_state[key] and resets whenever `filters` change.
+    Returns the rows of the current page.
+    """
+    state = st.session_state.setdefault(key, {"filters": filters, "cursors": [None]})
+    if state["filters"] != filters:
+        state["filters"] = filters
+        state["cursors"] = [None]
+
+    rows, next_cursor = fetch_page(after=state["cursors"][-1])
+
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    if col_prev.button("◀ Prev", key=f"{key}_prev", disabled=len(state["cursors"]) == 1):
+        state["cursors"].pop()
+        st.rerun()
+    col_page.caption(f"Page {len(state['cursors'])}")
+    if col_next.button("Next ▶", key=f"{key}_next", disabled=next_cursor is None):
+        state["cursors"].append(next_cursor)
+        st.rerun()
+
+    return rows
+
+
+def _cell(value):
+    # Blank editor cells come back as None or NaN
+    return "" if value is None or (not isinstance(value, (list, dict)) and pd.isna(value)) else value
+
+
+def editor_changes(original: pd.DataFrame, edited: pd.DataFrame, id_column: str = "_id"):
+    """
+    Split an st.data_editor result into (new_rows, changed_rows).
+
+    A row is new when it has no id -- whatever its values, so a row added
+    and left at the editor's defaults is still reported (and can be
+    rejected) instead of being dropped as unchanged. Rows with an id are
+    changed when any cell differs from `original`.
+    """
+    before = {str(r[id_column]): r for r in original.to_dict("records")}
+    new_rows, changed_rows = [], []
+    for row in edited.to_dict("records"):
+        row = {k: _cell(v) for k, v in row.items()}
+        if row.get(id_column) == "":
+            new_rows.append(row)
+        elif any(row[k] != _cell(before.get(str(row[id_column]), {}).get(k)) for k in row):
+            changed_rows.append(row)
+    return new_rows, changed_rows
@@ -0,0 +1,28 @@
+# utils/validation.py
+import pandas as pd
+
+
+def require_columns(df: pd.DataFrame, columns: list[str]):
+    """Raise ValueError if any expected column is missing from an upload."""
+    missing = [c for c in columns if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+
+
+def clean_text_columns(df: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+    """
+    Return a copy of df[columns] as stripped strings, column-wise.
+    Blank cells (NaN/None) become "".
+    """
+    cleaned = df[columns].copy()
+    for col in columns:
+        cleaned[col] = cleaned[col].fillna("").astype(str).str.strip()
+    return cleaned
+
+
+def dedupe_key(*series: pd.Series) -> pd.Series:
+    """Case- and whitespace-insensitive key for duplicate detection."""
+    key = series[0].str.casefold().str.split().str.join(" ")
+    for s in series[1:]:
+        key = key + "\x1f" + s.str.casefold().str.split().str.join(" ")
+    return key